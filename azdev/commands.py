@@ -54,6 +54,9 @@ def load_command_table(self, _):
         g.command('load-times', 'check_load_time')
         g.command('benchmark', 'benchmark', is_preview=True, table_transformer=performance_benchmark_data_transformer)
 
+    with CommandGroup(self, 'perf', operation_group('performance.compare')) as g:
+        g.command('compare', 'compare_benchmarks', is_preview=True)
+
     with CommandGroup(self, 'extension', operation_group('extensions')) as g:
         g.command('add', 'add_extension')
         g.command('remove', 'remove_extension')
@@ -4,6 +4,9 @@
 # license information.
 # -----------------------------------------------------------------------------
 
+# at most this many tests are completed, as shells ask before listing more anyway
+MAX_TEST_COMPLETIONS = 1000
+
 
 # TODO: import from Knack once it is moved
 # pylint: disable=too-few-public-methods
@@ -21,5 +24,34 @@ class Completer:
 
 @Completer
 def get_test_completion(cmd, prefix, namespace, **kwargs):  # pylint: disable=unused-argument
-    # TODO: return the list of keys from the index
-    return ['storage', 'network', 'redis']
+    """ Complete module, file, class and test names from the saved test index of the profile to test against.
+
+    The index is queried in place, and neither `az` nor the Azure CLI modules are loaded.
+    """
+    import os
+    import sqlite3
+    from azdev.operations.testtool import get_test_index_path
+    from azdev.operations.testtool.index import TestIndex
+    from azdev.operations.testtool.profile_context import get_configured_profile
+
+    completions = [name for name in ('CLI', 'EXT') if name.startswith(prefix)]
+    profile = getattr(namespace, 'profile', None) or get_configured_profile() or 'latest'
+    test_index_path = get_test_index_path(profile)
+    if not os.path.isfile(test_index_path):
+        # fall back to the most recently updated index of any profile
+        test_index_dir = os.path.dirname(test_index_path)
+        try:
+            indexes = [os.path.join(test_index_dir, f) for f in os.listdir(test_index_dir) if f.endswith('.db')]
+        except OSError:
+            indexes = []
+        if not indexes:
+            return completions
+        test_index_path = max(indexes, key=os.path.getmtime)
+
+    test_index = TestIndex(test_index_path)
+    try:
+        return completions + test_index.complete(prefix, limit=MAX_TEST_COMPLETIONS)
+    except sqlite3.Error:
+        return completions
+    finally:
+        test_index.close()
@@ -112,6 +112,8 @@ helps['style'] = """
     examples:
         - name: Check style for only those modules which have changed based on a git diff.
           text: azdev style --repo azure-cli --tgt upstream/master --src upstream/dev
+        - name: Run pylint for all modules of the CLI, along with the custom pylint checkers of the linter.
+          text: azdev style CLI --pylint --linter-checkers
 """
 
 
@@ -133,6 +135,12 @@ helps['test'] = """
 
         - name: Run tests for only those modules which have changed based on a git diff.
           text: azdev test --repo azure-cli --tgt upstream/master --src upstream/dev
+
+        - name: Record the lines covered by each test of the CLI, to select tests by impact later.
+          text: azdev test CLI --record-impact
+
+        - name: Run only the CLI tests impacted by the changes since upstream/dev, according to the recorded coverage.
+          text: azdev test CLI --impact --repo azure-cli --tgt upstream/dev
 """
 
 
@@ -141,6 +149,14 @@ helps['linter'] = """
     examples:
         - name: Check linter rules for only those modules which have changed based on a git diff.
           text: azdev linter --repo azure-cli --tgt upstream/master --src upstream/dev
+        - name: Check linter rules for all modules of the CLI using 8 processes.
+          text: azdev linter CLI --workers 8
+        - name: Check linter rules for the network module, only rechecking what changed since the last run.
+          text: azdev linter network --incremental
+        - name: Check linter rules for all modules of the CLI and save the results as a SARIF log.
+          text: azdev linter CLI --report-format sarif --report-path linter.sarif
+        - name: Check linter rules for all modules of the CLI, except the custom pylint checkers run by `azdev style --linter-checkers`.
+          text: azdev linter CLI --skip-pylint-checkers
 """
 
 helps['statistics'] = """
@@ -170,6 +186,15 @@ helps['perf'] = """
 
 helps['perf load-times'] = """
     short-summary: Verify that all modules load within an acceptable timeframe.
+    examples:
+        - name: Check module load times and trace slow modules to the imports that caused them.
+          text: azdev perf load-times --import-time
+        - name: Check module load times over 10 runs, 4 at a time on isolated CPU cores.
+          text: azdev perf load-times --runs 10 --workers 4
+        - name: Save the load times of the main branch as the baseline.
+          text: azdev perf load-times --runs 20 --save-baseline
+        - name: Fail only modules that are significantly slower than the baseline.
+          text: azdev perf load-times --runs 20 --baseline
 """
 
 helps['perf benchmark'] = """
@@ -177,6 +202,28 @@ helps['perf benchmark'] = """
     examples:
         - name: Run benchmark on "network application-gateway" and "storage account"
           text: azdev perf benchmark "network application-gateway -h" "storage account" "version" "group list"
+        - name: Separate interpreter and core overhead from per-command module loading
+          text: azdev perf benchmark "network vnet list" "version" --mode both
+        - name: Benchmark all commands, saving each result as it is measured, and continue after an interruption
+          text: azdev perf benchmark --results-file results.jsonl --resume
+        - name: Report the peak memory and number of imported modules next to the latency
+          text: azdev perf benchmark "storage account list" "vm list" --memory
+        - name: Measure every command at least 5 times, and noisy ones up to 50 times until the confidence interval of the median is within 5%
+          text: azdev perf benchmark --runs 5 --ci-width 0.05 --max-runs 50
+"""
+
+helps['perf compare'] = """
+    short-summary: Compare two sets of benchmark results, joined by command.
+    long-summary: >
+        Reports the relative change of the median time of every command and lists the largest
+        significant regressions and improvements, using a Mann-Whitney U test on the samples of each command.
+        With --tgt and --repo, the target and source revisions of the repo are checked out and benchmarked
+        one after the other.
+    examples:
+        - name: Compare the results of two benchmark runs
+          text: azdev perf compare main.json feature.json
+        - name: Benchmark two commands on the dev branch and on the current branch of the CLI repo, then compare them
+          text: azdev perf compare --tgt dev --repo ~/azure-cli --commands "version" "vm list --help"
 """
 
 helps['extension'] = """
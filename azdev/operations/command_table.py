@@ -0,0 +1,367 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+""" Serialized snapshot of the CLI command table, shared by the azdev commands that need it.
+
+Loading the command table imports every command module and takes tens of seconds. The snapshot
+records the name, source, arguments, help and codegen information of every command and is saved
+in the azdev config dir, keyed by a fingerprint of the module and extension sources, so that it is
+only rebuilt when those sources change.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+import yaml
+from knack.log import get_logger
+from knack.util import CLIError
+
+from azdev.utilities import atomic_write, get_azdev_config_dir, get_name_index, get_path_table
+
+
+logger = get_logger(__name__)
+
+SNAPSHOT_FILE = 'command_table_snapshot.json'
+SNAPSHOT_VERSION = 1
+
+
+def get_command_table_snapshot(include_whl_extensions=False):
+    """ Return the snapshot of the command table, loading the command table only if it is stale.
+
+    :returns: dict with the `commands` and `command_groups` of the CLI, keyed by name.
+    """
+    try:
+        path_table = get_path_table(include_whl_extensions=include_whl_extensions)
+        key = get_snapshot_key(path_table)
+    except CLIError as ex:
+        # without azdev setup there is nothing to fingerprint the sources with
+        logger.warning('Unable to cache the command table: %s', ex)
+        return create_command_table_snapshot()
+
+    snapshot = _read_snapshot(key)
+    if snapshot is not None:
+        logger.info('Using command table snapshot %s', key)
+        return snapshot
+
+    snapshot = create_command_table_snapshot(path_table)
+    errors = snapshot.pop('errors', None)
+    if errors:
+        # the sources would not change until fixed, so a partial snapshot would be kept for good
+        logger.warning('Not caching the command table since %d command modules failed to load.', len(errors))
+        return snapshot
+    _write_snapshot(key, snapshot)
+    return snapshot
+
+
+def get_snapshot_key(path_table):
+    """ Fingerprint the Python sources of every module and extension in the path table.
+
+    The fingerprint is based on the path, size and modification time of each file, which changes
+    whenever a file is edited, added, removed or reinstalled without reading its content.
+    """
+    digest = hashlib.sha256()
+    digest.update('{}\n{}\n'.format(SNAPSHOT_VERSION, sys.version).encode())
+    for key in sorted(path_table):
+        for name, path in sorted(path_table[key].items()):
+            digest.update('{}:{}\n'.format(key, name).encode())
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for file_name in sorted(files):
+                    if not file_name.endswith('.py'):
+                        continue
+                    file_path = os.path.join(root, file_name)
+                    stat = os.stat(file_path)
+                    digest.update('{} {} {}\n'.format(
+                        os.path.relpath(file_path, path), stat.st_size, stat.st_mtime_ns).encode())
+    return digest.hexdigest()
+
+
+def create_command_table_snapshot(path_table=None):
+    """ Load the command table with its arguments and serialize it.
+
+    With a path table, every command module and extension in it is loaded in a pool of worker
+    processes and the results are merged. Otherwise the whole command table is loaded in this process.
+
+    :returns: dict with the `commands` and `command_groups` of the CLI, keyed by name, and the `errors`
+        of the modules that failed to load in a worker, if any.
+    """
+    if path_table:
+        try:
+            from azure.cli.core.commands import (  # pylint: disable=import-error, unused-import, unused-variable
+                _load_module_command_loader, _load_extension_command_loader)
+        except ImportError:
+            logger.warning('This version of Azure CLI cannot load command modules separately. '
+                           'Loading the command table serially.')
+        else:
+            return _create_snapshot_in_parallel(path_table)
+
+    from azure.cli.core import get_default_cli  # pylint: disable=import-error
+    from azure.cli.core.file_util import create_invoker_and_load_cmds_and_args  # pylint: disable=import-error
+
+    start = time.time()
+    az_cli = get_default_cli()
+    create_invoker_and_load_cmds_and_args(az_cli)
+    logger.info('Time to load entire command table: %.3f sec', time.time() - start)
+    return _serialize_command_loader(az_cli.invocation.commands_loader)
+
+
+def _create_snapshot_in_parallel(path_table):
+    import multiprocessing
+
+    # extensions come last so that, as in a serial load, they override module commands of the same name
+    tasks = [(name, name, False, path) for name, path in sorted(path_table.get('mod', {}).items())]
+    tasks += [(name, os.path.basename(path), True, path) for name, path in sorted(path_table.get('ext', {}).items())]
+    snapshot = {'commands': {}, 'command_groups': {}}
+    if not tasks:
+        return snapshot
+
+    start = time.time()
+    with multiprocessing.Pool(processes=min(len(tasks), multiprocessing.cpu_count())) as pool:
+        # a module per task balances the load, and results come back in task order
+        results = pool.map(_load_module_snapshot, tasks, chunksize=1)
+    logger.info('Time to load entire command table: %.3f sec', time.time() - start)
+
+    for module_name, module_snapshot, error in results:
+        if error:
+            logger.warning('Error loading command module %s: %s', module_name, error)
+            snapshot.setdefault('errors', {})[module_name] = error
+            continue
+        snapshot['commands'].update(module_snapshot['commands'])
+        snapshot['command_groups'].update(module_snapshot['command_groups'])
+    return snapshot
+
+
+def _load_module_snapshot(task):
+    """ Load the commands and arguments of a single command module or extension in a pool worker.
+
+    :returns: (str, dict, str) the name of the module, its serialized commands and the error that
+        prevented loading it, if any.
+    """
+    module_name, source, is_extension, path = task
+    try:
+        # pylint: disable=import-error
+        from knack.events import EVENT_INVOKER_POST_CMD_TBL_CREATE
+        from azure.cli.core import get_default_cli
+        from azure.cli.core.commands import (
+            register_cache_arguments, _load_module_command_loader, _load_extension_command_loader)
+        from azure.cli.core.commands.arm import register_global_subscription_argument, register_ids_argument
+        from azure.cli.core.commands.events import EVENT_INVOKER_PRE_LOAD_ARGUMENTS, EVENT_INVOKER_POST_LOAD_ARGUMENTS
+
+        if is_extension and path not in sys.path:
+            sys.path.append(path)
+
+        az_cli = get_default_cli()
+        register_global_subscription_argument(az_cli)
+        register_ids_argument(az_cli)
+        register_cache_arguments(az_cli)
+        invoker = az_cli.invocation_cls(cli_ctx=az_cli, commands_loader_cls=az_cli.commands_loader_cls,
+                                        parser_cls=az_cli.parser_cls, help_cls=az_cli.help_cls)
+        az_cli.invocation = invoker
+        command_loader = invoker.commands_loader
+        command_loader.skip_applicability = True
+
+        load_command_loader = _load_extension_command_loader if is_extension else _load_module_command_loader
+        command_table, command_group_table = load_command_loader(command_loader, None, module_name)
+        command_loader.command_table = command_table
+        command_loader.command_group_table = command_group_table
+        command_loader.command_name = ''
+
+        az_cli.raise_event(EVENT_INVOKER_PRE_LOAD_ARGUMENTS, commands_loader=command_loader)
+        command_loader.load_arguments()
+        az_cli.raise_event(EVENT_INVOKER_POST_LOAD_ARGUMENTS, commands_loader=command_loader)
+        # the subscription, ids and cache arguments are added on this event, as in a serial load
+        az_cli.raise_event(EVENT_INVOKER_POST_CMD_TBL_CREATE, commands_loader=command_loader)
+        return module_name, _serialize_command_loader(command_loader, source=(source, is_extension)), None
+    except Exception as ex:  # pylint: disable=broad-except
+        return module_name, None, '{}: {}'.format(type(ex).__name__, ex)
+
+
+def _serialize_command_loader(command_loader, source=None):
+    """ Serialize the commands of a loader. Unless given as a (name, is_extension) tuple, the source of each
+    command is read from the command itself, and commands without a source are left out. """
+    from knack.help_files import helps
+
+    commands = {}
+    for command_name, command in command_loader.command_table.items():
+        command_source, is_extension = source or _get_command_source(command)
+        if command_source is None:
+            # command is unrecognized
+            logger.warning('Command: `%s`, has no command source.', command_name)
+            continue
+        commands[command_name] = {
+            'source': command_source,
+            'is_extension': is_extension,
+            'help': _get_short_summary(helps, command_name),
+            'arguments': {name: _serialize_argument(argument) for name, argument in command.arguments.items()},
+            'codegen': command_codegen_info(command_name, command, command_loader.cmd_to_loader_map[command_name])
+        }
+    command_groups = {name: {'help': _get_short_summary(helps, name)}
+                      for name in command_loader.command_group_table}
+    return {'commands': commands, 'command_groups': command_groups}
+
+
+def select_commands(snapshot, modules=None, include_whl_extensions=False):
+    """ Select the commands of certain modules/extensions from a snapshot.
+
+    : param snapshot: The snapshot returned by `get_command_table_snapshot`.
+    : modules: [str] list of module or extension names to retain.
+    :returns: dict of the selected commands, keyed by name.
+    """
+    modules = modules or []
+    name_index = get_name_index(include_whl_extensions=include_whl_extensions)
+    selected = {}
+    for command_name, command in snapshot['commands'].items():
+        source = command['source']
+        if source in name_index and (source in modules or name_index[source] in modules):
+            selected[command_name] = command
+    return selected
+
+
+def _read_snapshot(key):
+    path = os.path.join(get_azdev_config_dir(), SNAPSHOT_FILE)
+    try:
+        with open(path, 'r') as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if snapshot.get('key') != key:
+        return None
+    return snapshot
+
+
+def _write_snapshot(key, snapshot):
+    snapshot['key'] = key
+    with atomic_write(os.path.join(get_azdev_config_dir(), SNAPSHOT_FILE)) as f:
+        json.dump(snapshot, f)
+
+
+def _get_command_source(command):
+    from azure.cli.core.commands import ExtensionCommandSource  # pylint: disable=import-error
+    if isinstance(command.command_source, ExtensionCommandSource):
+        return command.command_source.extension_name, True
+    # command is from module, if it has a source
+    return command.command_source, False
+
+
+def _get_short_summary(helps, entry_name):
+    if entry_name not in helps:
+        return None
+    try:
+        return (yaml.safe_load(helps[entry_name]) or {}).get('short-summary')
+    except (yaml.YAMLError, AttributeError):
+        return None
+
+
+def _serialize_argument(argument):
+    settings = argument.type.settings
+    help_text = settings.get('help')
+    return {
+        # deprecated options are wrapped in a Deprecated object holding the option as target
+        'options': [str(getattr(option, 'target', option)) for option in settings.get('options_list') or []],
+        'required': bool(settings.get('required')),
+        'help': str(help_text) if help_text is not None else None
+    }
+
+
+import_aaz_express = re.compile(r'^\s*from (.*\.)?aaz(\..*)? .*$')
+command_args_express = re.compile(r'^.*[\s\(]command_args=.*$')
+
+
+def command_codegen_info(command_name, command, module_loader):  # pylint: disable=unused-argument, too-many-branches, too-many-statements
+    from azure.cli.core.commands import AzCliCommand  # pylint: disable=import-error
+
+    try:
+        from azure.cli.core.aaz import AAZCommand  # pylint: disable=import-error
+        if isinstance(command, AAZCommand):
+            return {
+                "version": "v2",
+                "type": "Atomic"
+            }
+    except ImportError:
+        pass
+
+    if isinstance(command, AzCliCommand):
+        if 'command_operation' not in command.command_kwargs:
+            return None
+
+        command_operation = command.command_kwargs['command_operation']
+        is_v2_conveniance = False
+        is_generated = False
+        if getattr(command_operation, 'op_path', None):
+            op = command_operation.get_op_handler(command_operation.op_path)
+            op_source = inspect.getsource(op)
+            for line in op_source.splitlines():
+                if import_aaz_express.match(line):
+                    is_v2_conveniance = True
+                    break
+                if command_args_express.match(line):
+                    is_v2_conveniance = True
+
+            path_parts = list(Path(inspect.getfile(op)).parts)
+            if "generated" in path_parts:
+                is_generated = True
+
+        if not is_v2_conveniance and getattr(command_operation, 'getter_op_path', None):
+            op = command_operation.get_op_handler(command_operation.getter_op_path)
+            op_source = inspect.getsource(op)
+            for line in op_source.splitlines():
+                if import_aaz_express.match(line):
+                    is_v2_conveniance = True
+                    break
+                if command_args_express.match(line):
+                    is_v2_conveniance = True
+
+            path_parts = list(Path(inspect.getfile(op)).parts)
+            if "generated" in path_parts:
+                is_generated = True
+
+        if not is_v2_conveniance and getattr(command_operation, 'setter_op_path', None):
+            op = command_operation.get_op_handler(command_operation.setter_op_path)
+            op_source = inspect.getsource(op)
+            for line in op_source.splitlines():
+                if import_aaz_express.match(line):
+                    is_v2_conveniance = True
+                    break
+                if command_args_express.match(line):
+                    is_v2_conveniance = True
+
+            path_parts = list(Path(inspect.getfile(op)).parts)
+            if "generated" in path_parts:
+                is_generated = True
+
+        if not is_v2_conveniance and getattr(command_operation, 'custom_function_op_path', None):
+            op = command_operation.get_op_handler(command_operation.custom_function_op_path)
+            op_source = inspect.getsource(op)
+            for line in op_source.splitlines():
+                if import_aaz_express.match(line):
+                    is_v2_conveniance = True
+                    break
+                if command_args_express.match(line):
+                    is_v2_conveniance = True
+
+            path_parts = list(Path(inspect.getfile(op)).parts)
+            if "generated" in path_parts:
+                is_generated = True
+
+        if is_v2_conveniance:
+            return {
+                "version": "v2",
+                "type": "Convenience"
+            }
+
+        if is_generated:
+            return {
+                "version": "v1",
+                "type": "SDK"
+            }
+
+    return None
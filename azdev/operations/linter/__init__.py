@@ -14,22 +14,25 @@ from knack.log import get_logger
 from knack.util import CLIError
 
 from azdev.utilities import (
-    heading, subheading, display, get_path_table, require_azure_cli, filter_by_git_diff)
+    heading, subheading, display, get_path_table, require_azure_cli, filter_by_git_diff, get_azdev_config_dir)
 from azdev.utilities.path import get_cli_repo_path, get_ext_repo_paths
-from azdev.operations.style import run_pylint
 
 from .linter import LinterManager, LinterScope, RuleError, LinterSeverity
+from .report import REPORT_FORMATS, write_report
+from .source_checks import check_command_sources, format_violation
 from .util import filter_modules, merge_exclusion
 
 
 logger = get_logger(__name__)
 CHECKERS_PATH = 'azdev.operations.linter.pylint_checkers'
+DEFAULT_REPORT_FILE = 'linter_results'
 
 
 # pylint:disable=too-many-locals, too-many-statements, too-many-branches
 def run_linter(modules=None, rule_types=None, rules=None, ci_exclusions=None,
                git_source=None, git_target=None, git_repo=None, include_whl_extensions=False,
-               min_severity=None, save_global_exclusion=False):
+               min_severity=None, save_global_exclusion=False, workers=1, incremental=False,
+               report_format=None, report_path=None, skip_pylint_checkers=False):
 
     require_azure_cli()
 
@@ -54,6 +57,16 @@ def run_linter(modules=None, rule_types=None, rules=None, ci_exclusions=None,
             raise CLIError("Please specify a valid linter severity. It should be one of: {}"
                            .format(", ".join(valid_choices)))
 
+    # process report options
+    if report_path and not report_format:
+        report_format = 'sarif' if report_path.endswith('.sarif') else 'json'
+    if report_format:
+        if report_format not in REPORT_FORMATS:
+            raise CLIError("Please specify a valid report format. It should be one of: {}"
+                           .format(", ".join(REPORT_FORMATS)))
+        report_path = report_path or os.path.join(get_azdev_config_dir(),
+                                                  '{}.{}'.format(DEFAULT_REPORT_FILE, report_format))
+
     # needed to remove helps from azdev
     azdev_helps = helps.copy()
     exclusions = {}
@@ -152,7 +165,9 @@ def run_linter(modules=None, rule_types=None, rules=None, ci_exclusions=None,
                                    rule_inclusions=rules,
                                    use_ci_exclusions=ci_exclusions,
                                    min_severity=min_severity,
-                                   update_global_exclusion=update_global_exclusion)
+                                   update_global_exclusion=update_global_exclusion,
+                                   workers=workers,
+                                   use_cache=incremental)
 
     subheading('Results')
     logger.info('Running linter: %i commands, %i help entries',
@@ -162,28 +177,43 @@ def run_linter(modules=None, rule_types=None, rules=None, ci_exclusions=None,
         run_commands=not rule_types or 'commands' in rule_types,
         run_command_groups=not rule_types or 'command_groups' in rule_types,
         run_help_files_entries=not rule_types or 'help_entries' in rule_types)
-    display(os.linesep + 'Run custom pylint rules.')
-    exit_code += pylint_rules(selected_modules)
+    if report_format:
+        write_report(linter_manager.rule_results, report_format, report_path, exit_code=exit_code)
+        display(os.linesep + 'Linter results saved to: {}'.format(report_path))
+    if skip_pylint_checkers:
+        logger.info('Skipping custom pylint rules.')
+    else:
+        display(os.linesep + 'Run custom pylint rules.')
+        exit_code += pylint_rules(selected_mod_paths, workers=workers)
     sys.exit(exit_code)
 
 
-def pylint_rules(selected_modules):
-    # TODO: support severity for pylint rules
+def get_pylint_checkers():
+    """ Find the custom pylint checkers of the linter, to load as plugins into a pylint run.
+
+    :returns: (list, list, dict) the checker plugins, the messages they emit and the environment to run pylint with.
+    """
     from importlib import import_module
     my_env = os.environ.copy()
     checker_path = import_module('{}'.format(CHECKERS_PATH)).__path__[0]
-    my_env['PYTHONPATH'] = checker_path
+    my_env['PYTHONPATH'] = os.pathsep.join(filter(None, [checker_path, my_env.get('PYTHONPATH')]))
     checkers = [os.path.splitext(f)[0] for f in os.listdir(checker_path) if
                 os.path.isfile(os.path.join(checker_path, f)) and f != '__init__.py']
     enable = [s.replace('_', '-') for s in checkers]
-    pylint_result = run_pylint(selected_modules, env=my_env, checkers=checkers, disable_all=True, enable=enable)
-    if pylint_result and not pylint_result.error:
+    return checkers, enable, my_env
+
+
+def pylint_rules(selected_mod_paths, workers=None):
+    """ Run the checks of the custom pylint checkers with the `ast` based source checks, which do not need pylint. """
+    # TODO: support severity for pylint rules
+    violations = check_command_sources(selected_mod_paths, workers=workers)
+    if not violations:
         display(os.linesep + 'No violations found for custom pylint rules.')
         display('Linter: PASSED\n')
-    if pylint_result and pylint_result.error:
-        display(pylint_result.error.output.decode('utf-8'))
-        display('Linter: FAILED\n')
-    return pylint_result.exit_code
+        return 0
+    display(os.linesep.join(format_violation(violation) for violation in violations))
+    display('Linter: FAILED\n')
+    return 1
 
 
 def linter_severity_choices():
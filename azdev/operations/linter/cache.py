@@ -0,0 +1,218 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+""" Persistent cache of linter results, used to only check the entities that changed since the last run.
+
+The violations of each rule are saved per entity along with a fingerprint of everything the rule
+can see of that entity: its arguments, help, deprecation state and exclusions, and the commands it
+refers to. The cache is discarded when the rules, azdev or Azure CLI core change.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+from azdev.utilities import atomic_write, get_azdev_config_dir
+
+CACHE_FILE = 'linter_cache.json'
+
+_PRIMITIVES = (str, int, float, bool)
+_EXAMPLE_COMMAND_RE = re.compile(r'\baz\s+([^|&;`$()\n]*)')
+
+
+class LinterCache:  # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, linter_manager, path=None):
+        self._linter_manager = linter_manager
+        # the main linter, as rules may run with a linter scoped down by exclusions
+        self._linter = linter_manager.linter
+        self._path = path or os.path.join(get_azdev_config_dir(), CACHE_FILE)
+        self._version = get_rule_set_version()
+        self._fingerprints = {}
+        self._command_names = None
+        self._command_group_names = None
+        self._group_commands = None
+        self._names_digest = None
+        self._results = {}
+        try:
+            with open(self._path, 'r') as f:
+                cache = json.load(f)
+            if cache.get('version') == self._version:
+                self._results = cache.get('rules', {})
+        except (OSError, ValueError):
+            pass
+
+    def lookup(self, rule_group, rule_name, entities):
+        """ Split entities into those with a cached result for the rule and those to check.
+
+        :returns: (list, list) the cached violations and the entities that changed since they were checked.
+        """
+        cached_results = self._results.get(rule_name, {})
+        violations, changed = [], []
+        for entity in entities:
+            entry = cached_results.get(entity)
+            if entry and entry[0] == self.fingerprint(rule_group, entity):
+                violations.extend(_load_violation(violation) for violation in entry[1])
+            else:
+                changed.append(entity)
+        return violations, changed
+
+    def update(self, rule_group, rule_name, entities, violations):
+        """ Save the violations of a rule for the entities that were checked. """
+        entity_violations = {entity: [] for entity in entities}
+        for violation in violations:
+            _, entity_name, _ = violation
+            # parameter rules are checked and cached per command
+            entity = entity_name if isinstance(entity_name, str) else entity_name[0]
+            entity_violations[entity].append(violation)
+        cached_results = self._results.setdefault(rule_name, {})
+        for entity, entity_violation_list in entity_violations.items():
+            cached_results[entity] = [self.fingerprint(rule_group, entity), entity_violation_list]
+
+    def save(self):
+        with atomic_write(self._path) as f:
+            json.dump({'version': self._version, 'rules': self._results}, f)
+
+    def fingerprint(self, rule_group, entity):
+        kind = 'command' if rule_group in ('commands', 'params') else rule_group
+        key = (kind, entity)
+        if key not in self._fingerprints:
+            self._fingerprints[key] = _digest(getattr(self, '_{}_parts'.format(kind))(entity))
+        return self._fingerprints[key]
+
+    def _index_names(self):
+        if self._command_names is None:
+            self._command_names = set(self._linter.commands)
+            self._command_group_names = set(self._linter.command_groups)
+            self._group_commands = {}
+            for command_name in sorted(self._command_names):
+                self._group_commands.setdefault(' '.join(command_name.split()[:-1]), []).append(command_name)
+            self._names_digest = _digest(sorted(self._command_names) + ['--'] + sorted(self._command_group_names))
+
+    def _command_parts(self, command_name):
+        linter = self._linter
+        metadata = linter.get_command_metadata(command_name)
+        parts = [
+            command_name,
+            _stable_repr(linter.get_command_help(command_name)),
+            repr(linter.command_expired(command_name)),
+            repr(getattr(metadata, 'supports_no_wait', None)),
+            _stable_repr(self._linter_manager.exclusions.get(command_name))
+        ]
+        for parameter_name in sorted(linter.get_command_parameters(command_name) or []):
+            parts.extend([
+                parameter_name,
+                _stable_repr(linter.get_parameter_settings(command_name, parameter_name)),
+                _stable_repr(linter.get_parameter_help(command_name, parameter_name)),
+                repr(linter.parameter_expired(command_name, parameter_name)),
+                _stable_repr(linter.option_expired(command_name, parameter_name))
+            ])
+        return parts
+
+    def _command_groups_parts(self, command_group_name):
+        linter = self._linter
+        self._index_names()
+        parts = [
+            command_group_name,
+            _stable_repr(linter.get_command_group_help(command_group_name)),
+            repr(linter.command_group_expired(command_group_name)),
+            _stable_repr(self._linter_manager.exclusions.get(command_group_name))
+        ]
+        # rules of a group look at the commands directly in it
+        for command_name in self._group_commands.get(command_group_name, []):
+            metadata = linter.get_command_metadata(command_name)
+            parts.extend([command_name, repr(getattr(metadata, 'supports_no_wait', None))])
+        return parts
+
+    def _help_file_entries_parts(self, entry_name):
+        linter = self._linter
+        self._index_names()
+        parameter_names = linter.get_help_entry_parameter_names(entry_name)
+        examples = linter.get_help_entry_examples(entry_name)
+        parts = [
+            entry_name,
+            self._names_digest,
+            _stable_repr(linter.get_help_entry_type(entry_name)),
+            _stable_repr(examples),
+            _stable_repr(parameter_names),
+            _stable_repr([linter.is_valid_parameter_help_name(entry_name, name) for name in parameter_names]),
+            _stable_repr(self._linter_manager.exclusions.get(entry_name))
+        ]
+        # examples are parsed with the arguments of every command they call
+        referenced = set()
+        for example in examples:
+            referenced.update(self._referenced_commands(example.get('text', '') if isinstance(example, dict) else ''))
+        for command_name in sorted(referenced):
+            parts.extend([command_name, self.fingerprint('commands', command_name)])
+        return parts
+
+    def _referenced_commands(self, text):
+        commands = set()
+        for match in _EXAMPLE_COMMAND_RE.finditer(text):
+            words = []
+            for word in match.group(1).split():
+                if word.startswith('-'):
+                    break
+                words.append(word)
+            # the longest run of words naming a command
+            for end in range(len(words), 0, -1):
+                if ' '.join(words[:end]) in self._command_names:
+                    commands.add(' '.join(words[:end]))
+                    break
+        return commands
+
+
+def get_rule_set_version():
+    """ Fingerprint the linter rules and the versions of azdev and Azure CLI core they run with. """
+    from azdev import __VERSION__
+    try:
+        from azure.cli.core import __version__ as core_version  # pylint: disable=import-error
+    except ImportError:
+        core_version = None
+
+    digest = hashlib.sha256()
+    digest.update('{} {}\n'.format(__VERSION__, core_version).encode())
+    linter_path = os.path.dirname(os.path.abspath(__file__))
+    for root, dirs, files in os.walk(linter_path):
+        dirs.sort()
+        for file_name in sorted(files):
+            if os.path.splitext(file_name)[1] in ('.py', '.yml'):
+                with open(os.path.join(root, file_name), 'rb') as f:
+                    digest.update(os.path.relpath(os.path.join(root, file_name), linter_path).encode())
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _digest(parts):
+    return hashlib.blake2b('\n'.join(parts).encode(), digest_size=8).hexdigest()
+
+
+def _stable_repr(value):
+    """ Represent a value the same way in every process, unlike repr which includes object addresses. """
+    if value is None or isinstance(value, _PRIMITIVES):
+        return repr(value)
+    if isinstance(value, dict):
+        items = sorted((_stable_repr(k), _stable_repr(v)) for k, v in value.items())
+        return '{' + ', '.join('{}: {}'.format(k, v) for k, v in items) + '}'
+    if isinstance(value, (list, tuple)):
+        return '[' + ', '.join(_stable_repr(v) for v in value) + ']'
+    if isinstance(value, (set, frozenset)):
+        return '{' + ', '.join(sorted(_stable_repr(v) for v in value)) + '}'
+    if hasattr(value, '__qualname__'):
+        # functions and classes, such as argument types, validators and actions
+        return '{}.{}'.format(getattr(value, '__module__', ''), value.__qualname__)
+    # other objects, such as Deprecated options, are described by their primitive attributes
+    attributes = {k: v for k, v in getattr(value, '__dict__', {}).items()
+                  if v is None or isinstance(v, _PRIMITIVES)}
+    return '{}({})'.format(type(value).__qualname__,
+                           ', '.join('{}={!r}'.format(k, attributes[k]) for k in sorted(attributes)))
+
+
+def _load_violation(violation):
+    violation_msg, entity_name, rule_name = violation
+    # JSON turns the (command, parameter) tuple of parameter violations into a list
+    return violation_msg, entity_name if isinstance(entity_name, str) else tuple(entity_name), rule_name
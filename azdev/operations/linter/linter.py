@@ -6,19 +6,24 @@
 
 import os
 import inspect
+import time
 from importlib import import_module
 from pkgutil import iter_modules
 from enum import Enum
 import yaml
 from knack.log import get_logger
 
-from azdev.utilities.path import get_cli_repo_path, get_ext_repo_paths
-from .util import share_element, exclude_commands, LinterError
+from azdev.utilities.path import get_cli_repo_path, get_ext_repo_paths, get_name_index
+from .util import LinterError, _get_command_source
 
 
 PACKAGE_NAME = 'azdev.operations.linter'
+CHUNKS_PER_WORKER = 4
 _logger = get_logger(__name__)
 
+# the linter manager running rules in parallel, inherited by the forked pool workers
+_LINTER_MANAGER = None
+
 
 class LinterSeverity(Enum):
     HIGH = 2
@@ -37,7 +42,7 @@ class LinterSeverity(Enum):
         return sorted(LinterSeverity, key=lambda sev: sev.value)
 
 
-class Linter:  # pylint: disable=too-many-public-methods
+class Linter:  # pylint: disable=too-many-public-methods, too-many-instance-attributes
     def __init__(self, command_loader=None, help_file_entries=None, loaded_help=None):
         self._all_yaml_help = help_file_entries
         self._loaded_help = loaded_help
@@ -46,10 +51,26 @@ class Linter:  # pylint: disable=too-many-public-methods
         self._help_file_entries = set(help_file_entries.keys())
         self._command_parser = command_loader.cli_ctx.invocation.parser
         self._command_groups = []
+        self._command_sources = None
+        # indexes built once so that rules look up parameters and their help in constant time
+        self._parameter_settings = {}
+        self._parameter_help_names = {}
+        self._parameter_help_index = {}
         for command_name, command in self._command_loader.command_table.items():
             self._parameters[command_name] = set()
-            for name in command.arguments:
+            self._parameter_settings[command_name] = {}
+            for name, argument in command.arguments.items():
                 self._parameters[command_name].add(name)
+                self._parameter_settings[command_name][name] = argument.type.settings
+        for entry_name, help_entry in (loaded_help or {}).items():
+            parameter_helps = getattr(help_entry, 'parameters', None) or []
+            self._parameter_help_names[entry_name] = {param.name for param in parameter_helps}
+            # map each option to the first parameter help that documents it, along with its position
+            option_index = {}
+            for position, param_help in enumerate(parameter_helps):
+                for option in param_help.name.split():
+                    option_index.setdefault(option, (position, param_help))
+            self._parameter_help_index[entry_name] = option_index
 
     @property
     def commands(self):
@@ -59,7 +80,7 @@ class Linter:  # pylint: disable=too-many-public-methods
     def command_groups(self):
         if not self._command_groups:
             added_command_groups = set()
-            for command_group in self._command_loader.command_group_table.keys():
+            for command_group in self._get_command_group_names():
                 prefix_name = ""
                 for word in command_group.split():
                     prefix_name = "{} {}".format(prefix_name, word).strip()
@@ -108,7 +129,7 @@ class Linter:  # pylint: disable=too-many-public-methods
                 self._all_yaml_help.get(entry_name).get('parameters', [])]
 
     def is_valid_parameter_help_name(self, entry_name, param_name):
-        return param_name in [param.name for param in getattr(self._loaded_help.get(entry_name), 'parameters', [])]
+        return param_name in self._parameter_help_names.get(entry_name, ())
 
     def get_command_help(self, command_name):
         return self._get_loaded_help_description(command_name)
@@ -117,7 +138,7 @@ class Linter:  # pylint: disable=too-many-public-methods
         return self._get_loaded_help_description(command_group_name)
 
     def get_parameter_options(self, command_name, parameter_name):
-        return self.get_command_metadata(command_name).arguments.get(parameter_name).type.settings.get('options_list')
+        return self.get_parameter_settings(command_name, parameter_name).get('options_list')
 
     def get_parameter_help(self, command_name, parameter_name):
         options = self.get_parameter_options(command_name, parameter_name)
@@ -126,16 +147,18 @@ class Linter:  # pylint: disable=too-many-public-methods
         if not command_help:
             return None
 
-        parameter_helps = command_help.parameters
-        param_help = next((param for param in parameter_helps if share_element(options, param.name.split())), None)
+        # the first parameter help, in help order, documenting any of the options
+        option_index = self._parameter_help_index.get(command_name, {})
+        matches = [option_index[option] for option in options or []
+                   if isinstance(option, str) and option in option_index]
+        param_help = min(matches, key=lambda match: match[0])[1] if matches else None
         # workaround for --ids which is not does not generate doc help (BUG)
         if not param_help:
-            command_args = self._command_loader.command_table.get(command_name).arguments
-            return command_args.get(parameter_name).type.settings.get('help')
+            return self.get_parameter_settings(command_name, parameter_name).get('help')
         return param_help.short_summary or param_help.long_summary
 
     def get_parameter_settings(self, command_name, parameter_name):
-        return self.get_command_metadata(command_name).arguments.get(parameter_name).type.settings
+        return self._parameter_settings[command_name][parameter_name]
 
     def command_expired(self, command_name):
         deprecate_info = self._command_loader.command_table[command_name].deprecate_info
@@ -158,7 +181,7 @@ class Linter:  # pylint: disable=too-many-public-methods
         return False
 
     def parameter_expired(self, command_name, parameter_name):
-        parameter = self._command_loader.command_table[command_name].arguments[parameter_name].type.settings
+        parameter = self.get_parameter_settings(command_name, parameter_name)
         deprecate_info = parameter.get('deprecate_info', None)
         if deprecate_info:
             return deprecate_info.expired()
@@ -166,7 +189,7 @@ class Linter:  # pylint: disable=too-many-public-methods
 
     def option_expired(self, command_name, parameter_name):
         from knack.deprecation import Deprecated
-        parameter = self._command_loader.command_table[command_name].arguments[parameter_name].type.settings
+        parameter = self.get_parameter_settings(command_name, parameter_name)
         options_list = parameter.get('options_list', [])
         expired_options_list = []
         for opt in options_list:
@@ -174,6 +197,33 @@ class Linter:  # pylint: disable=too-many-public-methods
                 expired_options_list.append(opt.target)
         return expired_options_list
 
+    def without_modules(self, modules, name_index):
+        """ Return a view of the linter without the commands of certain modules/extensions.
+
+        :param modules: [str] list of module or extension names to exclude.
+        :param name_index: dict of the long name of each module and extension, by short name.
+        """
+        if self._command_sources is None:
+            self._command_sources = {}
+            for command_name in self.commands:
+                try:
+                    self._command_sources[command_name], _ = _get_command_source(
+                        command_name, self._command_loader.command_table)
+                except LinterError as ex:
+                    # command is unrecognized
+                    _logger.warning(ex)
+                    self._command_sources[command_name] = None
+
+        excluded_commands = set()
+        for command_name in self.commands:
+            source_name = self._command_sources[command_name]
+            if source_name in name_index and (source_name in modules or name_index[source_name] in modules):
+                excluded_commands.add(command_name)
+        return LinterView(self, excluded_commands)
+
+    def _get_command_group_names(self):
+        return self._command_loader.command_group_table.keys()
+
     def _get_loaded_help_description(self, entry):
         help_entry = self._loaded_help.get(entry, None)
         if help_entry:
@@ -181,28 +231,72 @@ class Linter:  # pylint: disable=too-many-public-methods
         return help_entry
 
 
+class LinterView(Linter):
+    """
+    Linter without some of the commands of another linter. The view shares the command table, help and
+    indexes of that linter instead of copying them.
+    """
+    def __init__(self, linter, excluded_commands):  # pylint: disable=super-init-not-called
+        self.__dict__.update(vars(linter))
+        self._excluded_commands = excluded_commands
+        self._commands = {name: None for name in linter.commands if name not in excluded_commands}.keys()
+        # groups without any remaining command directly in them are excluded too
+        retained_command_groups = {' '.join(name.split(' ')[:-1]) for name in self._commands}
+        self._excluded_command_groups = set(linter._get_command_group_names()) - retained_command_groups  # pylint: disable=protected-access
+        self._help_file_entries = linter.help_file_entries - excluded_commands - self._excluded_command_groups
+        self._command_groups = []
+
+    @property
+    def commands(self):
+        return self._commands
+
+    def get_command_metadata(self, command_name):
+        if command_name in self._excluded_commands:
+            return None
+        return super().get_command_metadata(command_name)
+
+    def get_command_parameters(self, command_name):
+        if command_name in self._excluded_commands:
+            return None
+        return super().get_command_parameters(command_name)
+
+    def get_command_group_metadata(self, command_group_name):
+        if command_group_name in self._excluded_command_groups:
+            return None
+        return super().get_command_group_metadata(command_group_name)
+
+    def _get_command_group_names(self):
+        return [name for name in super()._get_command_group_names() if name not in self._excluded_command_groups]
+
+
 # pylint: disable=too-many-instance-attributes
 class LinterManager:
 
     _RULE_TYPES = {'help_file_entries', 'command_groups', 'commands', 'params'}
 
     def __init__(self, command_loader=None, help_file_entries=None, loaded_help=None, exclusions=None,
-                 rule_inclusions=None, use_ci_exclusions=None, min_severity=None, update_global_exclusion=None):
+                 rule_inclusions=None, use_ci_exclusions=None, min_severity=None, update_global_exclusion=None,
+                 workers=1, use_cache=False):
         # default to running only rules of the highest severity
         self.min_severity = min_severity or LinterSeverity.get_ordered_members()[-1]
         self.linter = Linter(command_loader=command_loader, help_file_entries=help_file_entries,
                              loaded_help=loaded_help)
+        self._main_linter = self.linter
+        self._linter_views = {}
+        self._name_index = None
         self._exclusions = exclusions or {}
         self._rules = {rule_type: {} for rule_type in LinterManager._RULE_TYPES}  # initialize empty rules
         self._ci_exclusions = {}
         self._rule_inclusions = rule_inclusions
-        self._loaded_help = loaded_help
-        self._command_loader = command_loader
-        self._help_file_entries = help_file_entries
         self._exit_code = 0
         self._ci = use_ci_exclusions if use_ci_exclusions is not None else os.environ.get('CI', False)
         self._violiations = {}
         self._update_global_exclusion = update_global_exclusion
+        self._workers = workers or 1
+        self._use_cache = use_cache
+        self._cache = None
+        self._rule_timings = {}
+        self._rule_results = []
 
     def add_rule(self, rule_type, rule_name, rule_callable, rule_severity):
         include_rule = not self._rule_inclusions or rule_name in self._rule_inclusions
@@ -211,17 +305,20 @@ class LinterManager:
                 # if a rule has exclusions return a linter that factors in those exclusions
                 # otherwise return the main linter.
                 if rule_name in self._ci_exclusions and self._ci:
-                    mod_exclusions = self._ci_exclusions[rule_name]
-                    command_loader, help_file_entries = exclude_commands(
-                        self._command_loader,
-                        self._help_file_entries,
-                        mod_exclusions)
-                    return Linter(command_loader=command_loader, help_file_entries=help_file_entries,
-                                  loaded_help=self._loaded_help)
+                    return self._get_linter_without_modules(self._ci_exclusions[rule_name])
                 return self.linter
 
             self._rules[rule_type][rule_name] = rule_callable, get_linter, rule_severity
 
+    def _get_linter_without_modules(self, modules):
+        # rules excluding the same modules share a view, and the name index is only globbed once
+        key = tuple(sorted(modules))
+        if key not in self._linter_views:
+            if self._name_index is None:
+                self._name_index = get_name_index()
+            self._linter_views[key] = self._main_linter.without_modules(modules, self._name_index)
+        return self._linter_views[key]
+
     def mark_rule_failure(self, rule_severity):
         if rule_severity is LinterSeverity.HIGH:
             self._exit_code = 1
@@ -234,6 +331,15 @@ class LinterManager:
     def exit_code(self):
         return self._exit_code
 
+    @property
+    def rule_results(self):
+        """ The results of the rules checked by the last run, in the order they were run.
+
+        :returns: list of dicts with the rule name, type and severity, the seconds spent checking the rule and its
+        violations.
+        """
+        return self._rule_results
+
     def run(self, run_params=None, run_commands=None, run_command_groups=None, run_help_files_entries=None):
         paths = import_module('{}.rules'.format(PACKAGE_NAME)).__path__
 
@@ -254,18 +360,29 @@ class LinterManager:
                     found_rules.add(rule_name)
                     add_to_linter_func(self)
 
+        if self._use_cache:
+            from .cache import LinterCache
+            self._cache = LinterCache(self)
+
         # run all rule-checks
-        if run_help_files_entries and self._rules.get('help_file_entries'):
-            self._run_rules('help_file_entries')
+        pool = self._create_pool()
+        try:
+            if run_help_files_entries and self._rules.get('help_file_entries'):
+                self._run_rules('help_file_entries', pool)
 
-        if run_command_groups and self._rules.get('command_groups'):
-            self._run_rules('command_groups')
+            if run_command_groups and self._rules.get('command_groups'):
+                self._run_rules('command_groups', pool)
 
-        if run_commands and self._rules.get('commands'):
-            self._run_rules('commands')
+            if run_commands and self._rules.get('commands'):
+                self._run_rules('commands', pool)
 
-        if run_params and self._rules.get('params'):
-            self._run_rules('params')
+            if run_params and self._rules.get('params'):
+                self._run_rules('params', pool)
+        finally:
+            self._close_pool(pool)
+
+        if self._cache:
+            self._cache.save()
 
         if not self.exit_code:
             print(os.linesep + 'No violations found for linter rules.')
@@ -290,37 +407,124 @@ class LinterManager:
 
         return self.exit_code
 
-    def _run_rules(self, rule_group):
+    def _run_rules(self, rule_group, pool=None):
         # https://docs.microsoft.com/en-us/windows/console/console-virtual-terminal-sequences#text-formatting
         RED = '\x1b[31m'
         GREEN = '\x1b[32m'
         YELLOW = '\x1b[33m'
         CYAN = '\x1b[36m'
         RESET = '\x1b[39m'
-        for rule_name, (rule_func, linter_callable, rule_severity) in self._rules.get(rule_group).items():
+        # if the rule's severity is lower than the linter's severity skip it.
+        rule_names = [rule_name for rule_name, (_, _, rule_severity) in self._rules.get(rule_group).items()
+                      if self._linter_severity_is_applicable(rule_severity, rule_name)]
+        results = self._check_rules(rule_group, rule_names, pool)
+
+        for rule_name in rule_names:
+            _, _, rule_severity = self._rules[rule_group][rule_name]
             severity_str = rule_severity.name
+            violations = results[rule_name]
+            self._rule_results.append({
+                'rule': rule_name,
+                'rule_type': rule_group,
+                'severity': rule_severity,
+                'duration': self._rule_timings[rule_name],
+                'violations': violations
+            })
+            _logger.info('Rule %s checked in %.3f sec', rule_name, self._rule_timings[rule_name])
+            if violations:
+                if rule_severity == LinterSeverity.HIGH:
+                    sev_color = RED
+                elif rule_severity == LinterSeverity.MEDIUM:
+                    sev_color = YELLOW
+                else:
+                    sev_color = CYAN
+
+                # pylint: disable=duplicate-string-formatting-argument
+                print('- {} FAIL{} - {}{}{} severity: {}'.format(RED, RESET, sev_color,
+                                                                 severity_str, RESET, rule_name,))
+                for violation_msg, entity_name, name in violations:
+                    print(violation_msg)
+                    self._save_violations(entity_name, name)
+                print()
+            else:
+                print('- {} pass{}: {} '.format(GREEN, RESET, rule_name))
+
+    def _check_rules(self, rule_group, rule_names, pool=None):
+        """ Check the rules of a group, in the worker pool if given, reusing cached results of unchanged entities.
+
+        With a pool, the entities checked by each rule are split into chunks checked concurrently. The
+        violations of each rule are merged and sorted, so the result is the same as a serial run. The time
+        spent checking each rule, summed over its chunks, is recorded in `_rule_timings`.
+
+        :returns: dict of the sorted violations of each rule.
+        """
+        results = {}
+        checked = {}
+        tasks = []
+        chunk_count = self._workers * CHUNKS_PER_WORKER
+        for rule_name in rule_names:
+            rule_func, linter_callable, _ = self._rules[rule_group][rule_name]
             # use new linter if needed
             with LinterScope(self, linter_callable):
-                # if the rule's severity is lower than the linter's severity skip it.
-                if self._linter_severity_is_applicable(rule_severity, rule_name):
-                    violations = sorted(rule_func()) or []
-                    if violations:
-                        if rule_severity == LinterSeverity.HIGH:
-                            sev_color = RED
-                        elif rule_severity == LinterSeverity.MEDIUM:
-                            sev_color = YELLOW
-                        else:
-                            sev_color = CYAN
-
-                        # pylint: disable=duplicate-string-formatting-argument
-                        print('- {} FAIL{} - {}{}{} severity: {}'.format(RED, RESET, sev_color,
-                                                                         severity_str, RESET, rule_name,))
-                        for violation_msg, entity_name, name in violations:
-                            print(violation_msg)
-                            self._save_violations(entity_name, name)
-                        print()
-                    else:
-                        print('- {} pass{}: {} '.format(GREEN, RESET, rule_name))
+                # parameter rules are checked per command
+                entities = list(self.linter.commands if rule_group == 'params' else getattr(self.linter, rule_group))
+                results[rule_name] = []
+                if self._cache:
+                    entity_count = len(entities)
+                    results[rule_name], entities = self._cache.lookup(rule_group, rule_name, entities)
+                    _logger.info('Rule %s: reusing cached results of %i entities, checking %i',
+                                 rule_name, entity_count - len(entities), len(entities))
+                checked[rule_name] = entities
+                self._rule_timings[rule_name] = 0.0
+                if pool:
+                    tasks.extend((rule_group, rule_name, entities[index::chunk_count])
+                                 for index in range(chunk_count) if entities[index::chunk_count])
+                else:
+                    start = time.perf_counter()
+                    violations = list(rule_func(entities))
+                    self._rule_timings[rule_name] = time.perf_counter() - start
+                    results[rule_name].extend(violations)
+                    if self._cache:
+                        self._cache.update(rule_group, rule_name, entities, violations)
+
+        if pool:
+            new_violations = {rule_name: [] for rule_name in rule_names}
+            for rule_name, violations, duration in pool.imap_unordered(_check_rule_chunk, tasks):
+                new_violations[rule_name].extend(violations)
+                self._rule_timings[rule_name] += duration
+            for rule_name in rule_names:
+                results[rule_name].extend(new_violations[rule_name])
+                if self._cache:
+                    self._cache.update(rule_group, rule_name, checked[rule_name], new_violations[rule_name])
+
+        for rule_name in rule_names:
+            results[rule_name].sort()
+            if results[rule_name]:
+                # failures found by workers or replayed from the cache have not been marked yet
+                self.mark_rule_failure(self._rules[rule_group][rule_name][2])
+        return results
+
+    def _create_pool(self):
+        global _LINTER_MANAGER  # pylint: disable=global-statement
+        if self._workers <= 1:
+            return None
+        import multiprocessing
+        try:
+            context = multiprocessing.get_context('fork')
+        except ValueError:
+            _logger.warning('Running linter rules in parallel requires os.fork, which is not available on this '
+                            'platform. Running them serially.')
+            return None
+        # workers inherit the loaded command table and the rules from this process when forked
+        _LINTER_MANAGER = self
+        return context.Pool(processes=self._workers)
+
+    @staticmethod
+    def _close_pool(pool):
+        global _LINTER_MANAGER  # pylint: disable=global-statement
+        if pool:
+            pool.terminate()
+            _LINTER_MANAGER = None
 
     def _linter_severity_is_applicable(self, rule_severity, rule_name):
         if self.min_severity.value > rule_severity.value:
@@ -361,3 +565,16 @@ class LinterScope:
 
     def __exit__(self, exc_type, value, traceback):
         self.linter_manager.linter = self.main_linter
+
+
+def _check_rule_chunk(task):
+    """ Check one chunk of the entities of a rule in a pool worker.
+
+    :returns: (str, list, float) the name of the rule, its violations in the chunk and the seconds spent checking it.
+    """
+    rule_group, rule_name, entities = task
+    rule_func, linter_callable, _ = _LINTER_MANAGER._rules[rule_group][rule_name]  # pylint: disable=protected-access
+    with LinterScope(_LINTER_MANAGER, linter_callable):
+        start = time.perf_counter()
+        violations = list(rule_func(entities))
+        return rule_name, violations, time.perf_counter() - start
@@ -9,6 +9,7 @@ from pylint.checkers import BaseChecker
 from pylint.interfaces import IAstroidChecker
 
 
+# `azdev linter` runs the same check with show_command_check of azdev.operations.linter.source_checks
 class ShowCommandChecker(BaseChecker):
     __implements__ = IAstroidChecker
 
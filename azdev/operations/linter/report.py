@@ -0,0 +1,133 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+""" Machine-readable reports of linter results, in JSON or SARIF format. """
+
+import json
+import os
+
+from azdev.utilities import make_dirs
+
+from .linter import LinterSeverity
+
+
+REPORT_FORMATS = ['json', 'sarif']
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+TOOL_URI = 'https://github.com/Azure/azure-cli-dev-tools'
+
+# name of the entity checked by each type of rule
+_ENTITY_KEYS = {
+    'help_file_entries': 'help_entry',
+    'command_groups': 'command_group',
+    'commands': 'command',
+    'params': 'command'
+}
+_SARIF_LEVELS = {
+    LinterSeverity.HIGH: 'error',
+    LinterSeverity.MEDIUM: 'warning',
+    LinterSeverity.LOW: 'note'
+}
+
+
+def get_json_report(rule_results, exit_code=0):
+    """ Describe the rules checked by the linter, the seconds spent in each and their violations. """
+    from azdev import __VERSION__
+    rules, violations = [], []
+    for result in rule_results:
+        rules.append({
+            'rule': result['rule'],
+            'rule_type': result['rule_type'],
+            'severity': _severity_name(result['severity']),
+            'duration': round(result['duration'], 6),
+            'violations': len(result['violations'])
+        })
+        for violation_msg, entity_name, _ in result['violations']:
+            violation = {
+                'rule': result['rule'],
+                'rule_type': result['rule_type'],
+                'severity': _severity_name(result['severity'])
+            }
+            violation.update(_get_entity(result['rule_type'], entity_name))
+            violation['message'] = violation_msg.strip()
+            violations.append(violation)
+    return {
+        'version': __VERSION__,
+        'passed': not exit_code,
+        'rules': rules,
+        'violations': violations
+    }
+
+
+def get_sarif_report(rule_results, exit_code=0):
+    """ Describe the linter results as a SARIF 2.1.0 log, with the seconds spent in each rule as a rule property. """
+    from azdev import __VERSION__
+    rules, results = [], []
+    for rule_index, result in enumerate(rule_results):
+        level = _SARIF_LEVELS[result['severity']]
+        rules.append({
+            'id': result['rule'],
+            'name': result['rule'],
+            'defaultConfiguration': {'level': level},
+            'properties': {
+                'ruleType': result['rule_type'],
+                'severity': _severity_name(result['severity']),
+                'duration': round(result['duration'], 6)
+            }
+        })
+        for violation_msg, entity_name, _ in result['violations']:
+            entity = _get_entity(result['rule_type'], entity_name)
+            logical_location = {'name': entity.get('parameter', entity_name),
+                                'kind': 'parameter' if 'parameter' in entity else _ENTITY_KEYS[result['rule_type']]}
+            if 'parameter' in entity:
+                logical_location['fullyQualifiedName'] = '{} {}'.format(entity['command'], entity['parameter'])
+            else:
+                logical_location['fullyQualifiedName'] = entity_name
+            results.append({
+                'ruleId': result['rule'],
+                'ruleIndex': rule_index,
+                'level': level,
+                'message': {'text': violation_msg.strip()},
+                'locations': [{'logicalLocations': [logical_location]}]
+            })
+    return {
+        '$schema': SARIF_SCHEMA,
+        'version': '2.1.0',
+        'runs': [{
+            'tool': {
+                'driver': {
+                    'name': 'azdev linter',
+                    'version': __VERSION__,
+                    'informationUri': TOOL_URI,
+                    'rules': rules
+                }
+            },
+            # the linter ran to completion whether or not it found violations, which the results carry
+            'invocations': [{'executionSuccessful': True, 'exitCode': exit_code}],
+            'results': results
+        }]
+    }
+
+
+def write_report(rule_results, report_format, path, exit_code=0):
+    """ Save the linter results to a file in the given report format. """
+    if report_format == 'sarif':
+        report = get_sarif_report(rule_results, exit_code)
+    else:
+        report = get_json_report(rule_results, exit_code)
+    make_dirs(os.path.dirname(os.path.abspath(path)))
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def _get_entity(rule_type, entity_name):
+    if rule_type == 'params':
+        command_name, parameter_name = entity_name
+        return {'command': command_name, 'parameter': parameter_name}
+    return {_ENTITY_KEYS[rule_type]: entity_name}
+
+
+def _severity_name(severity):
+    return severity.name.lower()
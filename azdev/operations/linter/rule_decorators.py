@@ -43,10 +43,10 @@ class ParameterRule(BaseRule):
 
     def __call__(self, func):
         def add_to_linter(linter_manager):
-            def wrapper():
+            def wrapper(command_names=None):
                 linter = linter_manager.linter
 
-                for command_name in linter.commands:
+                for command_name in linter.commands if command_names is None else command_names:
                     for parameter_name in linter.get_command_parameters(command_name):
                         exclusion_parameters = linter_manager.exclusions.get(command_name, {}).get('parameters', {})
                         exclusions = exclusion_parameters.get(parameter_name, {}).get('rule_exclusions', [])
@@ -66,10 +66,10 @@ class ParameterRule(BaseRule):
 
 def _get_decorator(func, rule_group, print_format, severity):
     def add_to_linter(linter_manager):
-        def wrapper():
+        def wrapper(entities=None):
             linter = linter_manager.linter
 
-            for iter_entity in getattr(linter, rule_group):
+            for iter_entity in getattr(linter, rule_group) if entities is None else entities:
                 exclusions = linter_manager.exclusions.get(iter_entity, {}).get('rule_exclusions', [])
                 if func.__name__ not in exclusions:
                     try:
@@ -7,6 +7,7 @@
 import shlex
 
 import re
+import weakref
 from unittest import mock
 
 from knack.log import get_logger
@@ -27,6 +28,9 @@ _CMD_SUB_2 = re.compile("`\s*" + "(" + _az_pattern + ")" + "`")  # noqa: W605
 
 logger = get_logger(__name__)
 
+# results of the example commands linted with each parser, by command
+_EXAMPLE_RESULTS = weakref.WeakKeyDictionary()
+
 
 @HelpFileEntryRule(LinterSeverity.HIGH)
 def unrecognized_help_entry_rule(linter, help_entry):
@@ -72,29 +76,34 @@ def faulty_help_example_rule(linter, help_entry):
 def faulty_help_example_parameters_rule(linter, help_entry):
     parser = linter.command_parser
     violations = []
-
-    for example in linter.get_help_entry_examples(help_entry):
-        supported_profiles = example.get('supported-profiles')
-        if supported_profiles and 'latest' not in supported_profiles:
-            logger.warning("\n\tSKIPPING example: %s\n\tas 'latest' is not in its supported profiles."
-                           "\n\t\tsupported-profiles: %s.", example['text'], example['supported-profiles'])
-            continue
-
-        unsupported_profiles = example.get('unsupported-profiles')
-        if unsupported_profiles and 'latest' in unsupported_profiles:
-            logger.warning("\n\tSKIPPING example: %s\n\tas 'latest' is in its unsupported profiles."
-                           "\n\t\tunsupported-profiles: %s.", example['text'], example['unsupported-profiles'])
-            continue
-
-        example_text = example.get('text', '')
-        commands = _extract_commands_from_example(example_text)
-        while commands:
-            command = commands.pop()
-            violation, nested_commands = _lint_example_command(command, parser)
-
-            commands.extend(nested_commands)  # append commands that are the source of any arguments
-            if violation:
-                violations.append(violation)
+    results = _EXAMPLE_RESULTS.setdefault(parser, {})
+
+    with _ExampleParserPatches():
+        for example in linter.get_help_entry_examples(help_entry):
+            supported_profiles = example.get('supported-profiles')
+            if supported_profiles and 'latest' not in supported_profiles:
+                logger.warning("\n\tSKIPPING example: %s\n\tas 'latest' is not in its supported profiles."
+                               "\n\t\tsupported-profiles: %s.", example['text'], example['supported-profiles'])
+                continue
+
+            unsupported_profiles = example.get('unsupported-profiles')
+            if unsupported_profiles and 'latest' in unsupported_profiles:
+                logger.warning("\n\tSKIPPING example: %s\n\tas 'latest' is in its unsupported profiles."
+                               "\n\t\tunsupported-profiles: %s.", example['text'], example['unsupported-profiles'])
+                continue
+
+            example_text = example.get('text', '')
+            commands = _extract_commands_from_example(example_text)
+            while commands:
+                command = commands.pop()
+                if command not in results:
+                    # identical commands, such as nested ones, are often repeated across examples
+                    results[command] = _lint_example_command(command, parser)
+                violation, nested_commands = results[command]
+
+                commands.extend(nested_commands)  # append commands that are the source of any arguments
+                if violation:
+                    violations.append(violation)
 
     if violations:
         num_err = len(violations)
@@ -106,15 +115,47 @@ def faulty_help_example_parameters_rule(linter, help_entry):
 
 # Faulty help example parameters rule helpers
 
-@mock.patch("azure.cli.core.parser.AzCliCommandParser._check_value")
-@mock.patch("argparse.ArgumentParser._get_value")
-@mock.patch("azure.cli.core.parser.AzCliCommandParser.error")
-def _lint_example_command(command, parser, mocked_error_method, mocked_get_value, mocked_check_value):  # pylint: disable=unused-argument
-    def get_value_side_effect(action, arg_string):  # pylint: disable=unused-argument
-        return arg_string
-    mocked_error_method.side_effect = LinterError  # mock call of parser.error so usage won't be printed.
-    mocked_get_value.side_effect = get_value_side_effect
+class _ExampleParseError(LinterError):
+    """ Raised instead of exiting when the parser fails to parse an example command. """
+
+
+def _raise_parse_error(self, message):  # pylint: disable=unused-argument
+    raise _ExampleParseError(message)
+
+
+def _get_value(self, action, arg_string):  # pylint: disable=unused-argument
+    return arg_string
+
+
+def _check_value(self, action, value):  # pylint: disable=unused-argument
+    pass
+
+
+class _ExampleParserPatches:
+    """
+    Patch the parser to only check the structure of example commands: argument values are taken as is, and parsing
+    errors are raised so usage won't be printed. The patches are plain functions, installed once for all the
+    examples of a help entry.
+    """
+    def __init__(self):
+        self._patches = [
+            mock.patch("azure.cli.core.parser.AzCliCommandParser._check_value", _check_value),
+            mock.patch("argparse.ArgumentParser._get_value", _get_value),
+            mock.patch("azure.cli.core.parser.AzCliCommandParser.error", _raise_parse_error)
+        ]
+
+    def __enter__(self):
+        for patch in self._patches:
+            patch.start()
+        return self
+
+    def __exit__(self, exc_type, value, traceback):
+        for patch in reversed(self._patches):
+            patch.stop()
+
 
+def _lint_example_command(command, parser):
+    """ Parse an example command with the parser patched by `_ExampleParserPatches`. """
     violation = None
     nested_commands = []
 
@@ -129,11 +170,10 @@ def _lint_example_command(command, parser, mocked_error_method, mocked_get_value
                         'If needed, you can escape the "\\", like so "\\\\"'.format(command)
         else:
             raise e
-    except LinterError:  # handle parsing failure due to invalid option
+    except LinterError as e:  # handle parsing failure due to invalid option
         violation = '\t"{}" is not a valid command'.format(command)
-        if mocked_error_method.called:
-            call_args = mocked_error_method.call_args
-            violation = "{}.\n\t{}".format(violation, call_args[0][0])
+        if isinstance(e, _ExampleParseError):
+            violation = "{}.\n\t{}".format(violation, e)
 
     return violation, nested_commands
 
@@ -0,0 +1,194 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+""" Checks of the command registrations in `commands.py` files, scanned with `ast` rather than pylint.
+
+Only files that changed since the last scan are parsed again, in parallel. The violations of the others
+are replayed from a cache keyed on the size, modification time and content hash of each file.
+"""
+
+import ast
+import json
+import os
+import re
+import time
+
+from knack.log import get_logger
+
+from azdev.utilities import (
+    atomic_write, get_azdev_config_dir, get_file_fingerprint, get_source_version, is_file_untouched)
+
+
+logger = get_logger(__name__)
+
+CACHE_FILE = 'source_checks_cache.json'
+COMMAND_FILES = ('commands.py',)
+# parsing a few files is faster than starting worker processes
+MIN_PARALLEL_FILES = 16
+
+# pylint comments disabling messages, which suppress the messages they name on the line they are on
+_DISABLE_REGEX = re.compile(r'#\s*pylint:\s*disable(?P<next>-next)?\s*=\s*(?P<names>[\w\-]+(?:\s*,\s*[\w\-]+)*)')
+
+# the ids match those of the custom pylint checkers so that exclusions and results are interchangeable
+MESSAGES = {
+    'show-command': ('E5001', 'Show command must use show_command or custom_show_command.')
+}
+
+
+def show_command_check(node):
+    """ Registering a `show` command must use show_command or custom_show_command. """
+    if isinstance(node.func, ast.Attribute) and node.func.attr in ('command', 'custom_command') and \
+            node.args and _get_constant_value(node.args[0]) == 'show':
+        return 'show-command'
+    return None
+
+
+# checks run on every call in a command file, returning the symbol of the violated message, if any, along
+# with the snippets a file must contain for the check to apply. Files without any are not parsed.
+CALL_CHECKS = [
+    (show_command_check, (b"'show'", b'"show"'))
+]
+
+
+def check_command_sources(paths, workers=None):
+    """ Check the command registrations of the `commands.py` files under the given module paths.
+
+    :param paths: [str] paths of the modules or extensions to check.
+    :param workers: int number of processes to parse changed files with. Defaults to the CPU count.
+    Violations are suppressed by a `# pylint: disable` comment naming the message on a line of the call, or a
+    `# pylint: disable-next` comment on the line before it. Other suppressions belong in `linter_exclusions.yml`.
+
+    :returns: list of (path, line, column, symbol) violations, sorted by path and position.
+    """
+    start = time.time()
+    files = find_command_files(paths)
+    version = get_checks_version()
+    cache = _read_cache(version)
+
+    fingerprints, violations, changed = {}, [], []
+    for path in files:
+        entry = cache.get(path)
+        if is_file_untouched(entry, os.stat(path)):
+            fingerprints[path] = entry
+            violations.extend(tuple([path] + violation) for violation in entry['violations'])
+        else:
+            changed.append((path, entry))
+
+    for path, fingerprint, file_violations in _scan_files(changed, workers):
+        fingerprint['violations'] = [list(violation) for violation in file_violations]
+        fingerprints[path] = fingerprint
+        violations.extend((path,) + tuple(violation) for violation in file_violations)
+
+    # entries of the modules that were not selected are kept, so the cache builds up across selections
+    roots = tuple(os.path.join(os.path.abspath(path), '') for path in paths)
+    removed = [path for path in cache if path not in fingerprints and path.startswith(roots)]
+    if changed or removed:
+        for path in removed:
+            del cache[path]
+        cache.update(fingerprints)
+        _write_cache(version, cache)
+    logger.info('Checked %i command files, %i changed, in %.3f sec', len(files), len(changed), time.time() - start)
+    return sorted(violations)
+
+
+def find_command_files(paths):
+    files = []
+    for path in paths:
+        for root, dirs, file_names in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if d not in ('tests', '__pycache__') and not d.startswith('.'))
+            files.extend(os.path.abspath(os.path.join(root, f)) for f in sorted(file_names) if f in COMMAND_FILES)
+    return files
+
+
+def format_violation(violation):
+    path, line, column, symbol = violation
+    msg_id, message = MESSAGES[symbol]
+    return '{}:{}:{}: {}: {} ({})'.format(path, line, column, msg_id, message, symbol)
+
+
+def get_checks_version():
+    """ Violations are replayed only while the checks and the Python version parsing the files are the same. """
+    return get_source_version(__file__)
+
+
+def _scan_files(changed, workers=None):
+    if len(changed) < MIN_PARALLEL_FILES or workers == 1:
+        return [_scan_file(task) for task in changed]
+
+    import multiprocessing
+    with multiprocessing.Pool(processes=workers) as pool:
+        return pool.map(_scan_file, changed, chunksize=max(1, len(changed) // (4 * (workers or os.cpu_count()))))
+
+
+def _scan_file(task):
+    """ Check a single command file, in a pool worker when many files changed. The cached violations of a file
+    are kept when only its modification time changed.
+
+    :returns: (str, dict, list) the path and fingerprint of the file, and its violations as (line, column, symbol).
+    """
+    path, cached_entry = task
+    source, fingerprint = get_file_fingerprint(path)
+    if cached_entry and cached_entry['sha'] == fingerprint['sha']:
+        return path, fingerprint, [tuple(v) for v in cached_entry['violations']]
+
+    violations = []
+    checks = [check for check, snippets in CALL_CHECKS if any(snippet in source for snippet in snippets)]
+    tree = None
+    if checks:
+        try:
+            tree = ast.parse(source, filename=path)
+        except (SyntaxError, ValueError) as ex:
+            logger.warning('Unable to parse %s: %s', path, ex)
+    if tree is not None:
+        lines = None
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.Call):
+                continue
+            for symbol in (check(node) for check in checks):
+                if not symbol:
+                    continue
+                lines = lines or source.decode('utf-8', 'replace').splitlines()
+                if not _is_disabled(lines, node, symbol):
+                    violations.append((node.lineno, node.col_offset, symbol))
+    return path, fingerprint, sorted(violations)
+
+
+def _is_disabled(lines, node, symbol):
+    """ Whether a violation is suppressed by a comment on the lines of its call, or on the line before it. """
+    first_line = node.lineno
+    last_line = getattr(node, 'end_lineno', None) or first_line
+    for line_number in range(max(first_line - 1, 1), min(last_line, len(lines)) + 1):
+        for match in _DISABLE_REGEX.finditer(lines[line_number - 1]):
+            if bool(match.group('next')) != (line_number < first_line):
+                continue
+            names = {name.strip() for name in match.group('names').split(',')}
+            if names & {symbol, MESSAGES[symbol][0], 'all'}:
+                return True
+    return False
+
+
+def _get_constant_value(node):
+    if isinstance(node, ast.Constant):
+        return node.value
+    # string literals are parsed as ast.Str before Python 3.8
+    return getattr(node, 's', None) if type(node).__name__ == 'Str' else None
+
+
+def _read_cache(version):
+    path = os.path.join(get_azdev_config_dir(), CACHE_FILE)
+    try:
+        with open(path, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != version:
+        return {}
+    return cache.get('files', {})
+
+
+def _write_cache(version, files):
+    with atomic_write(os.path.join(get_azdev_config_dir(), CACHE_FILE)) as f:
+        json.dump({'version': version, 'files': files}, f)
@@ -29,17 +29,6 @@ def filter_modules(command_loader, help_file_entries, modules=None, include_whl_
                         include_whl_extensions=include_whl_extensions)
 
 
-def exclude_commands(command_loader, help_file_entries, module_exclusions, include_whl_extensions=False):
-    """ Modify the command table and help entries to exclude certain modules/extensions.
-
-    : param command_loader: The CLICommandsLoader containing the command table to filter.
-    : help_file_entries: The dict of HelpFile entries to filter.
-    : modules: [str] list of module or extension names to remove.
-    """
-    return _filter_mods(command_loader, help_file_entries, modules=module_exclusions, exclude=True,
-                        include_whl_extensions=include_whl_extensions)
-
-
 def _filter_mods(command_loader, help_file_entries, modules=None, exclude=False, include_whl_extensions=False):
     modules = modules or []
 
@@ -81,10 +70,6 @@ def _filter_mods(command_loader, help_file_entries, modules=None, exclude=False,
     return command_loader, help_file_entries
 
 
-def share_element(first_iter, second_iter):
-    return any(element in first_iter for element in second_iter)
-
-
 def _get_command_source(command_name, command_table):
     from azure.cli.core.commands import ExtensionCommandSource  # pylint: disable=import-error
     command = command_table.get(command_name)
@@ -0,0 +1,634 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+import functools
+import json
+import os
+import sys
+import timeit
+
+from knack.log import get_logger
+from knack.util import CLIError
+
+from azdev.utilities import (
+    atomic_write, display, heading, subheading, cmd, py_cmd, require_azure_cli, get_azdev_config_dir)
+
+from .import_time import parse_load_time_output, summarize_imports, slowest_imports
+from .stats import describe, detect_regression, median, median_ci
+
+logger = get_logger(__name__)
+
+TOTAL = 'ALL'
+TOTAL_THRESHOLD = 300
+DEFAULT_THRESHOLD = 10
+THRESHOLDS = {
+    # threshold value: num of exceptions allowed
+    50: 2,
+    40: 3
+}
+CO_SCHEDULING_TOLERANCE = 10  # percent
+LOAD_TIME_BASELINE_FILE = 'load_time_baseline.json'
+MIN_BASELINE_RUNS = 10
+BENCHMARK_TIMEOUT = 1000  # seconds to wait for a single run
+DEFAULT_MAX_RUNS = 100
+
+# benchmark modes: a full process per run, a child forked from a pre-imported parent, or both
+COLD = 'cold'
+WARM = 'warm'
+BOTH = 'both'
+BENCHMARK_MODES = [COLD, WARM, BOTH]
+WARM_PREFIX = 'Warm '
+MAX_RSS_SUFFIX = '_max_rss'
+MODULES_SUFFIX = '_modules'
+
+_FORK_SERVER = None
+
+# runs the CLI as `python -m azure.cli` would, then writes the number of imported modules to the given fd,
+# so that the timed run is not slowed down by instrumentation such as `-X importtime`
+_COUNT_MODULES = """
+import os, runpy, sys
+fd = int(sys.argv.pop(1))
+try:
+    runpy.run_module('azure.cli', run_name='__main__', alter_sys=True)
+finally:
+    os.write(fd, str(len(sys.modules)).encode())
+"""
+
+
+# pylint: disable=too-many-statements, too-many-locals, too-many-branches
+def check_load_time(runs=3, import_time=False, workers=1, baseline=False, save_baseline=False):
+
+    require_azure_cli()
+
+    if runs <= 0:
+        raise CLIError("Number of runs must be greater than 0.")
+    if workers <= 0:
+        raise CLIError("Number of workers must be greater than 0.")
+
+    baseline_results = {}
+    if baseline:
+        baseline_results = _load_time_baseline()
+        if not baseline_results:
+            raise CLIError('No load time baseline found. Run `azdev perf load-times --save-baseline` first.')
+        if runs < MIN_BASELINE_RUNS:
+            logger.warning('Comparing %d runs against the baseline. Use at least %d runs to detect small regressions.',
+                           runs, MIN_BASELINE_RUNS)
+
+    heading('Module Load Performance')
+
+    cores = _load_time_cores(workers)
+    if workers > 1 and len(cores) < workers:
+        logger.warning('Only %d CPU cores can be isolated for %d workers. Using %d workers.',
+                       len(cores), workers, max(len(cores), 1))
+        workers = max(len(cores), 1)
+
+    # Run once up front since the first run can be longer due to *.pyc file compilation
+    _load_time_run(import_time)
+
+    serial_total = None
+    if workers > 1:
+        # a serial run used as reference for the noise introduced by co-scheduling
+        serial_total = sum(_load_time_run(import_time, cores[0])[0].values())
+        samples = _load_time_concurrent_runs(runs, import_time, workers, cores)
+    else:
+        samples = [_load_time_run(import_time, cores[0] if cores else None) for _ in range(runs)]
+
+    results = {TOTAL: []}
+    import_runs = {}
+    for load_times, imports in samples:
+        for mod, val in load_times.items():
+            results.setdefault(mod, []).append(val)
+        results[TOTAL].append(sum(load_times.values()))
+        for mod, roots in imports.items():
+            import_runs.setdefault(mod, []).append(roots)
+
+    if save_baseline:
+        display('Baseline saved to {}\n'.format(_save_load_time_baseline(results)))
+
+    passed_mods = {}
+    failed_mods = {}
+
+    # exceptions are claimed from a copy so that every call starts with the same allowance
+    thresholds = dict(THRESHOLDS)
+
+    def _claim_higher_threshold(val):
+        avail_thresholds = {k: v for k, v in thresholds.items() if v}
+        new_threshold = None
+        for threshold in sorted(avail_thresholds):
+            if val < threshold:
+                thresholds[threshold] = thresholds[threshold] - 1
+                new_threshold = threshold
+            break
+        return new_threshold
+
+    mods = sorted(results.keys())
+    for mod in mods:
+        val = results[mod]
+        mean_val = mean(val)
+        stdev_val = pstdev(val)
+        threshold = TOTAL_THRESHOLD if mod == TOTAL else DEFAULT_THRESHOLD
+        statistics = {
+            'average': mean_val,
+            'stdev': stdev_val,
+            'threshold': threshold,
+            'values': val
+        }
+        if mod in baseline_results:
+            statistics['comparison'] = detect_regression(baseline_results[mod], val)
+            if statistics['comparison']['regression']:
+                failed_mods[mod] = statistics
+            else:
+                passed_mods[mod] = statistics
+        elif mean_val > threshold:
+            # claim a threshold exception if available
+            new_threshold = _claim_higher_threshold(mean_val)
+            if new_threshold:
+                statistics['threshold'] = new_threshold
+                passed_mods[mod] = statistics
+            else:
+                failed_mods[mod] = statistics
+        else:
+            passed_mods[mod] = statistics
+
+    subheading('Results')
+    if failed_mods:
+        if serial_total is not None:
+            display_co_scheduling(serial_total, results[TOTAL], workers)
+        display('== PASSED MODULES ==')
+        display_table(passed_mods)
+        display('\nFAILED MODULES')
+        display_table(failed_mods)
+        if import_time:
+            display('\nSLOWEST IMPORTS OF FAILED MODULES')
+            for mod in failed_mods:
+                display_imports(mod, import_runs.get(mod, []))
+        raise CLIError(_load_time_failure_message(failed_mods, import_time))
+
+    if serial_total is not None:
+        display_co_scheduling(serial_total, results[TOTAL], workers)
+
+    display("== PASSED MODULES ==")
+    display_table(passed_mods)
+    if import_time:
+        display('\nSLOWEST IMPORTS')
+        for mod in sorted(import_runs, key=lambda x: x or ''):
+            display_imports(mod, import_runs[mod], top=1)
+    display(
+        "\nPASSED: Average load time all modules: {} ms".format(
+            int(passed_mods[TOTAL]["average"])
+        )
+    )
+
+
+def _load_time_failure_message(failed_mods, import_time):
+    import textwrap
+
+    regressed = sorted(mod for mod, statistics in failed_mods.items() if 'comparison' in statistics)
+    # the total is reported on its own, as it is not a module
+    regressed_mods = [mod for mod in regressed if mod != TOTAL]
+    message = 'FAILED: Some modules failed.'
+    if regressed_mods:
+        message += ' {} significantly slower than the baseline.'.format(
+            'Module {} is'.format(regressed_mods[0]) if len(regressed_mods) == 1 else 'Modules {} are'.format(
+                ', '.join(regressed_mods)))
+    if TOTAL in regressed:
+        message += ' The total load time of all modules is significantly slower than the baseline.'
+    if len(regressed) < len(failed_mods):
+        message += ' If values over the threshold are close to it, rerun.'
+    if import_time:
+        message += ' The slowest imports listed above are loaded while each failed module loads. ' \
+                   'Check that they are not top-level imports in any modified files.'
+    else:
+        message += ' Check that you do not have top-level imports like azure.mgmt or msrestazure ' \
+                   'in any modified files. Rerun with --import-time to find the imports responsible.'
+    return '\n{}\n'.format(textwrap.fill(message, width=90))
+
+
+def _load_time_cores(workers):
+    """ Return the CPU cores to pin load time runs to, or an empty list if pinning is not supported.
+
+    When there are more cores than workers, the first core is left to azdev itself.
+    """
+    if not hasattr(os, 'sched_getaffinity'):
+        return []
+    cores = sorted(os.sched_getaffinity(0))
+    if len(cores) > workers:
+        cores = cores[1:]
+    return cores[:workers]
+
+
+def _load_time_run(import_time, core=None):
+    """ Run `az -h --debug` once, pinned to the given CPU core if any.
+
+    :returns: (dict, dict) of module name to load time in ms, and module name to its imports.
+    """
+    kwargs = {}
+    if core is not None:
+        # only used for serial runs: preexec_fn is not safe while other threads are running
+        kwargs['preexec_fn'] = lambda: os.sched_setaffinity(0, {core})
+
+    if import_time:
+        lines = py_cmd('-X importtime -m azure.cli -h --debug', show_stderr=True, is_module=False, **kwargs).result
+    else:
+        lines = cmd('az -h --debug', show_stderr=True, **kwargs).result
+
+    try:
+        lines = lines.decode().splitlines()
+    except AttributeError:
+        lines = lines.splitlines()
+    return parse_load_time_output(lines)
+
+
+def _load_time_concurrent_runs(runs, import_time, workers, cores):
+    """ Run `runs` load time measurements, `workers` at a time, each on its own CPU core.
+
+    Every worker process pins itself to one of the cores, and the `az` processes it starts inherit its affinity.
+    """
+    import multiprocessing
+
+    free_cores = multiprocessing.Queue()
+    for core in cores:
+        free_cores.put(core)
+
+    with multiprocessing.Pool(workers, _load_time_pin_worker, (free_cores,)) as pool:
+        return pool.map(_load_time_run, [import_time] * runs, chunksize=1)
+
+
+def _load_time_pin_worker(free_cores):
+    os.sched_setaffinity(0, {free_cores.get()})  # pylint: disable=no-member
+
+
+def display_co_scheduling(serial_total, totals, workers):
+    concurrent_mean = mean(totals)
+    overhead = (concurrent_mean - serial_total) / serial_total * 100 if serial_total else 0
+    display('== CO-SCHEDULING ==')
+    display('{} concurrent workers. Serial run: {:.0f} ms, concurrent mean: {:.0f} ms ({:+.1f}%), '
+            'stdev: {:.0f} ms\n'.format(workers, serial_total, concurrent_mean, overhead,
+                                        pstdev(totals) if len(totals) > 1 else 0))
+    if abs(overhead) > CO_SCHEDULING_TOLERANCE:
+        logger.warning('Concurrent runs differ from the serial run by more than %d%%. '
+                       'Rerun with fewer --workers for more stable results.', CO_SCHEDULING_TOLERANCE)
+
+
+def mean(data):
+    """Return the sample arithmetic mean of data."""
+    n = len(data)
+    if n < 1:
+        raise ValueError("len < 1")
+    return sum(data) / float(n)
+
+
+def sq_deviation(data):
+    """Return sum of square deviations of sequence data."""
+    c = mean(data)
+    return sum((x - c) ** 2 for x in data)
+
+
+def pstdev(data):
+    """Calculates the population standard deviation."""
+    n = len(data)
+    if n < 2:
+        raise ValueError('len < 2')
+    ss = sq_deviation(data)
+    return (ss / n) ** 0.5
+
+
+def display_table(data):
+    compared = {k: v for k, v in data.items() if 'comparison' in v}
+    data = {k: v for k, v in data.items() if 'comparison' not in v}
+    if data:
+        display('{:<20} {:>12} {:>12} {:>12} {:>25}'.format('Module', 'Average', 'Threshold', 'Stdev', 'Values'))
+        for key, val in data.items():
+            display('{:<20} {:>12.0f} {:>12.0f} {:>12.0f} {:>25}'.format(
+                key, val['average'], val['threshold'], val['stdev'], str(val['values'])))
+    if compared:
+        display('{:<20} {:>12} {:>12} {:>12} {:>22} {:>10}'.format(
+            'Module', 'Baseline', 'Median', 'Delta', '95% CI', 'p-value'))
+        for key, val in compared.items():
+            comparison = val['comparison']
+            display('{:<20} {:>12.1f} {:>12.1f} {:>+12.1f} {:>22} {:>10.3f}'.format(
+                key, comparison['baseline'], comparison['current'], comparison['delta'],
+                '[{:+.1f}, {:+.1f}]'.format(*comparison['ci']), comparison['p_value']))
+
+
+def _load_time_baseline_path():
+    return os.path.join(get_azdev_config_dir(), LOAD_TIME_BASELINE_FILE)
+
+
+def _load_time_baseline():
+    """ Return the saved load time samples in ms of every module, or an empty dict if none are saved. """
+    path = _load_time_baseline_path()
+    if not os.path.isfile(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _save_load_time_baseline(results):
+    """ Save the load time samples in ms of every module as the baseline. Returns the file path. """
+    path = _load_time_baseline_path()
+    # an interrupted run must not leave a truncated baseline behind
+    with atomic_write(path) as f:
+        json.dump(results, f, indent=4, sort_keys=True)
+    return path
+
+
+def display_imports(mod, runs, top=5):
+    summary = summarize_imports(runs)
+    display('{}:'.format(mod or 'Outside of command modules'))
+    if not summary:
+        display('    No imports recorded.')
+        return
+    for _, entry in slowest_imports(summary, top=top):
+        display('    {:>10.1f} ms {:>10.1f} ms (self)   {}'.format(
+            entry['cumulative'], entry['self'], ' > '.join(entry['path'])))
+
+
+# require azdev setup
+# pylint: disable=too-many-arguments
+def benchmark(commands=None, runs=20, mode=COLD, results_file=None, resume=False, memory=False,
+              ci_width=None, max_runs=DEFAULT_MAX_RUNS):
+    if runs <= 0:
+        raise CLIError("Number of runs must be greater than 0.")
+    if ci_width is not None and ci_width <= 0:
+        raise CLIError("Confidence interval width must be greater than 0.")
+    if ci_width and max_runs < runs:
+        raise CLIError("Maximum number of runs must not be less than the number of runs.")
+    if mode not in BENCHMARK_MODES:
+        raise CLIError("Mode must be one of: {}.".format(', '.join(BENCHMARK_MODES)))
+    if mode != COLD and not hasattr(os, 'fork'):
+        raise CLIError("Warm benchmarks require os.fork, which is not available on this platform.")
+    if memory and not hasattr(os, 'wait4'):
+        raise CLIError("Memory profiling requires os.wait4, which is not available on this platform.")
+    if resume and not results_file:
+        raise CLIError('usage error: --resume requires --results-file PATH')
+
+    if not commands:
+        commands = _benchmark_load_all_commands()
+
+    if not results_file:
+        return list(_benchmark_results(commands, runs, mode, memory, ci_width, max_runs))
+
+    result = _benchmark_read_results(results_file) if resume else []
+    measured = {r["Command"] for r in result}
+    if measured:
+        logger.warning("Resuming: skipping %d commands already in %s", len(measured), results_file)
+    commands = [c for c in commands if c not in measured]
+
+    # every result is written as soon as it is measured, so an interrupted run can be resumed.
+    # Results being resumed are written back first to drop any line truncated by the interruption.
+    with open(results_file, 'w') as f:
+        for staticstic in result:
+            f.write(json.dumps(staticstic) + '\n')
+        for staticstic in _benchmark_results(commands, runs, mode, memory, ci_width, max_runs):
+            f.write(json.dumps(staticstic) + '\n')
+            f.flush()
+            result.append(staticstic)
+
+    if len(result) - len(measured) < len(commands):
+        logger.warning("%d commands were not measured. Rerun with --resume to continue.",
+                       len(commands) - len(result) + len(measured))
+    return result
+
+
+def _benchmark_read_results(results_file):
+    """ Read the results of a previous benchmark from a JSON lines file. """
+    result = []
+    if not os.path.isfile(results_file):
+        return result
+    with open(results_file, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                result.append(json.loads(line))
+            except ValueError:
+                # most likely the last line of an interrupted run
+                logger.warning("Ignoring malformed line %d of %s", line_number, results_file)
+    return result
+
+
+# pylint: disable=too-many-locals, too-many-branches
+def _benchmark_results(commands, runs, mode=COLD, memory=False, ci_width=None, max_runs=None):
+    """ Measure every command `runs` times over a single pool of workers.
+
+    Every (command, run) pair goes through one shared work queue, so the workers stay busy across
+    commands. The statistic of a command is yielded as soon as all of its runs have finished.
+
+    With `ci_width`, sampling is adaptive: once its runs have finished, a command gets another `runs`
+    runs while the confidence interval of its median is wider than `ci_width` times the median,
+    up to `max_runs` runs in total.
+    """
+    import multiprocessing
+    from queue import Queue
+
+    commands = list(dict.fromkeys(commands))
+    work = Queue()
+    for raw_command in commands:
+        logger.info("Measuring %s...", raw_command)
+        for _ in range(runs):
+            work.put(raw_command)
+
+    time_series = {raw_command: {} for raw_command in commands}
+    scheduled = {raw_command: runs for raw_command in commands}
+    outstanding = len(commands) * runs
+
+    # pylint: disable=consider-using-with
+    pool = multiprocessing.Pool(multiprocessing.cpu_count(), _benchmark_process_pool_init)
+
+    # try/except like this because of a bug of Python multiprocessing.Pool (https://bugs.python.org/issue8296)
+    # Discussion on StackOverflow:
+    # https://stackoverflow.com/questions/1408356/keyboard-interrupts-with-pythons-multiprocessing-pool/1408476
+    try:
+        task = functools.partial(_benchmark_task, mode=mode, memory=memory)
+        samples = pool.imap_unordered(task, iter(work.get, None))
+        while outstanding:
+            raw_command, sample = samples.next(BENCHMARK_TIMEOUT)
+            outstanding -= 1
+            for key, value in sample.items():
+                time_series[raw_command].setdefault(key, []).append(value)
+            if max(len(series) for series in time_series[raw_command].values()) < scheduled[raw_command]:
+                continue
+
+            if ci_width and scheduled[raw_command] < max_runs and \
+                    not _benchmark_converged(time_series[raw_command], ci_width):
+                extra_runs = min(runs, max_runs - scheduled[raw_command])
+                logger.info("Measuring %s %d more times...", raw_command, extra_runs)
+                scheduled[raw_command] += extra_runs
+                outstanding += extra_runs
+                for _ in range(extra_runs):
+                    work.put(raw_command)
+                continue
+
+            if not outstanding:
+                work.put(None)
+
+            series = time_series.pop(raw_command)
+            staticstic = {}
+            for prefix, key in [('', COLD), (WARM_PREFIX, WARM)]:
+                if key not in series:
+                    continue
+                staticstic.update({
+                    prefix + k: v for k, v in _benchmark_cmd_staticstic(series[key]).items()
+                })
+                staticstic[prefix + "Samples"] = series[key]
+                if key + MAX_RSS_SUFFIX in series:
+                    staticstic.update({
+                        prefix + "Peak RSS": round(median(series[key + MAX_RSS_SUFFIX]), 1),
+                        prefix + "Modules": max(series[key + MODULES_SUFFIX]),
+                    })
+            staticstic.update({
+                "Command": raw_command,
+                "Runs": scheduled[raw_command],
+            })
+
+            logger.info(staticstic)
+
+            yield staticstic
+        pool.close()
+    except multiprocessing.TimeoutError:
+        logger.warning("Timed out after %d seconds waiting for a run of: %s",
+                       BENCHMARK_TIMEOUT, ', '.join(time_series))
+    finally:
+        # the pool waits for its task handler, which must not be left blocked on the work queue
+        work.put(None)
+        pool.terminate()
+        pool.join()
+
+
+def _benchmark_converged(series, ci_width):
+    """ Whether the confidence interval of the median of every time series is narrow enough. """
+    for key in (COLD, WARM):
+        if key not in series:
+            continue
+        interval = median_ci(series[key])
+        if interval is None or interval[1] - interval[0] > ci_width * median(series[key]):
+            return False
+    return True
+
+
+def _benchmark_load_all_commands():
+    try:
+        from azure.cli.core import get_default_cli  # pylint: disable=unused-import
+    except ImportError:
+        raise CLIError("Azure CLI is not installed")
+
+    from azdev.operations.command_table import get_command_table_snapshot
+
+    commands = list(get_command_table_snapshot()['commands'])
+
+    commands = [cmd + " --help" for cmd in commands]
+
+    return sorted(commands)
+
+
+def _benchmark_process_pool_init():
+    import signal
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _benchmark_task(raw_command, mode=COLD, memory=False):
+    """ Measure a single run of a command in a pool worker.
+
+    :returns: (str, dict) the command and its elapsed time in seconds for each of `cold` and `warm`
+        measured in the given mode. With memory, also the peak RSS in MB and the number of imported
+        modules of each, under the `_max_rss` and `_modules` suffixed keys.
+    """
+    sample = {}
+    if mode in (COLD, BOTH):
+        if memory:
+            sample[COLD], sample[COLD + MAX_RSS_SUFFIX], sample[COLD + MODULES_SUFFIX] = \
+                _benchmark_cmd_profiler(raw_command)
+        else:
+            sample[COLD] = _benchmark_cmd_timer(raw_command)
+    if mode in (WARM, BOTH):
+        if memory:
+            sample[WARM], sample[WARM + MAX_RSS_SUFFIX], sample[WARM + MODULES_SUFFIX] = \
+                _benchmark_cmd_warm_profiler(raw_command)
+        else:
+            sample[WARM] = _benchmark_cmd_warm_timer(raw_command)
+    return raw_command, sample
+
+
+def _benchmark_cmd_timer(raw_command):
+    s = timeit.default_timer()
+    py_cmd("azure.cli {}".format(raw_command), is_module=True)
+    e = timeit.default_timer()
+    return round(e - s, 4)
+
+
+def _benchmark_cmd_profiler(raw_command):
+    """ Run a command in a new process, which reports the number of modules it imported when it exits.
+
+    :returns: (float, float, int) elapsed time in seconds, peak RSS in MB and number of imported modules.
+    """
+    import subprocess
+    from azdev.utilities import get_python_bin
+
+    read_fd, write_fd = os.pipe()
+    s = timeit.default_timer()
+    # pylint: disable=consider-using-with
+    process = subprocess.Popen([get_python_bin(), '-c', _COUNT_MODULES, str(write_fd)] + raw_command.split(),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, pass_fds=(write_fd,))
+    os.close(write_fd)
+    # wait4 instead of wait to get the resource usage of this child only
+    _, process.returncode, rusage = os.wait4(process.pid, 0)  # pylint: disable=no-member
+    e = timeit.default_timer()
+
+    with os.fdopen(read_fd) as f:
+        modules = int(f.read() or 0)
+    return round(e - s, 4), _max_rss_to_mb(rusage.ru_maxrss), modules
+
+
+def _fork_server():
+    # each pool worker process starts its own fork server on first use and keeps it until it exits
+    global _FORK_SERVER  # pylint: disable=global-statement
+    if _FORK_SERVER is None:
+        from .fork_server import ForkServer
+        _FORK_SERVER = ForkServer().start()
+    return _FORK_SERVER
+
+
+def _benchmark_cmd_warm_timer(raw_command):
+    return _fork_server().measure(raw_command)['elapsed']
+
+
+def _benchmark_cmd_warm_profiler(raw_command):
+    """ :returns: (float, float, int) elapsed time in seconds, peak RSS in MB and number of imported modules. """
+    result = _fork_server().measure(raw_command)
+    return result['elapsed'], _max_rss_to_mb(result['max_rss']), result['modules']
+
+
+def _max_rss_to_mb(max_rss):
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return round(max_rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _benchmark_cmd_staticstic(time_series: list):
+    if not time_series:
+        raise IndexError("No time series to compute statistics for.")
+
+    time_series.sort()
+
+    statistic = describe(time_series)
+    # the other columns keep the outliers, which are the tail latency users notice
+    robust_statistic = describe(time_series, reject_outliers=True)
+
+    return {
+        "Min": round(statistic['min'], 4),
+        "Max": round(statistic['max'], 4),
+        "Media": round(statistic['median'], 4),
+        "Avg": round(statistic['mean'], 4),
+        "Std": round(statistic['std'], 4),
+        "P90": round(statistic['p90'], 4),
+        "P95": round(statistic['p95'], 4),
+        "P99": round(statistic['p99'], 4),
+        "MAD": round(statistic['mad'], 4),
+        "Outliers": statistic['outliers'],
+        "Robust Avg": round(robust_statistic['mean'], 4),
+        "Robust Std": round(robust_statistic['std'], 4),
+        "Histogram": statistic['histogram'],
+    }
@@ -0,0 +1,155 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+import json
+
+from knack.log import get_logger
+from knack.util import CLIError
+
+from azdev.utilities import display, heading, subheading
+
+from . import COLD, WARM, WARM_PREFIX, benchmark, _benchmark_read_results
+from .stats import mann_whitney_u
+
+logger = get_logger(__name__)
+
+SIGNIFICANCE_LEVEL = 0.05
+# the prefix of the columns of each benchmark mode
+MODE_PREFIXES = [(COLD, ''), (WARM, WARM_PREFIX)]
+
+
+# pylint: disable=too-many-arguments
+def compare_benchmarks(results=None, commands=None, runs=20, top=10,
+                       git_source=None, git_target=None, git_repo=None):
+    if any([git_source, git_target, git_repo]) and not results:
+        old, new = _benchmark_revisions(commands, runs, git_source, git_target, git_repo)
+    elif results and len(results) == 2 and not any([git_source, git_target, git_repo]):
+        old, new = _read_results(results[0]), _read_results(results[1])
+    else:
+        raise CLIError('usage error: OLD_PATH NEW_PATH | [--src NAME] --tgt NAME --repo PATH')
+
+    heading('Benchmark Comparison')
+
+    result = compare_results(old, new)
+
+    regressions = [r for r in result if r['Significant'] and r['Change'] > 0]
+    improvements = [r for r in reversed(result) if r['Significant'] and r['Change'] < 0]
+
+    subheading('Regressions')
+    _display_changes(regressions[:top] if top else regressions)
+    subheading('Improvements')
+    _display_changes(improvements[:top] if top else improvements)
+
+    return result
+
+
+def compare_results(old, new):
+    """ Join two lists of benchmark results by command, comparing each mode measured in both.
+
+    :returns: list of dicts with the `Mode`, the old and new medians, the relative `Change` in percent and the
+        two-sided Mann-Whitney p-value of each command and mode measured in both, sorted by decreasing change.
+    :raises: CLIError if the commands measured in both share no mode.
+    """
+    old = {r['Command']: r for r in old}
+    new = {r['Command']: r for r in new}
+
+    only_old = sorted(set(old) - set(new))
+    only_new = sorted(set(new) - set(old))
+    if only_old:
+        logger.warning('Commands only in the old results: %s', ', '.join(only_old))
+    if only_new:
+        logger.warning('Commands only in the new results: %s', ', '.join(only_new))
+
+    common = sorted(set(old) & set(new))
+    result = []
+    for command in common:
+        for mode, prefix in MODE_PREFIXES:
+            if prefix + 'Media' in old[command] and prefix + 'Media' in new[command]:
+                result.append(_compare_command(command, mode, old[command], new[command], prefix))
+    if common and not result:
+        raise CLIError('The results share no benchmark mode to compare. Benchmark both with the same --mode.')
+    return sorted(result, key=lambda r: r['Change'], reverse=True)
+
+
+def _compare_command(command, mode, old, new, prefix):
+    old_median, new_median = old[prefix + 'Media'], new[prefix + 'Media']
+    old_samples, new_samples = old.get(prefix + 'Samples'), new.get(prefix + 'Samples')
+    p_value = None
+    if old_samples and new_samples:
+        _, p_slower = mann_whitney_u(old_samples, new_samples)
+        _, p_faster = mann_whitney_u(new_samples, old_samples)
+        p_value = min(1.0, 2 * min(p_slower, p_faster))
+    return {
+        'Command': command,
+        'Mode': mode,
+        'Old': old_median,
+        'New': new_median,
+        'Change': round((new_median - old_median) / old_median * 100, 2) if old_median else 0.0,
+        'P-Value': round(p_value, 4) if p_value is not None else None,
+        'Significant': p_value is not None and p_value < SIGNIFICANCE_LEVEL
+    }
+
+
+def _display_changes(changes):
+    if not changes:
+        display('None.\n')
+        return
+    display('{:<50} {:<6} {:>10} {:>10} {:>10} {:>10}'.format('Command', 'Mode', 'Old', 'New', 'Change', 'P-Value'))
+    for r in changes:
+        display('{:<50} {:<6} {:>10.4f} {:>10.4f} {:>+9.2f}% {:>10.4f}'.format(
+            r['Command'], r['Mode'], r['Old'], r['New'], r['Change'], r['P-Value']))
+    display('')
+
+
+def _read_results(path):
+    """ Read benchmark results saved with `-o json` or with `--results-file`. """
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except ValueError:
+        return _benchmark_read_results(path)
+    except OSError as ex:
+        raise CLIError('unable to read benchmark results: {}'.format(ex))
+
+
+def _benchmark_revisions(commands, runs, git_source, git_target, git_repo):
+    """ Check out the target and then the source revision of the repo and benchmark each.
+
+    :returns: (list, list) results of the target and of the source revision.
+    """
+    if not all([git_target, git_repo]):
+        raise CLIError('usage error: [--src NAME]  --tgt NAME --repo PATH')
+
+    try:
+        import git  # pylint: disable=unused-import,unused-variable
+        import git.exc as git_exc
+    except ImportError as ex:
+        raise CLIError(ex)
+
+    from git import Repo
+    try:
+        repo = Repo(git_repo)
+    except (git_exc.NoSuchPathError, git_exc.InvalidGitRepositoryError):
+        raise CLIError('invalid git repo: {}'.format(git_repo))
+
+    if repo.is_dirty():
+        raise CLIError('{} has uncommitted changes. Commit or stash them before comparing revisions.'.format(git_repo))
+
+    original = repo.active_branch.name if not repo.head.is_detached else repo.head.commit.hexsha
+    git_source = git_source or original
+
+    results = []
+    try:
+        for revision in [git_target, git_source]:
+            display('Benchmarking {}...'.format(revision))
+            try:
+                repo.git.checkout(revision)
+            except git_exc.GitCommandError as ex:
+                raise CLIError('unable to check out {}: {}'.format(revision, ex))
+            results.append(benchmark(commands=commands, runs=runs))
+    finally:
+        repo.git.checkout(original)
+    return results[0], results[1]
@@ -0,0 +1,135 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+""" Fork server used to measure the latency of Azure CLI commands from a pre-imported parent.
+
+The server is started with the Python of the CLI environment. It imports `azure.cli.core` once,
+then reads one command per line from stdin, forks a child that invokes the command and writes
+one JSON result per line to stdout, with the elapsed time, the peak RSS of the child and the number
+of modules imported in the child. Interpreter startup and core imports are therefore excluded
+from the measured time.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import timeit
+
+from knack.util import CLIError
+
+READY = 'ready'
+
+
+def _invoke(raw_command, modules_fd):
+    """ Run a CLI command in the forked child and report the number of imported modules. Never returns. """
+    import shlex
+    exit_code = 1
+    try:
+        devnull = os.open(os.devnull, os.O_RDWR)
+        for fd in range(3):
+            os.dup2(devnull, fd)
+        from azure.cli.core import get_default_cli  # pylint: disable=import-error
+        exit_code = get_default_cli().invoke(shlex.split(raw_command)) or 0
+    except SystemExit as ex:
+        exit_code = _get_exit_code(ex.code)
+    except BaseException:  # pylint: disable=broad-except
+        pass
+    finally:
+        os.write(modules_fd, str(len(sys.modules)).encode())
+        os._exit(exit_code)  # pylint: disable=protected-access
+
+
+def _get_exit_code(code):
+    """ Map the code of a SystemExit to a process exit code the way the interpreter does: a plain `sys.exit()`
+    succeeds, and any other code that is not an int fails. """
+    if code is None:
+        return 0
+    return code if isinstance(code, int) else 1
+
+
+def _measure(raw_command):
+    read_fd, write_fd = os.pipe()
+    start = timeit.default_timer()
+    pid = os.fork()  # pylint: disable=no-member
+    if pid == 0:
+        os.close(read_fd)
+        _invoke(raw_command, write_fd)
+    os.close(write_fd)
+    _, _, rusage = os.wait4(pid, 0)  # pylint: disable=no-member
+    end = timeit.default_timer()
+    with os.fdopen(read_fd) as f:
+        modules = int(f.read() or 0)
+    return {'elapsed': round(end - start, 4), 'max_rss': rusage.ru_maxrss, 'modules': modules}
+
+
+def main():
+    try:
+        import azure.cli.core  # pylint: disable=import-error, unused-import, unused-variable
+        import azure.cli.core.commands  # pylint: disable=import-error, unused-import, unused-variable
+    except ImportError as ex:
+        print(json.dumps({'error': str(ex)}), flush=True)
+        return
+    print(READY, flush=True)
+
+    for line in sys.stdin:
+        raw_command = line.strip()
+        if raw_command:
+            print(json.dumps(_measure(raw_command)), flush=True)
+
+
+class ForkServer:
+    """ Client side of the fork server, running as a subprocess of azdev. """
+
+    def __init__(self):
+        self._process = None
+
+    def start(self):
+        from azdev.utilities import get_python_bin
+
+        if not hasattr(os, 'fork'):
+            raise CLIError('Warm benchmarks require os.fork, which is not available on this platform.')
+
+        # pylint: disable=consider-using-with
+        self._process = subprocess.Popen(
+            [get_python_bin(), '-m', __name__],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            universal_newlines=True, bufsize=1)
+        response = self._process.stdout.readline().strip()
+        if response != READY:
+            self.stop()
+            try:
+                error = json.loads(response)['error']
+            except (ValueError, KeyError, TypeError):
+                error = 'unexpected response: {}'.format(response or 'none')
+            raise CLIError('Unable to start the fork server: {}'.format(error))
+        return self
+
+    def measure(self, raw_command):
+        """ Run the command in a forked child.
+
+        :returns: dict with the `elapsed` time in seconds, the `max_rss` of the child as reported by
+            getrusage and the number of `modules` imported in the child.
+        """
+        if not self._process:
+            self.start()
+        self._process.stdin.write(raw_command.replace('\n', ' ') + '\n')
+        self._process.stdin.flush()
+        response = self._process.stdout.readline()
+        if not response:
+            self.stop()
+            raise CLIError('The fork server exited unexpectedly while running: {}'.format(raw_command))
+        return json.loads(response)
+
+    def stop(self):
+        if self._process:
+            self._process.stdin.close()
+            self._process.wait()
+            self._process = None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+import re
+
+# format of the lines emitted by `python -X importtime`:
+#   import time: self [us] | cumulative | imported package
+#   import time:       274 |        274 |   _io
+IMPORT_TIME_REGEX = re.compile(
+    r'^import time:\s*(?P<self>\d+)\s*\|\s*(?P<cumulative>\d+)\s*\|\s(?P<indent>\s*)(?P<name>\S+)\s*$')
+LOADED_MODULE_REGEX = re.compile(r"[^']*'(?P<mod>[^']*)'[\D]*(?P<val>[\d\.]*)")
+LOADED_MODULE_PREFIX = 'DEBUG: Loaded module'
+
+
+class ImportNode:
+    """ A single import reported by `-X importtime`, with the imports it triggered as children. """
+
+    def __init__(self, name, self_time, cumulative_time):
+        self.name = name
+        self.self_time = self_time
+        self.cumulative_time = cumulative_time
+        self.children = []
+
+    def walk(self, path=None):
+        """ Yield (path, node) pairs for this node and all of its descendants, depth-first. """
+        path = (path or ()) + (self.name,)
+        yield path, self
+        for child in self.children:
+            yield from child.walk(path)
+
+    def __repr__(self):
+        return '<ImportNode {} self={}us cumulative={}us>'.format(self.name, self.self_time, self.cumulative_time)
+
+
+class ImportTreeBuilder:
+    """ Assemble `-X importtime` lines into trees.
+
+    CPython prints an import only once it has finished, so children are always emitted
+    before their parent. Nodes are parked by nesting level until the parent shows up.
+    """
+
+    def __init__(self):
+        self._pending = {}
+
+    def add(self, line):
+        """ Consume a line. Returns False if the line is not an import time line. """
+        match = IMPORT_TIME_REGEX.match(line)
+        if not match:
+            return False
+        level = len(match.group('indent')) // 2
+        node = ImportNode(match.group('name'), int(match.group('self')), int(match.group('cumulative')))
+        node.children = self._pending.pop(level + 1, [])
+        self._pending.setdefault(level, []).append(node)
+        return True
+
+    def pop_roots(self):
+        """ Return the top-level imports completed since the last call. """
+        return self._pending.pop(0, [])
+
+
+def parse_import_time(lines):
+    """ Parse `-X importtime` output into a list of top-level ImportNode trees. """
+    builder = ImportTreeBuilder()
+    for line in lines:
+        builder.add(line)
+    return builder.pop_roots()
+
+
+def parse_load_time_output(lines):
+    """ Parse the output of `python -X importtime -m azure.cli -h --debug`.
+
+    Azure CLI logs `Loaded module 'X' in N seconds` after loading each command module, and the
+    import time lines are written to the same stream, so the imports completed directly before
+    such a log line, with no other output in between, are attributed to that module.
+
+    :returns: (dict, dict) of module name to load time in ms, and module name to its list of
+        top-level ImportNode trees. Imports that happen outside of any command module load are
+        stored under the `None` key.
+    """
+    load_times = {}
+    imports = {}
+    builder = ImportTreeBuilder()
+    for line in lines:
+        if builder.add(line):
+            continue
+        mod = None
+        if line.startswith(LOADED_MODULE_PREFIX):
+            matches = LOADED_MODULE_REGEX.match(line)
+            mod = matches.group('mod')
+            load_times[mod] = float(matches.group('val')) * 1000
+        imports.setdefault(mod, []).extend(builder.pop_roots())
+    imports.setdefault(None, []).extend(builder.pop_roots())
+    return load_times, imports
+
+
+def summarize_imports(runs):
+    """ Average import times across runs.
+
+    :param runs: list of lists of top-level ImportNode trees, one list per run.
+    :returns: dict of import name to dict with the `path` of the import in the tree, the
+        mean `self` time and the mean `cumulative` time in ms.
+    """
+    summary = {}
+    for roots in runs:
+        for root in roots:
+            for path, node in root.walk():
+                entry = summary.setdefault(node.name, {'path': path, 'self': [], 'cumulative': []})
+                entry['self'].append(node.self_time / 1000)
+                entry['cumulative'].append(node.cumulative_time / 1000)
+    for entry in summary.values():
+        entry['self'] = sum(entry['self']) / len(runs)
+        entry['cumulative'] = sum(entry['cumulative']) / len(runs)
+    return summary
+
+
+def slowest_imports(summary, top=5):
+    """ Return the `top` imports with the largest cumulative time, skipping imports whose
+        time is already accounted for by a slower parent in the list. """
+    result = []
+    for name, entry in sorted(summary.items(), key=lambda x: x[1]['cumulative'], reverse=True):
+        if any(parent in entry['path'][:-1] for parent, _ in result):
+            continue
+        result.append((name, entry))
+        if len(result) == top:
+            break
+    return result
@@ -0,0 +1,255 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+import math
+import random
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+HISTOGRAM_LEVELS = '_.:-=+*#%@'
+OUTLIER_THRESHOLD = 3.5  # modified z-score above which a sample is an outlier
+
+
+def median(data):
+    """Return the median of data."""
+    ordered = sorted(data)
+    size = len(ordered)
+    if size < 1:
+        raise ValueError("len < 1")
+    if size % 2 == 0:
+        return (ordered[size // 2 - 1] + ordered[size // 2]) / 2
+    return ordered[size // 2]
+
+
+def _ranks(values):
+    """ Return the 1-based ranks of values, averaging the ranks of ties, and the tie group sizes. """
+    order = sorted(range(len(values)), key=lambda i: values[i])
+    ranks = [0.0] * len(values)
+    ties = []
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2 + 1
+        ties.append(j - i + 1)
+        i = j + 1
+    return ranks, ties
+
+
+def mann_whitney_u(baseline, current):
+    """ One-sided Mann-Whitney U test of whether `current` tends to be larger than `baseline`.
+
+    Uses the normal approximation with tie and continuity corrections.
+
+    :returns: (float, float) U statistic of `current` and the p-value.
+    """
+    n1, n2 = len(baseline), len(current)
+    if n1 < 1 or n2 < 1:
+        raise ValueError("len < 1")
+
+    ranks, ties = _ranks(list(baseline) + list(current))
+    u_current = sum(ranks[n1:]) - n2 * (n2 + 1) / 2
+
+    n = n1 + n2
+    mu = n1 * n2 / 2
+    tie_term = sum(t ** 3 - t for t in ties) / (n * (n - 1)) if n > 1 else 0
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term))
+    if sigma == 0:
+        return u_current, 1.0
+    z = (u_current - mu - 0.5) / sigma
+    p_value = 0.5 * math.erfc(z / math.sqrt(2))
+    return u_current, p_value
+
+
+def bootstrap_ci(baseline, current, statistic=median, confidence=0.95, iterations=2000, seed=0):
+    """ Bootstrap confidence interval of `statistic(current) - statistic(baseline)`.
+
+    The resampling is seeded so that the same data always gives the same interval.
+
+    :returns: (float, float) lower and upper bound of the interval.
+    """
+    if not baseline or not current:
+        raise ValueError("len < 1")
+
+    rng = random.Random(seed)
+    diffs = sorted(
+        statistic(rng.choices(current, k=len(current))) - statistic(rng.choices(baseline, k=len(baseline)))
+        for _ in range(iterations)
+    )
+    alpha = (1 - confidence) / 2
+    lower = diffs[int(math.floor(alpha * (iterations - 1)))]
+    upper = diffs[int(math.ceil((1 - alpha) * (iterations - 1)))]
+    return lower, upper
+
+
+def detect_regression(baseline, current, alpha=0.05, confidence=0.95):
+    """ Decide whether `current` samples are slower than `baseline` samples.
+
+    A regression is only reported when the Mann-Whitney test is significant and the bootstrap
+    confidence interval of the difference in medians lies entirely above zero, so that a single
+    noisy sample cannot fail a check.
+
+    :returns: dict with the medians, the `delta` of the medians, the `ci` of the delta, the
+        `p_value` and whether it is a `regression`.
+    """
+    _, p_value = mann_whitney_u(baseline, current)
+    lower, upper = bootstrap_ci(baseline, current, confidence=confidence)
+    return {
+        'baseline': median(baseline),
+        'current': median(current),
+        'delta': median(current) - median(baseline),
+        'ci': (lower, upper),
+        'p_value': p_value,
+        'regression': p_value < alpha and lower > 0
+    }
+
+
+def median_ci(data, confidence=0.95):
+    """ Distribution-free confidence interval of the median, from the order statistics of data.
+
+    :returns: (float, float) lower and upper bound of the interval, or None if there are too few
+        samples to reach the requested confidence.
+    """
+    size = len(data)
+    alpha = (1 - confidence) / 2
+    # the interval is [x(k), x(n-k+1)] for the largest k such that P(Binomial(n, 1/2) < k) <= alpha
+    if size > 100:
+        z = math.sqrt(2) * _erfinv(1 - 2 * alpha)
+        k = int(math.floor((size - z * math.sqrt(size)) / 2))
+    else:
+        k, cdf, pmf = 0, 0.0, 0.5 ** size
+        while k < size and cdf + pmf <= alpha:
+            cdf += pmf
+            pmf = pmf * (size - k) / (k + 1)
+            k += 1
+    if k < 1:
+        return None
+    ordered = sorted(data)
+    return ordered[k - 1], ordered[size - k]
+
+
+def _erfinv(y):
+    """ Inverse of math.erf by Newton's method. """
+    x = 0.0
+    for _ in range(50):
+        step = (math.erf(x) - y) / (2 / math.sqrt(math.pi) * math.exp(-x * x))
+        x -= step
+        if abs(step) < 1e-12:
+            break
+    return x
+
+
+def percentile(data, q):
+    """ Return the q-th percentile of data, interpolating linearly between the closest ranks. """
+    if numpy is not None:
+        return float(numpy.percentile(data, q))
+    ordered = sorted(data)
+    if not ordered:
+        raise ValueError("len < 1")
+    rank = (len(ordered) - 1) * q / 100
+    lower = int(math.floor(rank))
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def mad(data):
+    """ Return the median absolute deviation of data. """
+    if numpy is not None:
+        values = numpy.asarray(data, dtype=float)
+        return float(numpy.median(numpy.abs(values - numpy.median(values))))
+    center = median(data)
+    return median([abs(x - center) for x in data])
+
+
+def split_outliers(data, threshold=OUTLIER_THRESHOLD):
+    """ Split data by the modified z-score of each sample, based on the median absolute deviation.
+
+    :returns: (list, list) samples whose score is within threshold, and the outliers.
+    """
+    deviation = mad(data)
+    if not deviation:
+        return list(data), []
+    center = median(data)
+    if numpy is not None:
+        values = numpy.asarray(data, dtype=float)
+        mask = 0.6745 * numpy.abs(values - center) / deviation > threshold
+        return values[~mask].tolist(), values[mask].tolist()
+    kept, rejected = [], []
+    for x in data:
+        (rejected if 0.6745 * abs(x - center) / deviation > threshold else kept).append(x)
+    return kept, rejected
+
+
+def histogram(data, bins=10):
+    """ Return an ASCII histogram of data, one character per bin from the minimum to the maximum. """
+    if not data:
+        raise ValueError("len < 1")
+    low, high = min(data), max(data)
+    if numpy is not None:
+        counts = numpy.histogram(data, bins=bins, range=(low, high) if high > low else (low - 0.5, high + 0.5))[0]
+        counts = counts.tolist()
+    else:
+        counts = [0] * bins
+        width = (high - low) / bins
+        for x in data:
+            index = int((x - low) / width) if width else bins // 2
+            counts[min(index, bins - 1)] += 1
+    peak = max(counts)
+    return ''.join(
+        ' ' if not count else HISTOGRAM_LEVELS[int(math.ceil(count / peak * len(HISTOGRAM_LEVELS))) - 1]
+        for count in counts
+    )
+
+
+def describe(data, reject_outliers=False):
+    """ Compute the summary statistics of data in one pass over a NumPy array when NumPy is available.
+
+    :param reject_outliers: compute the statistics over the samples that are not outliers only.
+    :returns: dict with the `min`, `max`, `median`, `mean`, population `std`, `p90`, `p95`, `p99`,
+        `mad`, number of `outliers` and ASCII `histogram` of data.
+    """
+    if not data:
+        raise ValueError("len < 1")
+    kept, rejected = split_outliers(data)
+    if reject_outliers:
+        data = kept
+    if numpy is not None:
+        values = numpy.asarray(data, dtype=float)
+        p50, p90, p95, p99 = numpy.percentile(values, [50, 90, 95, 99]).tolist()
+        result = {
+            'min': float(values.min()),
+            'max': float(values.max()),
+            'median': p50,
+            'mean': float(values.mean()),
+            'std': float(values.std()),
+            'p90': p90,
+            'p95': p95,
+            'p99': p99,
+        }
+    else:
+        size = len(data)
+        avg = sum(data) / size
+        result = {
+            'min': min(data),
+            'max': max(data),
+            'median': median(data),
+            'mean': avg,
+            'std': math.sqrt(sum((x - avg) ** 2 for x in data) / size),
+            'p90': percentile(data, 90),
+            'p95': percentile(data, 95),
+            'p99': percentile(data, 99),
+        }
+    result.update({
+        'mad': mad(data),
+        'outliers': len(rejected),
+        'histogram': histogram(data),
+    })
+    return result
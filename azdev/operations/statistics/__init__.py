@@ -3,18 +3,13 @@
 # Licensed under the MIT License. See License.txt in the project root for
 # license information.
 # -----------------------------------------------------------------------------
-import inspect
 import json
-import os
-import re
 import time
-from pathlib import Path
 
 from knack.log import get_logger
 from azdev.utilities import (
     heading, display, get_path_table, require_azure_cli, filter_by_git_diff)
-
-from .util import filter_modules
+from azdev.operations.command_table import get_command_table_snapshot, select_commands
 
 logger = get_logger(__name__)
 
@@ -23,8 +18,6 @@ def list_command_table(modules=None, git_source=None, git_target=None, git_repo=
                        include_whl_extensions=False, statistics_only=False):
     require_azure_cli()
 
-    from azure.cli.core import get_default_cli  # pylint: disable=import-error
-
     heading('List Command Table')
 
     # allow user to run only on CLI or extensions
@@ -58,33 +51,32 @@ def list_command_table(modules=None, git_source=None, git_target=None, git_repo=
 
     start = time.time()
     display('Initializing with command table and help files...')
-    az_cli = get_default_cli()
 
-    # load commands, args, and help
-    _create_invoker_and_load_cmds(az_cli)
+    snapshot = get_command_table_snapshot(include_whl_extensions=include_whl_extensions)
 
     stop = time.time()
     logger.info('Commands and help loaded in %i sec', stop - start)
-    command_loader = az_cli.invocation.commands_loader
 
-    # trim command table and help to just selected_modules
-    command_loader = filter_modules(
-        command_loader, modules=selected_mod_names, include_whl_extensions=include_whl_extensions)
+    # trim command table to just selected_modules
+    command_table = select_commands(
+        snapshot, modules=selected_mod_names, include_whl_extensions=include_whl_extensions)
 
-    if not command_loader.command_table:
+    if not command_table:
         logger.warning('No commands selected to check.')
 
     commands = []
 
     codegen_v2_command_count = 0
     codegen_v1_command_count = 0
-    for command_name, command in command_loader.command_table.items():
+    for command_name, command in command_table.items():
         command_info = {
             "name": command_name,
-            "source": _get_command_source(command_name, command)
+            "source": {
+                "module": command['source'],
+                "isExtension": command['is_extension']
+            }
         }
-        module_loader = command_loader.cmd_to_loader_map[command_name]
-        codegen_info = _command_codegen_info(command_name, command, module_loader)
+        codegen_info = command['codegen']
         if codegen_info:
             command_info['codegen_version'] = codegen_info['version']
             command_info['codegen_type'] = codegen_info['type']
@@ -173,147 +165,3 @@ def diff_command_tables(table_path, diff_table_path, statistics_only=False):
         "newCommands": added_commands,
         "migratedCommands": migrated_commands,
     }
-
-
-def _get_command_source(command_name, command):
-    from azure.cli.core.commands import ExtensionCommandSource  # pylint: disable=import-error
-    if isinstance(command.command_source, ExtensionCommandSource):
-        return {
-            "module": command.command_source.extension_name,
-            "isExtension": True
-        }
-    if command.command_source is None:
-        raise ValueError('Command: `%s`, has no command source.' % command_name)
-    # command is from module
-    return {
-        "module": command.command_source,
-        "isExtension": False
-    }
-
-
-def _create_invoker_and_load_cmds(cli_ctx):
-    from knack.events import (
-        EVENT_INVOKER_PRE_CMD_TBL_CREATE, EVENT_INVOKER_POST_CMD_TBL_CREATE)
-    from azure.cli.core.commands import register_cache_arguments
-    from azure.cli.core.commands.arm import register_global_subscription_argument, register_ids_argument
-
-    start_time = time.time()
-
-    register_global_subscription_argument(cli_ctx)
-    register_ids_argument(cli_ctx)
-    register_cache_arguments(cli_ctx)
-
-    invoker = cli_ctx.invocation_cls(cli_ctx=cli_ctx, commands_loader_cls=cli_ctx.commands_loader_cls,
-                                     parser_cls=cli_ctx.parser_cls, help_cls=cli_ctx.help_cls)
-    cli_ctx.invocation = invoker
-    invoker.commands_loader.skip_applicability = True
-
-    cli_ctx.raise_event(EVENT_INVOKER_PRE_CMD_TBL_CREATE, args=[])
-    invoker.commands_loader.load_command_table(None)
-    invoker.commands_loader.command_name = ''
-
-    # cli_ctx.raise_event(EVENT_INVOKER_PRE_LOAD_ARGUMENTS, commands_loader=invoker.commands_loader)
-    # invoker.commands_loader.load_arguments()
-    # cli_ctx.raise_event(EVENT_INVOKER_POST_LOAD_ARGUMENTS, commands_loader=invoker.commands_loader)
-
-    cli_ctx.raise_event(EVENT_INVOKER_POST_CMD_TBL_CREATE, commands_loader=invoker.commands_loader)
-    invoker.parser.cli_ctx = cli_ctx
-    invoker.parser.load_command_table(invoker.commands_loader)
-
-    end_time = time.time()
-    logger.info('Time to load entire command table: %.3f sec', end_time - start_time)
-
-
-import_aaz_express = re.compile(r'^\s*from (.*\.)?aaz(\..*)? .*$')
-command_args_express = re.compile(r'^.*[\s\(]command_args=.*$')
-
-
-def _command_codegen_info(command_name, command, module_loader):  # pylint: disable=unused-argument, too-many-branches, too-many-statements
-    from azure.cli.core.commands import AzCliCommand
-
-    try:
-        from azure.cli.core.aaz import AAZCommand
-        if isinstance(command, AAZCommand):
-            return {
-                "version": "v2",
-                "type": "Atomic"
-            }
-    except ImportError:
-        pass
-
-    if isinstance(command, AzCliCommand):
-        if 'command_operation' not in command.command_kwargs:
-            return None
-
-        command_operation = command.command_kwargs['command_operation']
-        is_v2_conveniance = False
-        is_generated = False
-        if getattr(command_operation, 'op_path', None):
-            op = command_operation.get_op_handler(command_operation.op_path)
-            op_source = inspect.getsource(op)
-            for line in op_source.splitlines():
-                if import_aaz_express.match(line):
-                    is_v2_conveniance = True
-                    break
-                if command_args_express.match(line):
-                    is_v2_conveniance = True
-
-            path_parts = list(Path(inspect.getfile(op)).parts)
-            if "generated" in path_parts:
-                is_generated = True
-
-        if not is_v2_conveniance and getattr(command_operation, 'getter_op_path', None):
-            op = command_operation.get_op_handler(command_operation.getter_op_path)
-            op_source = inspect.getsource(op)
-            for line in op_source.splitlines():
-                if import_aaz_express.match(line):
-                    is_v2_conveniance = True
-                    break
-                if command_args_express.match(line):
-                    is_v2_conveniance = True
-
-            path_parts = list(Path(inspect.getfile(op)).parts)
-            if "generated" in path_parts:
-                is_generated = True
-
-        if not is_v2_conveniance and getattr(command_operation, 'setter_op_path', None):
-            op = command_operation.get_op_handler(command_operation.setter_op_path)
-            op_source = inspect.getsource(op)
-            for line in op_source.splitlines():
-                if import_aaz_express.match(line):
-                    is_v2_conveniance = True
-                    break
-                if command_args_express.match(line):
-                    is_v2_conveniance = True
-
-            path_parts = list(Path(inspect.getfile(op)).parts)
-            if "generated" in path_parts:
-                is_generated = True
-
-        if not is_v2_conveniance and getattr(command_operation, 'custom_function_op_path', None):
-            op = command_operation.get_op_handler(command_operation.custom_function_op_path)
-            op_source = inspect.getsource(op)
-            for line in op_source.splitlines():
-                if import_aaz_express.match(line):
-                    is_v2_conveniance = True
-                    break
-                if command_args_express.match(line):
-                    is_v2_conveniance = True
-
-            path_parts = list(Path(inspect.getfile(op)).parts)
-            if "generated" in path_parts:
-                is_generated = True
-
-        if is_v2_conveniance:
-            return {
-                "version": "v2",
-                "type": "Convenience"
-            }
-
-        if is_generated:
-            return {
-                "version": "v1",
-                "type": "SDK"
-            }
-
-    return None
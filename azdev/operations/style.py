@@ -21,7 +21,8 @@ logger = get_logger(__name__)
 
 
 # pylint: disable=too-many-statements
-def check_style(modules=None, pylint=False, pep8=False, git_source=None, git_target=None, git_repo=None):
+def check_style(modules=None, pylint=False, pep8=False, git_source=None, git_target=None, git_repo=None,
+                linter_checkers=False):
 
     heading('Style Check')
 
@@ -76,7 +77,13 @@ def check_style(modules=None, pylint=False, pep8=False, git_source=None, git_tar
     exit_code_sum = 0
 
     if pylint:
-        pylint_result = run_pylint(selected_modules)
+        if linter_checkers:
+            # load the custom checkers of `azdev linter` into the same pylint run, parsing the sources once
+            from azdev.operations.linter import get_pylint_checkers
+            checkers, enable, env = get_pylint_checkers()
+            pylint_result = run_pylint(selected_modules, checkers=checkers, env=env, enable=enable)
+        else:
+            pylint_result = run_pylint(selected_modules)
         exit_code_sum += pylint_result.exit_code
 
         if pylint_result.error:
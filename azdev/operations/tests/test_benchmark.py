@@ -4,13 +4,18 @@
 # license information.
 # -----------------------------------------------------------------------------
 
+import json
+import os
 import random
-from unittest import mock, TestCase
+import sys
+import tempfile
+from unittest import mock, skipUnless, TestCase
 from math import sqrt
 
 from knack.util import CLIError
 
 from ..performance import (
+    _benchmark_cmd_profiler,
     _benchmark_cmd_staticstic,
     _benchmark_load_all_commands,
     benchmark,
@@ -35,6 +40,15 @@ class TestBenchmarkStatistics(TestCase):
         self.assertEqual(stats["Media"], round(rands[5], 4))
         self.assertEqual(stats["Std"], std_num)
 
+    def test_statistic_rejects_outliers_from_robust_columns(self):
+        stats = _benchmark_cmd_staticstic([1.0, 1.1, 1.2, 1.1, 1.0, 1.3, 1.2, 1.1, 1.0, 9.0])
+
+        self.assertEqual(stats["Max"], 9.0)
+        self.assertEqual(stats["Avg"], 1.9)
+        self.assertEqual(stats["Outliers"], 1)
+        self.assertEqual(stats["Robust Avg"], round(10.0 / 9, 4))
+        self.assertLess(stats["Robust Std"], stats["Std"])
+
     def test_statistic_data_in_different_length(self):
         even_length_data = sorted([random.random() * 10 for _ in range(10)])
         odd_length_data = sorted([random.random() * 10 for _ in range(11)])
@@ -79,8 +93,6 @@ class TestBenchmarkCommands(TestCase):
             self.assertTrue(cmd.endswith(" --help"))
 
     def test_load_all_commands_fail(self):
-        import sys
-
         original_azure_cli_core_mod = sys.modules.get("azure.cli.core")
         sys.modules["azure.cli.core"] = None
 
@@ -104,15 +116,18 @@ class TestBenchmarkCommands(TestCase):
 #         return [1] * len(self.iterable)
 
 
-class _MockedPoolMapResult:
+class _MockedPoolIMapIterator:
     def __init__(self, func, iterable):
-        self.func = func
-        self.iterable = iterable
+        self._results = (func(i) for i in iterable)  # mocked results, computed in-process
+
+    def __iter__(self):
+        return self
 
-        self._value = [self.func(i) for i in iterable]  # mocked results
+    def __next__(self):
+        return next(self._results)
 
-    def get(self, timeout=0):  # pylint: disable=unused-argument
-        return self._value
+    def next(self, timeout=None):  # pylint: disable=unused-argument
+        return next(self._results)
 
 
 class TestBenchmark(TestCase):
@@ -145,10 +160,8 @@ class TestBenchmark(TestCase):
             "azdev.operations.performance._benchmark_cmd_timer",
             return_value=1,
         ), mock.patch(
-            "multiprocessing.pool.Pool.map_async",
-            lambda self, func, iterable, chunksize=None, callback=None, error_callback=None: _MockedPoolMapResult(
-                func, iterable
-            ),
+            "multiprocessing.pool.Pool.imap_unordered",
+            lambda self, func, iterable, chunksize=1: _MockedPoolIMapIterator(func, iterable),
         ):
 
             commands = ["network applicaiton-gateway create -h", "version", "find"]
@@ -156,12 +169,170 @@ class TestBenchmark(TestCase):
 
             self.assertEqual(len(result), 3)
 
+    def test_benchmark_with_single_pool(self):
+        with mock.patch(
+            "azdev.operations.performance._benchmark_cmd_timer",
+            return_value=1,
+        ), mock.patch("multiprocessing.Pool") as pool:
+            pool.return_value.imap_unordered.side_effect = \
+                lambda func, iterable, chunksize=1: _MockedPoolIMapIterator(func, iterable)
+
+            commands = ["network applicaiton-gateway create -h", "version", "find"]
+            result = benchmark(commands=commands, runs=3)
+
+            self.assertEqual(pool.call_count, 1)
+            self.assertEqual(pool.return_value.imap_unordered.call_count, 1)
+            self.assertEqual([r["Command"] for r in result], commands)
+            self.assertEqual([r["Runs"] for r in result], [3, 3, 3])
+
+    def test_benchmark_with_both_modes(self):
+        with mock.patch(
+            "azdev.operations.performance._benchmark_cmd_timer",
+            return_value=1,
+        ), mock.patch(
+            "azdev.operations.performance._benchmark_cmd_warm_timer",
+            return_value=0.5,
+        ), mock.patch(
+            "multiprocessing.pool.Pool.imap_unordered",
+            lambda self, func, iterable, chunksize=1: _MockedPoolIMapIterator(func, iterable),
+        ):
+            result = benchmark(commands=["version"], runs=3, mode="both")
+
+            self.assertEqual(len(result), 1)
+            self.assertEqual(result[0]["Media"], 1)
+            self.assertEqual(result[0]["Warm Media"], 0.5)
+
+            result = benchmark(commands=["version"], runs=3, mode="warm")
+
+            self.assertNotIn("Media", result[0])
+            self.assertEqual(result[0]["Warm Media"], 0.5)
+
+    def test_benchmark_with_memory(self):
+        with mock.patch(
+            "azdev.operations.performance._benchmark_cmd_profiler",
+            side_effect=[(1, 100.0, 900), (1, 120.0, 900), (1, 110.0, 900)],
+        ), mock.patch(
+            "azdev.operations.performance._benchmark_cmd_warm_profiler",
+            return_value=(0.5, 60.0, 1200),
+        ), mock.patch(
+            "multiprocessing.pool.Pool.imap_unordered",
+            lambda self, func, iterable, chunksize=1: _MockedPoolIMapIterator(func, iterable),
+        ):
+            result = benchmark(commands=["version"], runs=3, mode="both", memory=True)
+
+            self.assertEqual(result[0]["Media"], 1)
+            self.assertEqual(result[0]["Peak RSS"], 110.0)
+            self.assertEqual(result[0]["Modules"], 900)
+            self.assertEqual(result[0]["Warm Peak RSS"], 60.0)
+            self.assertEqual(result[0]["Warm Modules"], 1200)
+
+    @skipUnless(hasattr(os, 'wait4'), 'requires os.wait4')
+    def test_benchmark_cmd_profiler_counts_modules_without_instrumentation(self):
+        with tempfile.TemporaryDirectory() as root:
+            cli_dir = os.path.join(root, 'azure', 'cli')
+            os.makedirs(cli_dir)
+            for name in ('__init__.py', os.path.join('cli', '__init__.py')):
+                with open(os.path.join(root, 'azure', name), 'w'):
+                    pass
+            with open(os.path.join(cli_dir, '__main__.py'), 'w') as f:
+                f.write('import json, sys\nwith open({!r}, "w") as f:\n'
+                        '    json.dump([sys.argv[1:], "importtime" in sys._xoptions], f)\n'
+                        'sys.exit(1)\n'.format(os.path.join(root, 'argv.json')))
+
+            with mock.patch.dict(os.environ, {'PYTHONPATH': root}), \
+                    mock.patch('azdev.utilities.get_python_bin', return_value=sys.executable):
+                elapsed, max_rss, modules = _benchmark_cmd_profiler('vm list --help')
+
+            with open(os.path.join(root, 'argv.json')) as f:
+                self.assertEqual(json.load(f), [['vm', 'list', '--help'], False])
+        self.assertGreater(elapsed, 0)
+        self.assertGreater(max_rss, 0)
+        # json and the fake azure.cli package are imported by the command
+        self.assertGreater(modules, 3)
+
+    def test_benchmark_with_adaptive_runs(self):
+        noisy = random.Random(0)
+
+        def _mocked_timer(raw_command):
+            return 1 + (noisy.random() if raw_command == "noisy" else 0)
+
+        with mock.patch(
+            "azdev.operations.performance._benchmark_cmd_timer",
+            side_effect=_mocked_timer,
+        ), mock.patch(
+            "multiprocessing.pool.Pool.imap_unordered",
+            lambda self, func, iterable, chunksize=1: _MockedPoolIMapIterator(func, iterable),
+        ):
+            result = benchmark(commands=["stable", "noisy"], runs=5, ci_width=0.05, max_runs=30)
+
+            runs = {r["Command"]: r["Runs"] for r in result}
+            # 5 runs are too few for a 95% confidence interval of the median
+            self.assertEqual(runs["stable"], 10)
+            self.assertEqual(runs["noisy"], 30)
+            self.assertEqual(len(result[1]["Samples"]), 30)
+
+    def test_benchmark_with_wrong_adaptive_runs(self):
+        with self.assertRaisesRegex(CLIError, "Confidence interval width must be greater than 0."):
+            benchmark(["version"], ci_width=-1)
+        with self.assertRaisesRegex(CLIError, "Maximum number of runs must not be less than the number of runs."):
+            benchmark(["version"], runs=20, ci_width=0.1, max_runs=10)
+
+    def test_benchmark_with_wrong_mode(self):
+        with self.assertRaisesRegex(CLIError, "Mode must be one of"):
+            benchmark(["version"], mode="hot")
+
+    def test_fork_server_exit_codes(self):
+        from ..performance.fork_server import _get_exit_code
+
+        self.assertEqual([_get_exit_code(code) for code in (None, 0, 2, 'error')], [0, 0, 2, 1])
+
+    def test_fork_server_without_azure_cli(self):
+        from ..performance.fork_server import ForkServer
+
+        try:
+            import azure.cli.core  # pylint: disable=unused-import
+            self.skipTest("Azure CLI is installed")
+        except ImportError:
+            pass
+
+        with self.assertRaisesRegex(CLIError, "Unable to start the fork server"):
+            ForkServer().start()
+
+    def test_benchmark_with_results_file(self):
+
+        commands = ["network applicaiton-gateway create -h", "version", "find"]
+
+        with tempfile.TemporaryDirectory() as tmp_dir, mock.patch(
+            "azdev.operations.performance._benchmark_cmd_timer",
+            return_value=1,
+        ), mock.patch(
+            "multiprocessing.pool.Pool.imap_unordered",
+            lambda self, func, iterable, chunksize=1: _MockedPoolIMapIterator(func, iterable),
+        ):
+            results_file = os.path.join(tmp_dir, "results.jsonl")
+
+            with self.assertRaisesRegex(CLIError, "--resume requires --results-file"):
+                benchmark(commands=commands, runs=3, resume=True)
+
+            benchmark(commands=commands[:2], runs=3, results_file=results_file)
+            with open(results_file) as f:
+                lines = f.readlines()
+            self.assertEqual([json.loads(line)["Command"] for line in lines], commands[:2])
+
+            # simulate a run interrupted while writing a result
+            with open(results_file, "a") as f:
+                f.write('{"Command": "fi')
+
+            result = benchmark(commands=commands, runs=3, results_file=results_file, resume=True)
+            self.assertEqual([r["Command"] for r in result], commands)
+
+            with open(results_file) as f:
+                self.assertEqual([json.loads(line)["Command"] for line in f], commands)
+
     def test_benchmark_in_actual_running(self):
         with mock.patch(
-            "multiprocessing.pool.Pool.map_async",
-            lambda self, func, iterable, chunksize=None, callback=None, error_callback=None: _MockedPoolMapResult(
-                func, iterable
-            ),
+            "multiprocessing.pool.Pool.imap_unordered",
+            lambda self, func, iterable, chunksize=1: _MockedPoolIMapIterator(func, iterable),
         ):
             commands = ["version"]
 
@@ -182,10 +353,8 @@ class TestBenchmark(TestCase):
 
     def test_benchmark_with_specific_runs(self):
         with mock.patch(
-            "multiprocessing.pool.Pool.map_async",
-            lambda self, func, iterable, chunksize=None, callback=None, error_callback=None: _MockedPoolMapResult(
-                func, iterable
-            ),
+            "multiprocessing.pool.Pool.imap_unordered",
+            lambda self, func, iterable, chunksize=1: _MockedPoolIMapIterator(func, iterable),
         ):
             commands = [
                 "network applicaiton-gateway create -h",
@@ -0,0 +1,99 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+import json
+import os
+import random
+import tempfile
+from unittest import TestCase
+
+from knack.util import CLIError
+
+from ..performance.compare import (
+    compare_benchmarks,
+    compare_results,
+)
+
+
+def _result(command, samples, prefix=""):
+    samples = sorted(samples)
+    return {"Command": command, prefix + "Media": samples[len(samples) // 2], prefix + "Samples": samples}
+
+
+class TestBenchmarkCompare(TestCase):
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.old = [
+            _result("version", [1.0 + rng.gauss(0, 0.01) for _ in range(20)]),
+            _result("vm list", [2.0 + rng.gauss(0, 0.01) for _ in range(20)]),
+            _result("group list", [1.5 + rng.gauss(0, 0.01) for _ in range(20)]),
+            _result("find", [3.0 + rng.gauss(0, 0.01) for _ in range(20)]),
+        ]
+        self.new = [
+            _result("version", [1.0 + rng.gauss(0, 0.01) for _ in range(20)]),
+            _result("vm list", [2.4 + rng.gauss(0, 0.01) for _ in range(20)]),
+            _result("group list", [1.2 + rng.gauss(0, 0.01) for _ in range(20)]),
+            _result("storage account list", [1.0 + rng.gauss(0, 0.01) for _ in range(20)]),
+        ]
+
+    def test_compare_results(self):
+        result = compare_results(self.old, self.new)
+
+        self.assertEqual([r["Command"] for r in result], ["vm list", "version", "group list"])
+        self.assertAlmostEqual(result[0]["Change"], 20, delta=2)
+        self.assertTrue(result[0]["Significant"])
+        self.assertFalse(result[1]["Significant"])
+        self.assertAlmostEqual(result[2]["Change"], -20, delta=2)
+        self.assertTrue(result[2]["Significant"])
+
+    def test_compare_results_without_samples(self):
+        old = [{"Command": "version", "Media": 1.0}]
+        new = [{"Command": "version", "Media": 2.0}]
+        result = compare_results(old, new)
+
+        self.assertEqual(result[0]["Change"], 100)
+        self.assertIsNone(result[0]["P-Value"])
+        self.assertFalse(result[0]["Significant"])
+
+    def test_compare_warm_results(self):
+        rng = random.Random(3)
+        old = [_result("version", [0.5 + rng.gauss(0, 0.01) for _ in range(20)], prefix="Warm ")]
+        new = [_result("version", [0.6 + rng.gauss(0, 0.01) for _ in range(20)], prefix="Warm ")]
+
+        result = compare_results(old, new)
+        self.assertEqual([(r["Command"], r["Mode"]) for r in result], [("version", "warm")])
+        self.assertAlmostEqual(result[0]["Change"], 20, delta=3)
+        self.assertTrue(result[0]["Significant"])
+
+        # with both modes, each mode measured in both results is compared
+        both = [dict(r, **_result("version", [1.0 + rng.gauss(0, 0.01) for _ in range(20)])) for r in new]
+        self.assertEqual([r["Mode"] for r in compare_results(both, both)], ["cold", "warm"])
+        self.assertEqual([r["Mode"] for r in compare_results(self.old, both)], ["cold"])
+
+        with self.assertRaisesRegex(CLIError, "share no benchmark mode"):
+            compare_results(self.old, new)
+
+    def test_compare_files(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            old_path = os.path.join(tmp_dir, "old.json")
+            new_path = os.path.join(tmp_dir, "new.jsonl")
+            with open(old_path, "w") as f:
+                json.dump(self.old, f)
+            with open(new_path, "w") as f:
+                for r in self.new:
+                    f.write(json.dumps(r) + "\n")
+
+            result = compare_benchmarks([old_path, new_path])
+            self.assertEqual(len(result), 3)
+
+    def test_compare_usage_error(self):
+        with self.assertRaisesRegex(CLIError, "usage error"):
+            compare_benchmarks(["old.json"])
+        with self.assertRaisesRegex(CLIError, "usage error"):
+            compare_benchmarks(["old.json", "new.json"], git_target="dev", git_repo=".")
+        with self.assertRaisesRegex(CLIError, "usage error"):
+            compare_benchmarks(git_target="dev")
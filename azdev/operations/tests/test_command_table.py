@@ -0,0 +1,247 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+from unittest import mock, TestCase
+
+from knack.util import CLIError
+
+from azdev.operations import command_table
+from azdev.operations.command_table import get_command_table_snapshot, get_snapshot_key, select_commands
+
+
+SNAPSHOT = {
+    'commands': {
+        'vm create': {'source': 'vm', 'is_extension': False, 'help': None, 'arguments': {}, 'codegen': None},
+        'network vnet list': {'source': 'network', 'is_extension': False, 'help': None, 'arguments': {},
+                              'codegen': {'version': 'v2', 'type': 'Atomic'}},
+        'aks preview': {'source': 'aks-preview', 'is_extension': True, 'help': None, 'arguments': {},
+                        'codegen': None},
+    },
+    'command_groups': {}
+}
+
+
+class TestCommandTableSnapshot(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.module_path = os.path.join(self.root, 'vm')
+        os.makedirs(self.module_path)
+        with open(os.path.join(self.module_path, 'commands.py'), 'w') as f:
+            f.write('pass\n')
+        self.path_table = {'core': {}, 'mod': {'vm': self.module_path}, 'ext': {}}
+        self.config_dir = os.path.join(self.root, 'config')
+        patcher = mock.patch.object(command_table, 'get_azdev_config_dir', return_value=self.config_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_snapshot_key_tracks_sources(self):
+        key = get_snapshot_key(self.path_table)
+        self.assertEqual(key, get_snapshot_key(self.path_table))
+
+        # files other than Python sources do not affect the key
+        with open(os.path.join(self.module_path, 'notes.txt'), 'w') as f:
+            f.write('notes\n')
+        self.assertEqual(key, get_snapshot_key(self.path_table))
+
+        with open(os.path.join(self.module_path, '_params.py'), 'w') as f:
+            f.write('pass\n')
+        added_key = get_snapshot_key(self.path_table)
+        self.assertNotEqual(key, added_key)
+
+        with open(os.path.join(self.module_path, 'commands.py'), 'w') as f:
+            f.write('print("changed")\n')
+        self.assertNotEqual(added_key, get_snapshot_key(self.path_table))
+
+    def test_snapshot_reused_until_sources_change(self):
+        with mock.patch.object(command_table, 'get_path_table', return_value=self.path_table), \
+                mock.patch.object(command_table, 'create_command_table_snapshot',
+                                  side_effect=lambda *_: {'commands': {}, 'command_groups': {}}) as create:
+            get_command_table_snapshot()
+            get_command_table_snapshot()
+            self.assertEqual(create.call_count, 1)
+
+            with open(os.path.join(self.module_path, 'custom.py'), 'w') as f:
+                f.write('pass\n')
+            get_command_table_snapshot()
+            self.assertEqual(create.call_count, 2)
+
+    def test_snapshot_not_cached_without_setup(self):
+        with mock.patch.object(command_table, 'get_path_table', side_effect=CLIError('run azdev setup')), \
+                mock.patch.object(command_table, 'create_command_table_snapshot',
+                                  return_value={'commands': {}, 'command_groups': {}}) as create:
+            get_command_table_snapshot()
+            get_command_table_snapshot()
+            self.assertEqual(create.call_count, 2)
+        self.assertFalse(os.path.exists(self.config_dir))
+
+    def test_snapshot_not_cached_when_modules_fail(self):
+        def _create(*_):
+            return {'commands': {}, 'command_groups': {}, 'errors': {'vm': 'ImportError: no module named vm'}}
+
+        with mock.patch.object(command_table, 'get_path_table', return_value=self.path_table), \
+                mock.patch.object(command_table, 'create_command_table_snapshot', side_effect=_create) as create:
+            self.assertEqual(get_command_table_snapshot(), {'commands': {}, 'command_groups': {}})
+            get_command_table_snapshot()
+            self.assertEqual(create.call_count, 2)
+        self.assertFalse(os.path.exists(os.path.join(self.config_dir, command_table.SNAPSHOT_FILE)))
+
+    def test_select_commands(self):
+        name_index = {'vm': 'azure-cli-vm', 'network': 'azure-cli-network', 'aks-preview': 'azext_aks_preview'}
+        with mock.patch.object(command_table, 'get_name_index', return_value=name_index):
+            self.assertEqual(set(select_commands(SNAPSHOT, modules=['vm', 'azext_aks_preview'])),
+                             {'vm create', 'aks preview'})
+            self.assertEqual(set(select_commands(SNAPSHOT, modules=['azure-cli-network'])), {'network vnet list'})
+            self.assertEqual(select_commands(SNAPSHOT), {})
+
+
+class _SerialPool:
+    def __init__(self, processes=None):
+        self.processes = processes
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def map(self, func, iterable, chunksize=None):  # pylint: disable=unused-argument
+        return [func(item) for item in iterable]
+
+
+def _fake_load_module_snapshot(task):
+    module_name, source, is_extension, _ = task
+    if module_name == 'broken':
+        return module_name, None, 'ImportError: no module named broken'
+    return module_name, {
+        'commands': {'{} show'.format(source): {'source': source, 'is_extension': is_extension},
+                     'shared show': {'source': source, 'is_extension': is_extension}},
+        'command_groups': {source: {'help': None}}
+    }, None
+
+
+def _fake_azure_cli_modules(events):
+    """ Fake the parts of azure-cli-core that load a single command module, recording the events raised. """
+    import types
+    from knack.arguments import CLICommandArgument
+    from knack.events import EVENT_INVOKER_POST_CMD_TBL_CREATE
+
+    class _Loader:  # pylint: disable=too-few-public-methods
+        def __init__(self):
+            self.command_table = {}
+            self.command_group_table = {}
+            self.cmd_to_loader_map = {}
+
+        def load_arguments(self):
+            for command in self.command_table.values():
+                command.arguments['name'] = CLICommandArgument('name', options_list=['--name', '-n'], help='Name.')
+
+    class _Invocation:  # pylint: disable=too-few-public-methods
+        def __init__(self, **_):
+            self.commands_loader = _Loader()
+
+    class _CLI:
+        invocation_cls = _Invocation
+        commands_loader_cls = parser_cls = help_cls = None
+
+        def __init__(self):
+            self.handlers = {}
+
+        def register_event(self, name, handler):
+            self.handlers.setdefault(name, []).append(handler)
+
+        def raise_event(self, name, **kwargs):
+            events.append(name)
+            for handler in self.handlers.get(name, []):
+                handler(self, **kwargs)
+
+    def _register_ids_argument(cli_ctx):
+        def _add_ids(_, commands_loader):
+            for command in commands_loader.command_table.values():
+                command.arguments['ids'] = CLICommandArgument('ids', options_list=['--ids'], help='Resource IDs.')
+        cli_ctx.register_event(EVENT_INVOKER_POST_CMD_TBL_CREATE, _add_ids)
+
+    def _load_module_command_loader(loader, _, module_name):
+        command = types.SimpleNamespace(arguments={})
+        loader.cmd_to_loader_map['{} show'.format(module_name)] = [loader]
+        return {'{} show'.format(module_name): command}, {module_name: None}
+
+    cli = _CLI()
+    modules = {name: types.ModuleType(name) for name in (
+        'azure', 'azure.cli', 'azure.cli.core', 'azure.cli.core.commands', 'azure.cli.core.commands.arm',
+        'azure.cli.core.commands.events')}
+    modules['azure.cli.core'].get_default_cli = lambda: cli
+    commands = modules['azure.cli.core.commands']
+    commands.AzCliCommand = type('AzCliCommand', (), {})
+    commands.register_cache_arguments = lambda cli_ctx: None
+    commands._load_module_command_loader = _load_module_command_loader  # pylint: disable=protected-access
+    commands._load_extension_command_loader = None  # pylint: disable=protected-access
+    modules['azure.cli.core.commands.arm'].register_global_subscription_argument = lambda cli_ctx: None
+    modules['azure.cli.core.commands.arm'].register_ids_argument = _register_ids_argument
+    modules['azure.cli.core.commands.events'].EVENT_INVOKER_PRE_LOAD_ARGUMENTS = 'PreLoadArguments'
+    modules['azure.cli.core.commands.events'].EVENT_INVOKER_POST_LOAD_ARGUMENTS = 'PostLoadArguments'
+    return modules
+
+
+class TestCommandTableParallelLoad(TestCase):
+
+    def test_load_module_snapshot(self):
+        from knack.events import EVENT_INVOKER_POST_CMD_TBL_CREATE
+
+        events = []
+        with mock.patch.dict('sys.modules', _fake_azure_cli_modules(events)):
+            module_name, snapshot, error = command_table._load_module_snapshot(  # pylint: disable=protected-access
+                ('vm', 'vm', False, '/src/vm'))
+
+        self.assertIsNone(error)
+        self.assertEqual(module_name, 'vm')
+        self.assertEqual(events, ['PreLoadArguments', 'PostLoadArguments', EVENT_INVOKER_POST_CMD_TBL_CREATE])
+        # arguments added on the table creation event are serialized along with the loaded ones
+        self.assertEqual(snapshot['commands']['vm show']['arguments'], {
+            'name': {'options': ['--name', '-n'], 'required': False, 'help': 'Name.'},
+            'ids': {'options': ['--ids'], 'required': False, 'help': 'Resource IDs.'}
+        })
+        self.assertEqual(snapshot['commands']['vm show']['source'], 'vm')
+
+    def test_commands_without_source_left_out(self):
+        import types
+
+        modules = _fake_azure_cli_modules([])
+        modules['azure.cli.core.commands'].ExtensionCommandSource = type('ExtensionCommandSource', (), {})
+        loader = types.SimpleNamespace(command_group_table={}, cmd_to_loader_map={'vm show': [], 'orphan': []},
+                                       command_table={
+                                           'vm show': types.SimpleNamespace(command_source='vm', arguments={}),
+                                           'orphan': types.SimpleNamespace(command_source=None, arguments={})})
+        with mock.patch.dict('sys.modules', modules), \
+                mock.patch.object(command_table, 'command_codegen_info', return_value=None), \
+                mock.patch.object(command_table.logger, 'warning') as warning:
+            snapshot = command_table._serialize_command_loader(loader)  # pylint: disable=protected-access
+
+        self.assertEqual(list(snapshot['commands']), ['vm show'])
+        self.assertEqual(snapshot['commands']['vm show']['source'], 'vm')
+        self.assertEqual(warning.call_args[0][1], 'orphan')
+
+    def test_module_snapshots_merged_in_order(self):
+        path_table = {
+            'core': {'azure-cli-core': '/src/azure-cli-core'},
+            'mod': {'vm': '/src/vm', 'broken': '/src/broken', 'network': '/src/network'},
+            'ext': {'azext_aks_preview': '/ext/src/aks-preview'}
+        }
+        with mock.patch('multiprocessing.Pool', _SerialPool), \
+                mock.patch.object(command_table, '_load_module_snapshot', _fake_load_module_snapshot):
+            snapshot = command_table._create_snapshot_in_parallel(path_table)  # pylint: disable=protected-access
+
+        self.assertEqual(sorted(snapshot['commands']), ['aks-preview show', 'network show', 'shared show', 'vm show'])
+        self.assertEqual(sorted(snapshot['command_groups']), ['aks-preview', 'network', 'vm'])
+        # extensions are merged last and override module commands of the same name
+        self.assertEqual(snapshot['commands']['shared show'], {'source': 'aks-preview', 'is_extension': True})
+        self.assertEqual(snapshot['errors'], {'broken': 'ImportError: no module named broken'})
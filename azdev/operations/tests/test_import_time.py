@@ -0,0 +1,64 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+from unittest import TestCase
+
+from ..performance.import_time import (
+    parse_import_time,
+    parse_load_time_output,
+    summarize_imports,
+    slowest_imports,
+)
+
+
+LOAD_TIME_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   _io
+import time:       400 |        500 | azure.cli.core
+DEBUG: cli.knack.cli: Command arguments: ['-h', '--debug']
+import time:      2000 |       2000 |       msrest.serialization
+import time:      3000 |       5000 |     msrestazure
+import time:      1000 |       6000 |   azure.mgmt.network
+import time:       500 |       6500 | azure.cli.command_modules.network
+DEBUG: Loaded module 'network' in 0.080 seconds.
+import time:       300 |        300 | azure.cli.command_modules.redis
+DEBUG: Loaded module 'redis' in 0.004 seconds.
+import time:       200 |        200 | azure.cli.core.commands.progress
+""".splitlines()
+
+
+class TestImportTimeParser(TestCase):
+
+    def test_parse_import_tree(self):
+        roots = parse_import_time(LOAD_TIME_OUTPUT)
+        self.assertEqual([r.name for r in roots], [
+            'azure.cli.core', 'azure.cli.command_modules.network', 'azure.cli.command_modules.redis',
+            'azure.cli.core.commands.progress'])
+
+        network = roots[1]
+        self.assertEqual(network.self_time, 500)
+        self.assertEqual(network.cumulative_time, 6500)
+        self.assertEqual([c.name for c in network.children], ['azure.mgmt.network'])
+        self.assertEqual([c.name for c in network.children[0].children], ['msrestazure'])
+        self.assertEqual(
+            [path for path, _ in network.walk()][-1],
+            ('azure.cli.command_modules.network', 'azure.mgmt.network', 'msrestazure', 'msrest.serialization'))
+
+    def test_attribute_imports_to_modules(self):
+        load_times, imports = parse_load_time_output(LOAD_TIME_OUTPUT)
+        self.assertEqual(load_times, {'network': 80.0, 'redis': 4.0})
+        self.assertEqual([r.name for r in imports['network']], ['azure.cli.command_modules.network'])
+        self.assertEqual([r.name for r in imports['redis']], ['azure.cli.command_modules.redis'])
+        self.assertEqual([r.name for r in imports[None]], ['azure.cli.core', 'azure.cli.core.commands.progress'])
+
+    def test_slowest_imports(self):
+        _, imports = parse_load_time_output(LOAD_TIME_OUTPUT)
+        summary = summarize_imports([imports['network'], imports['network']])
+        self.assertEqual(summary['msrestazure']['self'], 3.0)
+        self.assertEqual(summary['msrestazure']['cumulative'], 5.0)
+
+        # children of an import already in the list are not reported again
+        slowest = slowest_imports(summary, top=2)
+        self.assertEqual([name for name, _ in slowest], ['azure.cli.command_modules.network'])
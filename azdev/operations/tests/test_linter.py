@@ -0,0 +1,470 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+import argparse
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import types
+from contextlib import redirect_stdout
+from types import SimpleNamespace
+from unittest import mock, TestCase
+
+from azdev.operations.linter import source_checks
+from azdev.operations.linter.cache import LinterCache, _stable_repr
+from azdev.operations.linter.linter import Linter, LinterManager, LinterSeverity, RuleError
+from azdev.operations.linter.report import get_sarif_report, write_report
+from azdev.operations.linter.rule_decorators import CommandRule, ParameterRule
+
+
+def _get_argument(*options, **settings):
+    return SimpleNamespace(type=SimpleNamespace(settings=dict(settings, options_list=list(options))))
+
+
+def _get_command_loader(command_count=50):
+    command_table = {
+        'group{} command{}'.format(i % 3, i): SimpleNamespace(deprecate_info=None, arguments={
+            'name': _get_argument('--name', '-n'),
+            'resource_group_name': _get_argument('--resource-group', '-g')
+        })
+        for i in range(command_count)
+    }
+    return SimpleNamespace(
+        command_table=command_table,
+        command_group_table={'group{}'.format(i): None for i in range(3)},
+        cmd_to_loader_map={},
+        cli_ctx=SimpleNamespace(invocation=SimpleNamespace(parser=None)))
+
+
+CHECKED_COMMANDS = []
+
+
+def odd_command_rule(linter, command_name):  # pylint: disable=unused-argument
+    CHECKED_COMMANDS.append(command_name)
+    if int(command_name.split('command')[-1]) % 2:
+        raise RuleError('odd command')
+
+
+def name_parameter_rule(linter, command_name, parameter_name):  # pylint: disable=unused-argument
+    if parameter_name == 'name' and command_name.startswith('group1'):
+        raise RuleError('name parameter')
+
+
+def _get_linter_manager(command_loader=None, param_severity=LinterSeverity.HIGH, **kwargs):
+    """ Create a linter manager with the odd command and name parameter rules registered. """
+    manager = LinterManager(command_loader=command_loader or _get_command_loader(), help_file_entries={},
+                            loaded_help={}, **kwargs)
+    CommandRule(LinterSeverity.HIGH)(odd_command_rule)(manager)
+    ParameterRule(param_severity)(name_parameter_rule)(manager)
+    return manager
+
+
+def _run_rules(manager):
+    """ Run the command and parameter rules of a manager in its pool of workers.
+
+    :returns: str of the output printed by the rules.
+    """
+    output = io.StringIO()
+    pool = manager._create_pool()  # pylint: disable=protected-access
+    try:
+        with redirect_stdout(output):
+            manager._run_rules('commands', pool)  # pylint: disable=protected-access
+            manager._run_rules('params', pool)  # pylint: disable=protected-access
+    finally:
+        manager._close_pool(pool)  # pylint: disable=protected-access
+    return output.getvalue()
+
+
+def _run_linter(workers, exclusions=None):
+    manager = _get_linter_manager(exclusions=exclusions, workers=workers)
+    return _run_rules(manager), manager.exit_code
+
+
+class TestLinterRuleEngine(TestCase):
+
+    def test_serial_run(self):
+        output, exit_code = _run_linter(workers=1)
+        self.assertEqual(exit_code, 1)
+        self.assertEqual(output.count('odd command'), 25)
+        self.assertEqual(output.count('name parameter'), 17)
+
+    def test_parallel_run_matches_serial_run(self):
+        exclusions = {'group1 command1': {'rule_exclusions': ['odd_command_rule']},
+                      'group1 command4': {'parameters': {'name': {'rule_exclusions': ['name_parameter_rule']}}}}
+        serial_output, serial_exit_code = _run_linter(workers=1, exclusions=exclusions)
+        parallel_output, parallel_exit_code = _run_linter(workers=3, exclusions=exclusions)
+        self.assertEqual(parallel_output, serial_output)
+        self.assertEqual(parallel_exit_code, serial_exit_code)
+        self.assertEqual(serial_output.count('odd command'), 24)
+        self.assertEqual(serial_output.count('name parameter'), 16)
+
+    def test_no_violations(self):
+        manager = _get_linter_manager(_get_command_loader(command_count=0), workers=2)
+        _run_rules(manager)
+        self.assertEqual(manager.exit_code, 0)
+
+
+def _get_parameter_help(name, short_summary):
+    return SimpleNamespace(name=name, short_summary=short_summary, long_summary=None)
+
+
+class TestLinterIndexes(TestCase):
+
+    def setUp(self):
+        command_loader = _get_command_loader(command_count=1)
+        command_loader.command_table['vm create'] = SimpleNamespace(arguments={
+            'name': _get_argument('--name', '-n'),
+            'ids': _get_argument('--ids', help='One or more resource IDs.'),
+            'size': _get_argument('--size', default='Standard_DS1_v2'),
+        })
+        loaded_help = {
+            'vm create': SimpleNamespace(parameters=[
+                _get_parameter_help('--size', 'The VM size.'),
+                _get_parameter_help('-n', 'Short name help.'),
+                _get_parameter_help('--name -n', 'The name of the VM.'),
+            ]),
+            'vm': SimpleNamespace(short_summary='Manage VMs.', long_summary=None)
+        }
+        self.linter = Linter(command_loader=command_loader, help_file_entries={}, loaded_help=loaded_help)
+
+    def test_get_parameter_help(self):
+        # the first parameter help documenting any option wins, as in the order of the help
+        self.assertEqual(self.linter.get_parameter_help('vm create', 'name'), 'Short name help.')
+        self.assertEqual(self.linter.get_parameter_help('vm create', 'size'), 'The VM size.')
+        # falls back to the help of the argument when it is not documented
+        self.assertEqual(self.linter.get_parameter_help('vm create', 'ids'), 'One or more resource IDs.')
+        self.assertIsNone(self.linter.get_parameter_help('group0 command0', 'name'))
+
+    def test_is_valid_parameter_help_name(self):
+        self.assertTrue(self.linter.is_valid_parameter_help_name('vm create', '--name -n'))
+        self.assertFalse(self.linter.is_valid_parameter_help_name('vm create', '--name'))
+        self.assertFalse(self.linter.is_valid_parameter_help_name('vm', '--name -n'))
+        self.assertFalse(self.linter.is_valid_parameter_help_name('vm delete', '--name -n'))
+
+    def test_get_parameter_settings(self):
+        self.assertEqual(self.linter.get_parameter_options('vm create', 'name'), ['--name', '-n'])
+        self.assertEqual(self.linter.get_parameter_settings('vm create', 'size')['default'], 'Standard_DS1_v2')
+        self.assertEqual(self.linter.get_command_parameters('vm create'), {'name', 'ids', 'size'})
+
+
+class TestLinterCache(TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.cache_dir, 'linter_cache.json')
+        del CHECKED_COMMANDS[:]
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def _run_linter(self, command_loader, workers=1):
+        manager = _get_linter_manager(command_loader, workers=workers)
+        manager._cache = LinterCache(manager, path=self.cache_path)  # pylint: disable=protected-access
+        output = _run_rules(manager)
+        manager._cache.save()  # pylint: disable=protected-access
+        return output, manager.exit_code
+
+    def test_unchanged_commands_replayed_from_cache(self):
+        # results checked in worker processes are cached too
+        output, exit_code = self._run_linter(_get_command_loader(), workers=2)
+        self.assertEqual(output.count('odd command'), 25)
+
+        cached_output, cached_exit_code = self._run_linter(_get_command_loader())
+        self.assertEqual(CHECKED_COMMANDS, [])
+        self.assertEqual(cached_output, output)
+        self.assertEqual(cached_exit_code, exit_code)
+
+    def test_changed_commands_checked_again(self):
+        self._run_linter(_get_command_loader())
+
+        del CHECKED_COMMANDS[:]
+        command_loader = _get_command_loader()
+        command_loader.command_table['group1 command1'].arguments['name'] = _get_argument('--name')
+        command_loader.command_table['group2 command51'] = SimpleNamespace(deprecate_info=None, arguments={})
+        output, _ = self._run_linter(command_loader)
+        self.assertEqual(sorted(CHECKED_COMMANDS), ['group1 command1', 'group2 command51'])
+        self.assertEqual(output.count('odd command'), 26)
+
+        del CHECKED_COMMANDS[:]
+        self._run_linter(command_loader)
+        self.assertEqual(CHECKED_COMMANDS, [])
+
+    def test_stable_repr(self):
+        class Option:  # pylint: disable=too-few-public-methods
+            def __init__(self, target):
+                self.target = target
+                self.cli_ctx = object()
+
+        settings = {'options_list': ['--name', Option('--old-name')], 'validator': _get_argument, 'choices': {'b', 'a'}}
+        self.assertEqual(_stable_repr(settings), _stable_repr(dict(settings)))
+        self.assertNotIn('0x', _stable_repr(settings))
+        self.assertIn("target='--old-name'", _stable_repr(settings))
+        self.assertIn('test_linter._get_argument', _stable_repr(settings))
+
+
+class TestLinterExclusionViews(TestCase):
+
+    def setUp(self):
+        command_loader = _get_command_loader(command_count=6)
+        command_loader.command_group_table['group2 sub'] = None
+        command_loader.command_table['group2 sub command'] = SimpleNamespace(deprecate_info=None, arguments={})
+        help_file_entries = {name: {} for name in list(command_loader.command_table) + ['group0', 'group2 sub']}
+        self.manager = LinterManager(command_loader=command_loader, help_file_entries=help_file_entries,
+                                     loaded_help={}, use_ci_exclusions=True)
+        # commands of group0 and group2 are in module "a", the rest in module "b"
+        patcher = mock.patch('azdev.operations.linter.linter._get_command_source',
+                             side_effect=lambda name, _: ('b' if name.startswith('group1') else 'a', False))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_view_excludes_modules(self):
+        with mock.patch('azdev.operations.linter.linter.get_name_index',
+                        return_value={'a': 'azure-cli-a', 'b': 'azure-cli-b'}) as get_name_index:
+            view = self.manager._get_linter_without_modules(['azure-cli-a'])  # pylint: disable=protected-access
+            self.assertIs(view, self.manager._get_linter_without_modules(['azure-cli-a']))  # pylint: disable=protected-access
+            self.manager._get_linter_without_modules(['b'])  # pylint: disable=protected-access
+        self.assertEqual(get_name_index.call_count, 1)
+
+        self.assertEqual(sorted(view.commands), ['group1 command1', 'group1 command4'])
+        self.assertIn('group1 command4', view.commands)
+        self.assertNotIn('group0 command0', view.commands)
+        self.assertEqual(view.command_groups, ['group1'])
+        self.assertEqual(view.help_file_entries, {'group1 command1', 'group1 command4'})
+        self.assertIsNone(view.get_command_metadata('group0 command0'))
+        self.assertIsNone(view.get_command_parameters('group2 sub command'))
+        self.assertEqual(view.get_command_parameters('group1 command1'), {'name', 'resource_group_name'})
+
+        # the main linter is left untouched
+        main_linter = self.manager.linter
+        self.assertEqual(len(main_linter.commands), 7)
+        self.assertEqual(main_linter.command_groups, ['group0', 'group1', 'group2', 'group2 sub'])
+        self.assertIn('group2 sub', main_linter.help_file_entries)
+
+    def test_unknown_sources_are_kept(self):
+        with mock.patch('azdev.operations.linter.linter.get_name_index', return_value={'b': 'azure-cli-b'}):
+            view = self.manager._get_linter_without_modules(['a', 'b'])  # pylint: disable=protected-access
+        self.assertEqual(len(view.commands), 5)
+
+
+class TestLinterReport(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _get_rule_results(self, workers=1):
+        manager = _get_linter_manager(_get_command_loader(command_count=4), param_severity=LinterSeverity.MEDIUM,
+                                      min_severity=LinterSeverity.LOW, workers=workers)
+        _run_rules(manager)
+        return manager.rule_results
+
+    def test_rule_results_timed(self):
+        for workers in (1, 2):
+            rule_results = self._get_rule_results(workers=workers)
+            self.assertEqual([(r['rule'], r['rule_type'], len(r['violations'])) for r in rule_results],
+                             [('odd_command_rule', 'commands', 2), ('name_parameter_rule', 'params', 1)])
+            for result in rule_results:
+                self.assertGreater(result['duration'], 0)
+
+    def test_json_report(self):
+        path = os.path.join(self.root, 'results', 'linter.json')
+        write_report(self._get_rule_results(), 'json', path, exit_code=1)
+        with open(path) as f:
+            report = json.load(f)
+        self.assertFalse(report['passed'])
+        self.assertEqual([(r['rule'], r['severity'], r['violations']) for r in report['rules']],
+                         [('odd_command_rule', 'high', 2), ('name_parameter_rule', 'medium', 1)])
+        self.assertEqual(report['violations'][0], {
+            'rule': 'odd_command_rule', 'rule_type': 'commands', 'severity': 'high', 'command': 'group0 command3',
+            'message': 'Command: `group0 command3` - odd command'})
+        self.assertEqual(report['violations'][2]['command'], 'group1 command1')
+        self.assertEqual(report['violations'][2]['parameter'], 'name')
+
+    def test_sarif_report(self):
+        report = get_sarif_report(self._get_rule_results(), exit_code=1)
+        run = report['runs'][0]
+        self.assertEqual(report['version'], '2.1.0')
+        self.assertEqual(run['invocations'], [{'executionSuccessful': True, 'exitCode': 1}])
+        self.assertEqual([rule['id'] for rule in run['tool']['driver']['rules']],
+                         ['odd_command_rule', 'name_parameter_rule'])
+        self.assertIn('duration', run['tool']['driver']['rules'][0]['properties'])
+        self.assertEqual([(r['ruleIndex'], r['level']) for r in run['results']],
+                         [(0, 'error'), (0, 'error'), (1, 'warning')])
+        self.assertEqual(run['results'][2]['locations'][0]['logicalLocations'][0],
+                         {'name': 'name', 'kind': 'parameter', 'fullyQualifiedName': 'group1 command1 name'})
+
+
+_COMMANDS_SOURCE = """
+def load_command_table(self, _):
+    with self.command_group('vm') as g:
+        g.command('show', 'get')
+        g.show_command('get-instance-view', 'get_instance_view')
+    with self.command_group('vm disk') as g:
+        g.custom_command('show', 'show_disk')
+        g.custom_show_command('list', 'list_disks')
+"""
+
+
+class TestCommandSourceChecks(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.config_dir = os.path.join(self.root, 'config')
+        patcher = mock.patch.object(source_checks, 'get_azdev_config_dir', return_value=self.config_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.paths = []
+        for name in ('vm', 'network'):
+            module_path = os.path.join(self.root, name)
+            for sub_path in ('', 'tests'):
+                os.makedirs(os.path.join(module_path, sub_path), exist_ok=True)
+                with open(os.path.join(module_path, sub_path, 'commands.py'), 'w') as f:
+                    f.write(_COMMANDS_SOURCE if name == 'vm' else 'pass\n')
+            self.paths.append(module_path)
+        self.vm_commands = os.path.join(self.root, 'vm', 'commands.py')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_show_command_violations(self):
+        violations = source_checks.check_command_sources(self.paths)
+        # test files are not checked
+        self.assertEqual(violations, [(self.vm_commands, 4, 8, 'show-command'),
+                                      (self.vm_commands, 7, 8, 'show-command')])
+        self.assertEqual(source_checks.format_violation(violations[0]),
+                         '{}:4:8: E5001: Show command must use show_command or custom_show_command. '
+                         '(show-command)'.format(self.vm_commands))
+
+    def test_unchanged_files_not_parsed_again(self):
+        violations = source_checks.check_command_sources(self.paths)
+        with mock.patch.object(source_checks.ast, 'parse') as parse:
+            self.assertEqual(source_checks.check_command_sources(self.paths), violations)
+            # touching a file without changing its content only hashes it again
+            os.utime(self.vm_commands, ns=(0, 0))
+            self.assertEqual(source_checks.check_command_sources(self.paths), violations)
+            self.assertEqual(parse.call_count, 0)
+
+        with open(self.vm_commands, 'w') as f:
+            f.write(_COMMANDS_SOURCE.replace("g.command('show'", "g.show_command('show'"))
+        self.assertEqual(source_checks.check_command_sources(self.paths), [(self.vm_commands, 7, 8, 'show-command')])
+
+    def test_files_without_checked_calls_not_parsed(self):
+        with mock.patch.object(source_checks.ast, 'parse', wraps=source_checks.ast.parse) as parse:
+            source_checks.check_command_sources(self.paths)
+        self.assertEqual([call[1]['filename'] for call in parse.call_args_list], [self.vm_commands])
+
+    def test_inline_disable_comments(self):
+        with open(self.vm_commands, 'w') as f:
+            f.write(_COMMANDS_SOURCE.replace(
+                "g.command('show', 'get')", "g.command('show', 'get')  # pylint: disable=line-too-long,show-command"
+            ).replace(
+                "        g.custom_command('show', 'show_disk')",
+                "        # pylint: disable-next=E5001\n        g.custom_command('show', 'show_disk')"))
+        self.assertEqual(source_checks.check_command_sources(self.paths), [])
+
+        # a comment disabling another message, or on the line before without -next, does not apply
+        with open(self.vm_commands, 'w') as f:
+            f.write(_COMMANDS_SOURCE.replace(
+                "        g.custom_command('show', 'show_disk')",
+                "        g.custom_command(  # pylint: disable=line-too-long\n            'show', 'show_disk')"
+            ).replace("with self.command_group('vm') as g:",
+                      "with self.command_group('vm') as g:  # pylint: disable=show-command"))
+        self.assertEqual(source_checks.check_command_sources(self.paths), [(self.vm_commands, 4, 8, 'show-command'),
+                                                                           (self.vm_commands, 7, 8, 'show-command')])
+
+    def test_cache_kept_across_module_selections(self):
+        network_commands = os.path.join(self.root, 'network', 'commands.py')
+        source_checks.check_command_sources(self.paths[:1])
+        source_checks.check_command_sources(self.paths[1:])
+        with open(os.path.join(self.config_dir, source_checks.CACHE_FILE)) as f:
+            self.assertEqual(sorted(json.load(f)['files']), sorted([network_commands, self.vm_commands]))
+
+        # files removed from a selected module are dropped
+        os.remove(network_commands)
+        source_checks.check_command_sources(self.paths[1:])
+        with open(os.path.join(self.config_dir, source_checks.CACHE_FILE)) as f:
+            self.assertEqual(list(json.load(f)['files']), [self.vm_commands])
+
+    def test_parallel_scan_matches_serial_scan(self):
+        serial_violations = source_checks.check_command_sources(self.paths, workers=1)
+        os.remove(os.path.join(self.config_dir, source_checks.CACHE_FILE))
+        with mock.patch.object(source_checks, 'MIN_PARALLEL_FILES', 1):
+            self.assertEqual(source_checks.check_command_sources(self.paths, workers=2), serial_violations)
+
+    def test_pylint_rules_use_linter_workers(self):
+        from azdev.operations import linter
+
+        with mock.patch.object(source_checks, 'MIN_PARALLEL_FILES', 1), \
+                mock.patch('multiprocessing.Pool') as pool, \
+                mock.patch.object(linter, 'display'):
+            self.assertEqual(linter.pylint_rules(self.paths, workers=1), 1)
+        self.assertFalse(pool.called)
+
+
+class _FakeAzCliCommandParser(argparse.ArgumentParser):
+    pass
+
+
+class TestHelpExampleParameters(TestCase):
+
+    def setUp(self):
+        parser_module = types.ModuleType('azure.cli.core.parser')
+        parser_module.AzCliCommandParser = _FakeAzCliCommandParser
+        modules = {name: types.ModuleType(name) for name in ('azure', 'azure.cli', 'azure.cli.core')}
+        modules['azure.cli.core.parser'] = parser_module
+        patcher = mock.patch.dict(sys.modules, modules)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.parser = _FakeAzCliCommandParser(prog='az')
+        groups = self.parser.add_subparsers().add_parser('group').add_subparsers()
+        create = groups.add_parser('create')
+        create.add_argument('--name', '-n', required=True)
+        create.add_argument('--location', '-l', choices=['westus'])
+        show = groups.add_parser('show')
+        show.add_argument('--name', '-n', required=True)
+        show.add_argument('--query')
+        self.parsed = []
+        parse_args = self.parser.parse_args
+        self.parser.parse_args = lambda args: self.parsed.append(args) or parse_args(args)
+
+    def _run_rule(self, help_file_entries):
+        from azdev.operations.linter.rules.help_rules import faulty_help_example_parameters_rule
+
+        command_loader = _get_command_loader(command_count=0)
+        command_loader.cli_ctx.invocation.parser = self.parser
+        manager = LinterManager(command_loader=command_loader, help_file_entries=help_file_entries,
+                                loaded_help={})
+        faulty_help_example_parameters_rule(manager)  # pylint: disable=no-value-for-parameter
+        output = io.StringIO()
+        with redirect_stdout(output):
+            manager._run_rules('help_file_entries')  # pylint: disable=protected-access
+        return output.getvalue()
+
+    def test_examples_parsed_once(self):
+        nested = '"$(az group show -n rg --query id)"'
+        output = self._run_rule({
+            'group create': {'examples': [
+                {'text': 'az group create -n rg -l eastus'},
+                {'text': 'az group create -n {}'.format(nested)},
+                {'text': 'az group create --nme rg -n {}'.format(nested)},
+            ]},
+            'group show': {'examples': [{'text': 'az group show -n {}'.format(nested)}]}
+        })
+
+        # values are not validated, only options are
+        self.assertNotIn('eastus', output)
+        self.assertIn('is not a valid command.\n\tunrecognized arguments: --nme rg', output)
+        self.assertEqual(output.count('is not a valid command'), 1)
+        # the nested command is parsed once for all examples
+        self.assertEqual(self.parsed.count(['group', 'show', '-n', 'rg', '--query', 'id']), 1)
+        # the parser is restored afterwards
+        self.assertIs(_FakeAzCliCommandParser.error, argparse.ArgumentParser.error)
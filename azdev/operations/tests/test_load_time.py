@@ -0,0 +1,119 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+import json
+import os
+from unittest import mock, TestCase
+
+from knack.util import CLIError
+
+from ..performance import (
+    LOAD_TIME_BASELINE_FILE,
+    _load_time_cores,
+    check_load_time,
+)
+
+
+def _mocked_load_time_run(import_time, core=None):  # pylint: disable=unused-argument
+    return {'network': 5.0, 'redis': 3.0}, {}
+
+
+class TestCheckLoadTime(TestCase):
+
+    def setUp(self):
+        patcher = mock.patch('azdev.operations.performance.require_azure_cli')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_load_time_with_wrong_workers(self):
+        with self.assertRaisesRegex(CLIError, "Number of workers must be greater than 0."):
+            check_load_time(workers=0)
+
+    def test_load_time_sequential(self):
+        with mock.patch('azdev.operations.performance._load_time_run',
+                        side_effect=_mocked_load_time_run) as run:
+            check_load_time(runs=3)
+        # one warm-up run that is not measured
+        self.assertEqual(run.call_count, 4)
+
+    def test_load_time_concurrent(self):
+        from multiprocessing.pool import ThreadPool
+
+        # worker threads instead of processes, so that the mocks are shared with the workers
+        with mock.patch('azdev.operations.performance._load_time_run',
+                        side_effect=_mocked_load_time_run) as run, \
+                mock.patch('multiprocessing.Pool', ThreadPool), \
+                mock.patch('os.sched_setaffinity', create=True) as set_affinity, \
+                mock.patch('azdev.operations.performance._load_time_cores', return_value=[1, 2]), \
+                mock.patch('azdev.operations.performance.display_co_scheduling') as co_scheduling:
+            check_load_time(runs=4, workers=2)
+        # one warm-up run and one serial reference run that are not measured
+        self.assertEqual(run.call_count, 6)
+        # the serial reference run is pinned by itself, the concurrent runs by their worker
+        self.assertEqual(run.call_args_list[1][0], (False, 1))
+        self.assertEqual([c[0] for c in run.call_args_list[2:]], [(False,)] * 4)
+        self.assertEqual(sorted(c[0][1] for c in set_affinity.call_args_list), [{1}, {2}])
+        serial_total, totals, workers = co_scheduling.call_args[0]
+        self.assertEqual(serial_total, 8.0)
+        self.assertEqual(totals, [8.0] * 4)
+        self.assertEqual(workers, 2)
+
+    def test_load_time_cores(self):
+        with mock.patch('os.sched_getaffinity', create=True, return_value={0, 1, 2, 3}):
+            self.assertEqual(_load_time_cores(2), [1, 2])
+            self.assertEqual(_load_time_cores(4), [0, 1, 2, 3])
+
+    def test_load_time_thresholds_are_not_consumed(self):
+        def _slow_load_time_run(import_time, core=None):  # pylint: disable=unused-argument
+            return {'network': 35.0, 'redis': 3.0}, {}
+
+        with mock.patch('azdev.operations.performance._load_time_run', side_effect=_slow_load_time_run):
+            for _ in range(5):
+                check_load_time(runs=2)
+
+    def test_load_time_baseline(self):
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as config_dir, \
+                mock.patch('azdev.operations.performance.get_azdev_config_dir', return_value=config_dir):
+            with self.assertRaisesRegex(CLIError, "No load time baseline found"):
+                check_load_time(runs=10, baseline=True)
+
+            with mock.patch('azdev.operations.performance._load_time_run', side_effect=_mocked_load_time_run):
+                check_load_time(runs=10, save_baseline=True)
+                check_load_time(runs=10, baseline=True)
+            self.assertEqual(os.listdir(config_dir), [LOAD_TIME_BASELINE_FILE])
+
+            # a baseline that fails to be written leaves the saved one as is
+            with mock.patch('azdev.operations.performance._load_time_run', side_effect=_mocked_load_time_run), \
+                    mock.patch('json.dump', side_effect=KeyboardInterrupt):
+                with self.assertRaises(KeyboardInterrupt):
+                    check_load_time(runs=10, save_baseline=True)
+            self.assertEqual(os.listdir(config_dir), [LOAD_TIME_BASELINE_FILE])
+            with open(os.path.join(config_dir, LOAD_TIME_BASELINE_FILE)) as f:
+                self.assertEqual(json.load(f)['network'], [5.0] * 10)
+
+            def _slower_load_time_run(import_time, core=None):  # pylint: disable=unused-argument
+                return {'network': 5.5, 'redis': 3.0}, {}
+
+            with mock.patch('azdev.operations.performance._load_time_run', side_effect=_slower_load_time_run):
+                with self.assertRaisesRegex(CLIError, "FAILED") as ex:
+                    check_load_time(runs=10, baseline=True)
+            message = ' '.join(str(ex.exception).split())
+            self.assertIn('Module network is significantly slower than the baseline.', message)
+            self.assertIn('The total load time of all modules is significantly slower', message)
+            self.assertNotIn('threshold', message)
+
+    def test_load_time_threshold_failure(self):
+        def _slow_load_time_run(import_time, core=None):  # pylint: disable=unused-argument
+            return {'network': 55.0, 'redis': 3.0}, {}
+
+        with mock.patch('azdev.operations.performance._load_time_run', side_effect=_slow_load_time_run):
+            with self.assertRaisesRegex(CLIError, "FAILED") as ex:
+                check_load_time(runs=2)
+        message = ' '.join(str(ex.exception).split())
+        self.assertIn('close to it, rerun', message)
+        self.assertNotIn('baseline', message)
@@ -0,0 +1,120 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+import random
+from unittest import mock, TestCase
+
+from ..performance import stats
+from ..performance.stats import (
+    median,
+    median_ci,
+    mann_whitney_u,
+    bootstrap_ci,
+    detect_regression,
+    describe,
+    histogram,
+    percentile,
+    split_outliers,
+)
+
+
+class TestRegressionStatistics(TestCase):
+
+    def setUp(self):
+        rng = random.Random(42)
+        self.baseline = [100 + rng.gauss(0, 2) for _ in range(20)]
+        self.noisy = [100 + rng.gauss(0, 2) for _ in range(20)]
+        self.slower = [104 + rng.gauss(0, 2) for _ in range(20)]
+
+    def test_median(self):
+        self.assertEqual(median([3, 1, 2]), 2)
+        self.assertEqual(median([4, 1, 2, 3]), 2.5)
+        with self.assertRaises(ValueError):
+            median([])
+
+    def test_median_ci(self):
+        self.assertIsNone(median_ci([1, 2, 3, 4, 5]))
+        self.assertEqual(median_ci(list(range(10))), (1, 8))
+        self.assertEqual(median_ci(list(range(20))), (5, 14))
+        self.assertEqual(median_ci(list(range(100))), (39, 60))
+        self.assertEqual(median_ci(list(range(400))), (179, 220))
+
+    def test_mann_whitney_u(self):
+        u_value, p_value = mann_whitney_u([1, 2, 3, 4, 5], [6, 7, 8, 9, 10])
+        self.assertEqual(u_value, 25)
+        self.assertLess(p_value, 0.01)
+
+        u_value, p_value = mann_whitney_u([6, 7, 8, 9, 10], [1, 2, 3, 4, 5])
+        self.assertEqual(u_value, 0)
+        self.assertGreater(p_value, 0.99)
+
+        _, p_value = mann_whitney_u([5, 5, 5], [5, 5, 5])
+        self.assertEqual(p_value, 1.0)
+
+    def test_bootstrap_ci_is_deterministic(self):
+        lower, upper = bootstrap_ci(self.baseline, self.slower)
+        self.assertLess(lower, upper)
+        self.assertGreater(lower, 0)
+        self.assertEqual((lower, upper), bootstrap_ci(self.baseline, self.slower))
+
+    def test_detect_regression(self):
+        self.assertTrue(detect_regression(self.baseline, self.slower)['regression'])
+        self.assertFalse(detect_regression(self.baseline, self.noisy)['regression'])
+        # faster is never a regression
+        self.assertFalse(detect_regression(self.slower, self.baseline)['regression'])
+
+
+class TestDescriptiveStatistics(TestCase):
+
+    def setUp(self):
+        self.data = [1.0, 1.1, 1.2, 1.1, 1.0, 1.3, 1.2, 1.1, 1.0, 9.0]
+
+    def _assert_describe(self):
+        result = describe(self.data)
+        self.assertEqual(result['min'], 1.0)
+        self.assertEqual(result['max'], 9.0)
+        self.assertAlmostEqual(result['median'], 1.1)
+        self.assertAlmostEqual(result['mean'], 1.9)
+        self.assertAlmostEqual(result['p90'], 2.07)
+        self.assertAlmostEqual(result['p99'], 8.307)
+        self.assertAlmostEqual(result['mad'], 0.1)
+        self.assertEqual(result['outliers'], 1)
+        self.assertEqual(result['histogram'], '@        .')
+
+    def _assert_describe_without_outliers(self):
+        result = describe(self.data, reject_outliers=True)
+        self.assertEqual(result['max'], 1.3)
+        self.assertAlmostEqual(result['mean'], 10.0 / 9)
+        self.assertEqual(result['outliers'], 1)
+
+    def test_describe(self):
+        self._assert_describe()
+        self._assert_describe_without_outliers()
+
+    def test_describe_without_numpy(self):
+        with mock.patch('azdev.operations.performance.stats.numpy', None):
+            self._assert_describe()
+            self._assert_describe_without_outliers()
+
+    def test_percentile(self):
+        for numpy in [stats.numpy, None]:
+            with mock.patch('azdev.operations.performance.stats.numpy', numpy):
+                self.assertEqual(percentile([5], 99), 5)
+                self.assertEqual(percentile([1, 2, 3, 4, 5], 50), 3)
+                self.assertAlmostEqual(percentile([1, 2, 3, 4], 90), 3.7)
+
+    def test_split_outliers(self):
+        kept, rejected = split_outliers(self.data)
+        self.assertEqual(rejected, [9.0])
+        self.assertEqual(len(kept), 9)
+
+        # without spread, nothing is an outlier
+        self.assertEqual(split_outliers([2, 2, 2]), ([2, 2, 2], []))
+
+    def test_histogram_of_constant_data(self):
+        for numpy in [stats.numpy, None]:
+            with mock.patch('azdev.operations.performance.stats.numpy', numpy):
+                self.assertEqual(histogram([3, 3, 3]).strip(), '@')
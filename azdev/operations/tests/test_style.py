@@ -5,9 +5,13 @@
 # -----------------------------------------------------------------------------
 
 import configparser
+import os
 import unittest
 from unittest import mock
 
+from knack.util import CommandResultItem
+
+from azdev.operations import style
 from azdev.operations.style import _config_file_path
 
 
@@ -95,3 +99,28 @@ class TestConfigFilePath(unittest.TestCase):
             r = _config_file_path(style_type="flake8")
             self.assertTrue(r[0].endswith(cli_repo_path + "/.flake8"))
             self.assertTrue(r[1].endswith(ext_repo_path + "/.flake8"))
+
+
+class TestLinterCheckers(unittest.TestCase):
+    def _check_style(self, **kwargs):
+        modules = {"core": {}, "mod": {"vm": "/src/vm"}, "ext": {}}
+        with mock.patch.object(style, "get_path_table", return_value=modules), \
+                mock.patch.object(style, "require_azure_cli"), \
+                mock.patch.object(style, "filter_by_git_diff", side_effect=lambda m, *_: m), \
+                mock.patch.object(style, "display"), \
+                mock.patch.object(style, "run_pylint", return_value=CommandResultItem(None)) as run_pylint, \
+                self.assertRaises(SystemExit):
+            style.check_style(pylint=True, **kwargs)
+        self.assertEqual(run_pylint.call_count, 1)
+        return run_pylint.call_args
+
+    def test_pylint_without_linter_checkers(self):
+        _, kwargs = self._check_style()
+        self.assertEqual(kwargs, {})
+
+    def test_linter_checkers_loaded_into_pylint_pass(self):
+        _, kwargs = self._check_style(linter_checkers=True)
+        self.assertEqual(kwargs["checkers"], ["show_command"])
+        self.assertEqual(kwargs["enable"], ["show-command"])
+        self.assertFalse(kwargs.get("disable_all"))
+        self.assertTrue(kwargs["env"]["PYTHONPATH"].split(os.pathsep)[0].endswith("pylint_checkers"))
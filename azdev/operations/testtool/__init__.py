@@ -5,8 +5,6 @@
 # -----------------------------------------------------------------------------
 
 import glob
-from importlib import import_module
-import json
 import os
 import re
 from subprocess import CalledProcessError
@@ -22,6 +20,11 @@ from azdev.utilities import (
     COMMAND_MODULE_PREFIX, EXTENSION_PREFIX,
     make_dirs, get_azdev_config_dir,
     get_path_table, require_virtual_env, get_name_index)
+from .discovery import discover_file_tests, get_discovery_version
+from .impact import (
+    discard_recording, get_impact_data_path, load_impact_data, require_coverage, save_recording, select_impacted_tests,
+    start_recording)
+from .index import TestIndex
 from .pytest_runner import get_test_runner
 from .profile_context import ProfileContext, current_profile
 from .incremental_strategy import CLIAzureDevOpsContext
@@ -34,10 +37,15 @@ def run_tests(tests, xml_path=None, discover=False, in_series=False,
               run_live=False, profile=None, last_failed=False, pytest_args=None,
               no_exit_first=False, mark=None,
               git_source=None, git_target=None, git_repo=None,
-              cli_ci=False):
+              cli_ci=False, record_impact=False, impact=False):
 
     require_virtual_env()
 
+    if record_impact and impact:
+        raise CLIError('usage error: --record-impact | --impact')
+    if record_impact or impact:
+        require_coverage()
+
     DEFAULT_RESULT_FILE = 'test_results.xml'
     DEFAULT_RESULT_PATH = os.path.join(get_azdev_config_dir(), DEFAULT_RESULT_FILE)
 
@@ -45,7 +53,8 @@ def run_tests(tests, xml_path=None, discover=False, in_series=False,
 
     path_table = get_path_table()
 
-    test_index = _get_test_index(profile or current_profile(), discover)
+    index_profile = profile or current_profile()
+    test_index = _get_test_index(index_profile, discover)
 
     if not tests:
         tests = list(path_table['mod'].keys()) + list(path_table['core'].keys()) + list(path_table['ext'].keys())
@@ -54,12 +63,16 @@ def run_tests(tests, xml_path=None, discover=False, in_series=False,
     elif tests == ['EXT']:
         tests = list(path_table['ext'].keys())
 
-    # filter out tests whose modules haven't changed
-    modified_mods = _filter_by_git_diff(tests, test_index, git_source, git_target, git_repo)
-    if modified_mods:
-        display('\nTest on modules: {}\n'.format(', '.join(modified_mods)))
+    if impact:
+        # tests are filtered by the lines they cover instead of by module
+        modified_mods = tests
+    else:
+        # filter out tests whose modules haven't changed
+        modified_mods = _filter_by_git_diff(tests, test_index, git_source, git_target, git_repo)
+        if modified_mods:
+            display('\nTest on modules: {}\n'.format(', '.join(modified_mods)))
 
-    if cli_ci is True:
+    if cli_ci is True and not impact:
         ctx = CLIAzureDevOpsContext(git_repo, git_source, git_target)
         modified_mods = ctx.filter(test_index)
 
@@ -74,21 +87,10 @@ def run_tests(tests, xml_path=None, discover=False, in_series=False,
         os.environ[ENV_VAR_TEST_LIVE] = 'True'
 
     def _find_test(index, name):
-        name_comps = name.split('.')
-        num_comps = len(name_comps)
-        key_error = KeyError()
-
-        for i in range(num_comps):
-            check_name = '.'.join(name_comps[(-1 - i):])
-            try:
-                match = index[check_name]
-                if check_name != name:
-                    logger.info("Test found using just '%s'. The rest of the name was ignored.\n", check_name)
-                return match
-            except KeyError as ex:
-                key_error = ex
-                continue
-        raise key_error
+        check_name, match = index.find(name)
+        if check_name != name:
+            logger.info("Test found using just '%s'. The rest of the name was ignored.\n", check_name)
+        return match
 
     # lookup test paths from index
     test_paths = []
@@ -97,9 +99,12 @@ def run_tests(tests, xml_path=None, discover=False, in_series=False,
             test_path = os.path.normpath(_find_test(test_index, t))
             test_paths.append(test_path)
         except KeyError:
-            logger.warning("'%s' not found. If newly added, re-run with --discover", t)
+            logger.warning("'%s' not found.", t)
             continue
 
+    if impact:
+        test_paths = _filter_by_impact(test_paths, test_index, index_profile, git_source, git_target, git_repo)
+
     exit_code = 0
 
     # Tests have been collected. Now run them.
@@ -107,15 +112,33 @@ def run_tests(tests, xml_path=None, discover=False, in_series=False,
         logger.warning('No tests selected to run.')
         sys.exit(exit_code)
 
+    if record_impact:
+        impact_data_path = get_impact_data_path(index_profile)
+        source_paths = list(path_table['core'].values()) + list(path_table['mod'].values()) + \
+            list(path_table['ext'].values())
+        pytest_args = start_recording(impact_data_path, source_paths) + (pytest_args or [])
+
     exit_code = 0
     with ProfileContext(profile):
         runner = get_test_runner(parallel=not in_series,
                                  log_path=xml_path,
                                  last_failed=last_failed,
-                                 no_exit_first=no_exit_first,
-                                 mark=mark)
+                                 # a recording of a partial run would leave tests out of later selections
+                                 no_exit_first=no_exit_first or record_impact,
+                                 mark=mark,
+                                 # coverage is not saved by the forked process of each test
+                                 forked=not record_impact)
         exit_code = runner(test_paths=test_paths, pytest_args=pytest_args)
 
+    if record_impact:
+        if exit_code:
+            discard_recording(impact_data_path)
+            logger.warning('Tests failed. The test impact was not recorded, to keep the previous recording.')
+        elif save_recording(impact_data_path):
+            display('\ntest impact recorded: {}'.format(impact_data_path))
+        else:
+            logger.warning('No test impact was recorded.')
+
     sys.exit(0 if not exit_code else 1)
 
 
@@ -151,57 +174,99 @@ def _filter_by_git_diff(tests, test_index, git_source, git_target, git_repo):
     return tests
 
 
-def _discover_module_tests(mod_name, mod_data):
+def _filter_by_impact(test_paths, test_index, profile, git_source, git_target, git_repo):
+    """ Keep the tests impacted by a git diff, according to the lines each test covered in a recorded run. """
+    from azdev.utilities.git_util import get_changed_lines, summarize_changed_mods
 
-    # get the list of test files in each module
-    total_tests = 0
-    total_files = 0
+    if not all([git_target, git_repo]):
+        raise CLIError('usage error: --impact [--src NAME] --tgt NAME --repo PATH')
+
+    data = load_impact_data(get_impact_data_path(profile))
+    changed_lines = get_changed_lines(git_repo, git_target, git_source)
+    impacted, unknown_files = select_impacted_tests(data, changed_lines, git_repo, test_index)
+
+    # fall back to all the tests of a module when the impact of a change is unknown
+    unknown_mods = summarize_changed_mods(unknown_files)
+    for mod_name in unknown_mods:
+        try:
+            impacted.add(test_index.find(mod_name)[1])
+        except KeyError:
+            logger.warning("Unable to find the tests of module '%s'.", mod_name)
+    if unknown_mods:
+        display('\nTest all of modules whose changes have an unknown impact: {}'.format(
+            ', '.join(sorted(unknown_mods))))
+
+    # a selected test under an impacted folder or class is run, as is an impacted test under a selected one
+    selected = {_split_test_path(path): os.path.normpath(path) for path in test_paths}
+    impacted = {_split_test_path(path): os.path.normpath(path) for path in impacted}
+    kept = {key: path for key, path in impacted.items() if any(_contains_test(other, key) for other in selected)}
+    kept.update((key, path) for key, path in selected.items() if any(_contains_test(other, key) for other in impacted))
+    # the tests under another kept path would run twice
+    impacted_paths = sorted(path for key, path in kept.items() if not any(
+        other != key and _contains_test(other, key) for other in kept))
+    display('\nTest impacted by the changes: {} of the selected tests\n'.format(len(impacted_paths)))
+    return impacted_paths
+
+
+def _split_test_path(path):
+    file_path, _, node = os.path.normpath(path).partition('::')
+    return os.path.normcase(os.path.realpath(file_path)), node
+
+
+def _contains_test(outer, inner):
+    """ Whether a test path, such as a folder, file or `file::Class` node, contains another one or is the same.
+    Both are given as split by `_split_test_path`. """
+    outer_file, outer_node = outer
+    inner_file, inner_node = inner
+    if not outer_node and inner_file.startswith(outer_file.rstrip(os.sep) + os.sep):
+        return True
+    return inner_file == outer_file and (not outer_node or inner_node == outer_node or
+                                         inner_node.startswith(outer_node + '::'))
+
+
+def _find_module_test_files(mod_name, mod_data):
+    """ List the test files of a module, or return None if it has no test folder. """
     logger.info('Mod: %s', mod_name)
     try:
         contents = os.listdir(mod_data['filepath'])
-        test_files = {
-            x[:-len('.py')]: {} for x in contents if x.startswith('test_') and x.endswith('.py')
-        }
-        total_files = len(test_files)
     except FileNotFoundError:
         logger.info('  No test files found.')
         return None
+    return sorted(x[:-len('.py')] for x in contents if x.startswith('test_') and x.endswith('.py'))
+
 
+def _discover_module_tests(mod_name, mod_data, test_files, file_tests):
+    """ Add the test classes of each test file of a module, found by `discover_file_tests`, to its data. """
+    total_tests = 0
     for file_name in test_files:
-        mod_data['files'][file_name] = {}
-        test_file_path = mod_data['base_path'] + '.' + file_name
-        try:
-            module = import_module(test_file_path)
-        except ImportError as ex:
-            logger.info('    %s', ex)
-            continue
-        module_dict = module.__dict__
-        possible_test_classes = {x: y for x, y in module_dict.items() if not x.startswith('_')}
-        for class_name, class_def in possible_test_classes.items():
-            try:
-                class_dict = class_def.__dict__
-            except AttributeError:
-                # skip non-class symbols in files like constants, imported methods, etc.
-                continue
-            if class_dict.get('__module__') == test_file_path:
-                tests = [x for x in class_def.__dict__ if x.startswith('test_')]
-                if tests:
-                    mod_data['files'][file_name][class_name] = tests
-                total_tests += len(tests)
-    logger.info('  %s tests found in %s files.', total_tests, total_files)
+        file_path = os.path.join(mod_data['filepath'], file_name) + '.py'
+        mod_data['files'][file_name] = file_tests.get(file_path, {})
+        total_tests += sum(len(tests) for tests in mod_data['files'][file_name].values())
+    logger.info('  %s: %s tests found in %s files.', mod_name, total_tests, len(test_files))
     return mod_data
 
 
 # pylint: disable=too-many-statements, too-many-locals
-def _discover_tests(profile):
+def _discover_tests(profile, file_cache=None):
     """ Builds an index of tests so that the user can simply supply the name they wish to test instead of the
         full path.
+
+    :param file_cache: dict of the test files found by a previous discovery, updated in place. Only the test files
+        that changed since are parsed.
+    :returns: (dict, int) the test index and the number of test files added, changed or removed.
+    """
+    module_data, changed_files = _discover_test_files(profile, file_cache)
+    return _build_test_index(module_data), changed_files
+
+
+def _discover_test_files(profile, file_cache=None):
+    """ Find the test files of every module and extension, and the tests in each.
+
+    :returns: (dict, int) the data of each module and the number of test files added, changed or removed.
     """
     profile_split = profile.split('-')
     profile_namespace = '_'.join([profile_split[-1]] + profile_split[:-1])
 
-    heading('Discovering Tests')
-
     path_table = get_path_table()
     core_modules = path_table['core'].items()
     command_modules = path_table['mod'].items()
@@ -209,6 +274,8 @@ def _discover_tests(profile):
     inverse_name_table = get_name_index(invert=True)
 
     module_data = {}
+    # the name to index each module under, the name to log and its data
+    modules_to_discover = []
 
     logger.info('\nCore Modules: %s', ', '.join([name for name, _ in core_modules]))
     for mod_name, mod_path in core_modules:
@@ -222,9 +289,7 @@ def _discover_tests(profile):
             'base_path': '{}.tests'.format(mod_name).replace('-', '.'),
             'files': {}
         }
-        tests = _discover_module_tests(mod_name, mod_data)
-        if tests:
-            module_data[mod_name] = tests
+        modules_to_discover.append((mod_name, mod_name, mod_data))
 
     logger.info('\nCommand Modules: %s', ', '.join([name for name, _ in command_modules]))
     for mod_name, mod_path in command_modules:
@@ -237,9 +302,7 @@ def _discover_tests(profile):
             'base_path': 'azure.cli.command_modules.{}.tests.{}'.format(mod_name, profile_namespace),
             'files': {}
         }
-        tests = _discover_module_tests(mod_name, mod_data)
-        if tests:
-            module_data[mod_name] = tests
+        modules_to_discover.append((mod_name, mod_name, mod_data))
 
     logger.info('\nExtensions: %s', ', '.join([name for name, _ in extensions if name]))
     for mod_name, mod_path in extensions:
@@ -256,10 +319,27 @@ def _discover_tests(profile):
             'base_path': '{}.tests.{}'.format(import_name, profile_namespace),
             'files': {}
         }
-        tests = _discover_module_tests(import_name, mod_data)
-        if tests:
-            module_data[mod_name] = tests
-
+        modules_to_discover.append((mod_name, import_name, mod_data))
+
+    # parse the test files of all modules at once, so that they are spread evenly over the workers
+    module_test_files = {}
+    for mod_name, display_name, mod_data in modules_to_discover:
+        test_files = _find_module_test_files(display_name, mod_data)
+        if test_files is not None:
+            module_test_files[mod_name] = test_files
+    file_tests, changed_files = discover_file_tests([
+        os.path.join(mod_data['filepath'], file_name) + '.py'
+        for mod_name, _, mod_data in modules_to_discover for file_name in module_test_files.get(mod_name, [])],
+        file_cache=file_cache)
+    logger.info('\n%s test files added, changed or removed.', changed_files)
+    for mod_name, display_name, mod_data in modules_to_discover:
+        if mod_name in module_test_files:
+            module_data[mod_name] = _discover_module_tests(
+                display_name, mod_data, module_test_files[mod_name], file_tests)
+    return module_data, changed_files
+
+
+def _build_test_index(module_data):
     test_index = {}
     conflicted_keys = []
 
@@ -280,7 +360,7 @@ def _discover_tests(profile):
                 test_index['{}.{}'.format(mod2, key)] = test_index[key]
             else:
                 logger.error("'%s' exists twice in the '%s' module. "
-                             "Please rename one or both and re-run --discover.", key, mod1)
+                             "Please rename one or both.", key, mod1)
         else:
             test_index[key] = path
 
@@ -311,23 +391,32 @@ def _discover_tests(profile):
 
 
 def _get_test_index(profile, discover):
-    config_dir = get_azdev_config_dir()
-    test_index_dir = os.path.join(config_dir, 'test_index')
-    make_dirs(test_index_dir)
-    test_index_path = os.path.join(test_index_dir, '{}.json'.format(profile))
-    test_index = {}
-    if discover:
-        test_index = _discover_tests(profile)
-        with open(test_index_path, 'w') as f:
-            f.write(json.dumps(test_index))
-        display('\ntest index updated: {}'.format(test_index_path))
-    elif os.path.isfile(test_index_path):
-        with open(test_index_path, 'r') as f:
-            test_index = json.loads(''.join(f.readlines()))
+    """ Open the test index of a profile, refreshing the test files that changed since it was saved.
+
+    :param discover: bool rebuild the index from scratch, parsing every test file again.
+    :returns: TestIndex
+    """
+    test_index_path = get_test_index_path(profile)
+    make_dirs(os.path.dirname(test_index_path))
+    version = get_discovery_version()
+
+    test_index = TestIndex(test_index_path)
+    file_cache = {}
+    if not discover and os.path.isfile(test_index_path):
+        file_cache = test_index.get_file_cache(version)
+        test_index.close()
+    if discover or not file_cache:
+        heading('Discovering Tests')
+
+    module_data, changed_files = _discover_test_files(profile, file_cache)
+    if not changed_files and file_cache:
         display('\ntest index found: {}'.format(test_index_path))
-    else:
-        test_index = _discover_tests(profile)
-        with open(test_index_path, 'w') as f:
-            f.write(json.dumps(test_index))
-        display('\ntest index created: {}'.format(test_index_path))
+        return test_index
+
+    TestIndex.save(test_index_path, _build_test_index(module_data), file_cache, version)
+    display('\ntest index updated: {}'.format(test_index_path))
     return test_index
+
+
+def get_test_index_path(profile):
+    return os.path.join(get_azdev_config_dir(), 'test_index', '{}.db'.format(profile))
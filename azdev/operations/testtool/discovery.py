@@ -0,0 +1,142 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+""" Static discovery of the tests in test files, which parses them with `ast` instead of importing them.
+
+The tests of each file can be kept between discoveries along with a fingerprint of the file: its size, modification
+time and content hash. Only the files whose fingerprint changed are parsed again.
+"""
+
+import ast
+import multiprocessing
+import os
+
+from knack.log import get_logger
+
+from azdev.utilities import get_file_fingerprint, get_source_version, is_file_untouched
+
+logger = get_logger(__name__)
+
+# test files are small, so a pool only pays off for the first discovery or a large rebase
+MIN_PARALLEL_FILES = 32
+
+
+def discover_file_tests(paths, workers=None, file_cache=None):
+    """ Find the test classes and methods of test files, parsing them in parallel when there are many.
+
+    :param paths: [str] paths of the test files.
+    :param workers: int number of processes to parse files with. Defaults to the CPU count.
+    :param file_cache: dict of the fingerprints and tests of the files found by a previous discovery, updated in
+        place. Files whose fingerprint did not change are not parsed again, and files no longer found are removed.
+    :returns: (dict, int) the test classes of each file, as returned by `get_file_tests`, and the number of files
+        that were added, changed or removed since the previous discovery.
+    """
+    file_cache = {} if file_cache is None else file_cache
+    stale_paths = set(file_cache) - set(paths)
+    for path in stale_paths:
+        del file_cache[path]
+
+    changed = []
+    for path in paths:
+        entry = file_cache.get(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stat = None
+        if not is_file_untouched(entry, stat):
+            changed.append((path, entry))
+
+    if len(changed) < MIN_PARALLEL_FILES or workers == 1:
+        results = [_parse_file(task) for task in changed]
+    else:
+        workers = workers or multiprocessing.cpu_count()
+        with multiprocessing.Pool(processes=workers) as pool:
+            results = pool.map(_parse_file, changed, chunksize=max(1, len(changed) // (4 * workers)))
+    file_cache.update(results)
+
+    return {path: file_cache[path]['tests'] for path in paths}, len(changed) + len(stale_paths)
+
+
+def get_file_tests(path):
+    """ Find the test classes defined in a test file without executing it.
+
+    As when the module is imported, the classes are the public ones defined at the top level of the file, and
+    their tests are the `test_` members defined in the body of the class, not the inherited ones.
+
+    :returns: dict of the names of the tests of each class, in definition order. Classes without tests are omitted.
+    """
+    try:
+        with open(path, 'rb') as f:
+            source = f.read()
+    except OSError as ex:
+        logger.info('    %s', ex)
+        return {}
+    return _get_source_tests(source, path)
+
+
+def get_discovery_version():
+    """ The discovery depends on the `ast` of the running Python, so its version is part of the fingerprint. """
+    return get_source_version(__file__)
+
+
+def _parse_file(task):
+    """ Fingerprint a test file whose size or modification time changed, and find its tests unless its content
+    is the same as in the cached entry.
+
+    :returns: (str, dict) the path of the file and its fingerprint and tests.
+    """
+    path, cached_entry = task
+    try:
+        source, fingerprint = get_file_fingerprint(path)
+    except OSError as ex:
+        logger.info('    %s', ex)
+        return path, {'size': None, 'mtime': None, 'sha': None, 'tests': {}}
+    if cached_entry and cached_entry['sha'] == fingerprint['sha']:
+        fingerprint['tests'] = cached_entry['tests']
+    else:
+        fingerprint['tests'] = _get_source_tests(source, path)
+    return path, fingerprint
+
+
+def _get_source_tests(source, path):
+    try:
+        tree = ast.parse(source, filename=path)
+    except (SyntaxError, ValueError) as ex:
+        logger.info('    %s', ex)
+        return {}
+
+    classes = {}
+    for node in _get_top_level_statements(tree.body):
+        if isinstance(node, ast.ClassDef) and not node.name.startswith('_'):
+            tests = [name for name in _get_member_names(node.body) if name.startswith('test_')]
+            # a later definition of the class replaces the earlier one
+            classes.pop(node.name, None)
+            if tests:
+                classes[node.name] = list(dict.fromkeys(tests))
+    return classes
+
+
+def _get_top_level_statements(body):
+    # classes defined under module-level conditions or try blocks are still defined by importing the module
+    for node in body:
+        yield node
+        if isinstance(node, (ast.If, ast.Try, ast.With)):
+            for block in ('body', 'orelse', 'finalbody'):
+                yield from _get_top_level_statements(getattr(node, block, []))
+            for handler in getattr(node, 'handlers', []):
+                yield from _get_top_level_statements(handler.body)
+
+
+def _get_member_names(body):
+    for node in _get_top_level_statements(body):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            yield node.name
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    yield target.id
+        elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name) and node.value is not None:
+            yield node.target.id
@@ -0,0 +1,152 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+""" Test-impact analysis, selecting the tests to run from the lines each test covered in a recorded run.
+
+`azdev test --record-impact` loads `impact_plugin` into pytest, which records the coverage of each test under its
+own coverage.py context. `azdev test --impact` then runs the tests whose covered lines intersect a git diff, along
+with the tests of changed test files and recordings. Changes whose impact is unknown, such as new source files or
+lines only run while a module is imported, select the tests of their whole module instead.
+"""
+
+import glob
+import os
+
+from knack.log import get_logger
+from knack.util import CLIError
+
+from azdev.utilities import atomic_path, get_azdev_config_dir, make_dirs
+
+logger = get_logger(__name__)
+
+IMPACT_DIR = 'test_impact'
+ENV_IMPACT_DATA_FILE = 'AZDEV_IMPACT_DATA_FILE'
+ENV_IMPACT_SOURCES = 'AZDEV_IMPACT_SOURCES'
+IMPACT_PLUGIN = 'azdev.operations.testtool.impact_plugin'
+# changes to these files never affect the outcome of tests
+_IGNORED_EXTENSIONS = ('.md', '.rst')
+
+
+def require_coverage():
+    try:
+        import coverage
+    except ImportError:
+        raise CLIError('usage error: test impact analysis requires coverage. Run `pip install "coverage>=5.0"`.')
+    if not hasattr(coverage.Coverage, 'switch_context'):
+        raise CLIError('usage error: test impact analysis requires coverage 5.0 or later. '
+                       'Run `pip install "coverage>=5.0"`.')
+
+
+def get_impact_data_path(profile):
+    return os.path.join(get_azdev_config_dir(), IMPACT_DIR, '{}.coverage'.format(profile))
+
+
+def get_test_id(path, node):
+    """ Identify a test the way the test index does, by the path of its file and its `Class::test` node. """
+    return '{}::{}'.format(os.path.normcase(os.path.realpath(path)), node)
+
+
+def start_recording(data_path, source_paths):
+    """ Prepare the environment of a pytest run that records the coverage of each test.
+
+    :returns: list of the pytest arguments that load the recording plugin.
+    """
+    make_dirs(os.path.dirname(data_path))
+    discard_recording(data_path)
+    os.environ[ENV_IMPACT_DATA_FILE] = data_path + '.record'
+    os.environ[ENV_IMPACT_SOURCES] = os.pathsep.join(source_paths)
+    return ['-p', IMPACT_PLUGIN]
+
+
+def save_recording(data_path):
+    """ Combine the coverage recorded by each pytest process, replacing the previous recording.
+
+    :returns: bool whether any coverage was recorded.
+    """
+    import coverage  # pylint: disable=import-error
+
+    record_paths = glob.glob(data_path + '.record.*')
+    if not record_paths:
+        return False
+    with atomic_path(data_path) as temp_path:
+        cov = coverage.Coverage(data_file=temp_path)
+        cov.combine(data_paths=record_paths)
+        cov.save()
+    return True
+
+
+def discard_recording(data_path):
+    """ Remove the coverage recorded by each pytest process, keeping the previous recording. """
+    for record_path in glob.glob(data_path + '.record.*'):
+        os.remove(record_path)
+
+
+def load_impact_data(data_path):
+    import coverage  # pylint: disable=import-error
+
+    if not os.path.isfile(data_path):
+        raise CLIError('usage error: no test impact recording found at {}. Run a full test run with --record-impact '
+                       'first.'.format(data_path))
+    data = coverage.CoverageData(basename=data_path)
+    data.read()
+    return data
+
+
+def select_impacted_tests(data, changed_lines, repo_path, test_index):
+    """ Select the tests impacted by changes to a repo.
+
+    :param data: CoverageData of a run recorded with the contexts of each test.
+    :param changed_lines: dict of the changed lines of each file, relative to the repo, as from `get_changed_lines`.
+        None stands for changes to the whole file.
+    :param test_index: TestIndex used to find the tests of changed recordings and to drop recorded tests that
+        no longer exist.
+    :returns: (set, list) the paths of the impacted tests and test files as in the test index, and the changed files
+        whose impact is unknown.
+    """
+    indexed_tests = {os.path.normcase(os.path.realpath(path.split('::', 1)[0])) + _get_node_suffix(path): path
+                     for _, path in test_index.items()}
+    measured_files = {os.path.normcase(os.path.realpath(path)): path for path in data.measured_files()}
+
+    impacted, unknown_files = set(), []
+    for file_name, lines in sorted(changed_lines.items()):
+        path = os.path.normcase(os.path.realpath(os.path.join(repo_path, file_name)))
+        base_name = os.path.basename(path)
+        if path.endswith(_IGNORED_EXTENSIONS):
+            continue
+        if base_name.startswith('test_') and base_name.endswith('.py'):
+            # tests added or changed since the recording run
+            if path in indexed_tests:
+                impacted.add(indexed_tests[path])
+            continue
+        if os.path.basename(os.path.dirname(path)) == 'recordings':
+            test_path = test_index.get(os.path.splitext(base_name)[0])
+            if test_path:
+                impacted.add(test_path)
+                continue
+        if path not in measured_files:
+            unknown_files.append(file_name)
+            continue
+
+        contexts_by_lineno = data.contexts_by_lineno(measured_files[path])
+        contexts = set()
+        for line in contexts_by_lineno if lines is None else lines:
+            contexts.update(contexts_by_lineno.get(line, []))
+        if '' in contexts:
+            # lines run outside of any test, such as while collecting tests
+            unknown_files.append(file_name)
+        for context in contexts:
+            # parametrized tests are indexed once, without their parameters
+            test_id = context.split('[', 1)[0]
+            if test_id in indexed_tests:
+                impacted.add(indexed_tests[test_id])
+            elif context:
+                logger.info('Recorded test %s is no longer indexed.', context)
+    return impacted, unknown_files
+
+
+def _get_node_suffix(path):
+    _, separator, node = path.partition('::')
+    return separator + node
@@ -0,0 +1,44 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+""" pytest plugin recording the lines covered by each test, loaded by `azdev test --record-impact`. """
+
+import os
+
+from azdev.operations.testtool.impact import ENV_IMPACT_DATA_FILE, ENV_IMPACT_SOURCES, get_test_id
+
+_COVERAGE = None
+
+
+def pytest_configure(config):  # pylint: disable=unused-argument
+    global _COVERAGE  # pylint: disable=global-statement
+    data_file = os.environ.get(ENV_IMPACT_DATA_FILE)
+    if not data_file:
+        return
+    import coverage  # pylint: disable=import-error
+    sources = [path for path in os.environ.get(ENV_IMPACT_SOURCES, '').split(os.pathsep) if path]
+    # each process, such as pytest-xdist workers, records to its own file
+    _COVERAGE = coverage.Coverage(data_file=data_file, data_suffix=True, source=sources or None)
+    _COVERAGE.start()
+
+
+def pytest_runtest_setup(item):
+    if _COVERAGE:
+        path = str(getattr(item, 'path', None) or item.fspath)
+        _COVERAGE.switch_context(get_test_id(path, item.nodeid.split('::', 1)[-1]))
+
+
+def pytest_runtest_logfinish(nodeid, location):  # pylint: disable=unused-argument
+    if _COVERAGE:
+        _COVERAGE.switch_context('')
+
+
+def pytest_unconfigure(config):  # pylint: disable=unused-argument
+    global _COVERAGE  # pylint: disable=global-statement
+    if _COVERAGE:
+        _COVERAGE.stop()
+        _COVERAGE.save()
+        _COVERAGE = None
@@ -0,0 +1,144 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+""" On-disk test index, stored in SQLite so that it is queried in place instead of loaded whole.
+
+The index maps the names of modules, test files, classes and tests to their paths. Each distinct file or folder
+path is stored once, and names refer to it along with their `Class::test` node. Names are the primary key, so
+exact, prefix and dotted suffix lookups only read the rows they return.
+
+The fingerprints and tests of the discovered test files are stored alongside, to refresh the index incrementally.
+"""
+
+import json
+import os
+import sqlite3
+
+from azdev.utilities import atomic_path
+
+_SCHEMA = """
+CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE paths (id INTEGER PRIMARY KEY, path TEXT UNIQUE);
+CREATE TABLE names (name TEXT PRIMARY KEY, path_id INTEGER, node TEXT) WITHOUT ROWID;
+CREATE TABLE files (path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, sha TEXT, tests TEXT) WITHOUT ROWID;
+"""
+# sorts after any other character, to bound prefix queries
+_MAX_CHAR = '\U0010ffff'
+
+
+class TestIndex:
+    """ Read-only view of a saved test index, which only opens the database on the first lookup. """
+
+    __test__ = False  # not a test class, despite its name
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = None
+
+    def __getitem__(self, name):
+        row = self._query('SELECT paths.path, names.node FROM names JOIN paths ON paths.id = names.path_id '
+                          'WHERE names.name = ?', (name,)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return _get_test_path(*row)
+
+    def __contains__(self, name):
+        return self._query('SELECT 1 FROM names WHERE name = ?', (name,)).fetchone() is not None
+
+    def __len__(self):
+        return self._query('SELECT COUNT(*) FROM names').fetchone()[0]
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def find(self, name):
+        """ Find a test by a dotted name, trying its shortest suffix first, so `vm.test_vm_create` matches the
+        `test_vm_create` test unless it is ambiguous and only indexed as `vm.test_vm_create`.
+
+        :returns: (str, str) the indexed name that matched and its path.
+        :raises: KeyError if no suffix of the name is indexed.
+        """
+        name_comps = name.split('.')
+        for i in range(len(name_comps)):
+            check_name = '.'.join(name_comps[(-1 - i):])
+            path = self.get(check_name)
+            if path is not None:
+                return check_name, path
+        raise KeyError(name)
+
+    def complete(self, prefix='', limit=None):
+        """ List the indexed names starting with a prefix, in sorted order. """
+        query = 'SELECT name FROM names WHERE name >= ? AND name < ? ORDER BY name'
+        if limit is not None:
+            query += ' LIMIT {:d}'.format(limit)
+        return [row[0] for row in self._query(query, (prefix, prefix + _MAX_CHAR))]
+
+    def items(self):
+        return [(name, _get_test_path(path, node)) for name, path, node in self._query(
+            'SELECT names.name, paths.path, names.node FROM names JOIN paths ON paths.id = names.path_id '
+            'ORDER BY names.name')]
+
+    def get_file_cache(self, version):
+        """ Load the fingerprints and tests of the discovered test files, if saved by the same discovery version.
+
+        :returns: dict of the size, mtime, content hash and tests of each test file.
+        """
+        try:
+            row = self._query("SELECT value FROM metadata WHERE key = 'version'").fetchone()
+            if not row or row[0] != version:
+                return {}
+            return {path: {'size': size, 'mtime': mtime, 'sha': sha, 'tests': json.loads(tests)}
+                    for path, size, mtime, sha, tests in self._query('SELECT * FROM files')}
+        except (sqlite3.Error, ValueError):
+            return {}
+
+    def close(self):
+        if self._connection:
+            self._connection.close()
+            self._connection = None
+
+    def _query(self, query, parameters=()):
+        if self._connection is None:
+            if not os.path.isfile(self.path):
+                raise sqlite3.OperationalError('no test index at {}'.format(self.path))
+            # read-only, so that a missing or replaced index is never created or locked by a reader
+            self._connection = sqlite3.connect('file:{}?mode=ro'.format(_get_uri_path(self.path)), uri=True)
+        return self._connection.execute(query, parameters)
+
+    @staticmethod
+    def save(path, test_index, file_cache, version):
+        """ Write a test index and the test files it was built from, replacing any saved index atomically. """
+        path_ids = {}
+        names = []
+        for name, test_path in test_index.items():
+            file_path, _, node = test_path.partition('::')
+            path_id = path_ids.setdefault(file_path, len(path_ids) + 1)
+            names.append((name, path_id, node))
+        with atomic_path(path) as temp_path:
+            connection = sqlite3.connect(temp_path)
+            try:
+                connection.executescript(_SCHEMA)
+                connection.execute("INSERT INTO metadata VALUES ('version', ?)", (version,))
+                connection.executemany('INSERT INTO paths VALUES (?, ?)', ((i, p) for p, i in path_ids.items()))
+                connection.executemany('INSERT INTO names VALUES (?, ?, ?)', names)
+                connection.executemany('INSERT INTO files VALUES (?, ?, ?, ?, ?)', (
+                    (file_path, entry['size'], entry['mtime'], entry['sha'], json.dumps(entry['tests']))
+                    for file_path, entry in file_cache.items()))
+                connection.commit()
+            finally:
+                connection.close()
+
+
+def _get_test_path(path, node):
+    return '{}::{}'.format(path, node) if node else path
+
+
+def _get_uri_path(path):
+    from urllib.request import pathname2url
+    return pathname2url(os.path.abspath(path))
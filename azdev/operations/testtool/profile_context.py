@@ -43,3 +43,23 @@ class ProfileContext:
 
 def current_profile():
     return cmd('az cloud show --query profile -otsv', show_stderr=False).result
+
+
+def get_configured_profile():
+    """ Read the profile of the current cloud from the Azure CLI configuration files, without running `az`.
+
+    :returns: str the profile name, or None if the configuration files do not set it.
+    """
+    import configparser
+    import os
+
+    config_dir = os.environ.get('AZURE_CONFIG_DIR') or os.path.expanduser(os.path.join('~', '.azure'))
+    config = configparser.ConfigParser()
+    clouds_config = configparser.ConfigParser()
+    try:
+        config.read(os.path.join(config_dir, 'config'))
+        clouds_config.read(os.path.join(config_dir, 'clouds.config'))
+    except configparser.Error:
+        return None
+    cloud_name = os.environ.get('AZURE_CLOUD_NAME') or config.get('cloud', 'name', fallback='AzureCloud')
+    return clouds_config.get(cloud_name, 'profile', fallback=None)
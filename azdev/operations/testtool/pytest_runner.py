@@ -11,13 +11,13 @@ from knack.log import get_logger
 from azdev.utilities import call
 
 
-def get_test_runner(parallel, log_path, last_failed, no_exit_first, mark):
+def get_test_runner(parallel, log_path, last_failed, no_exit_first, mark, forked=True):
     """Create a pytest execution method"""
     def _run(test_paths, pytest_args):
 
         logger = get_logger(__name__)
 
-        if os.name == 'posix':
+        if os.name == 'posix' and forked:
             arguments = ['-x', '-v', '--forked', '-p no:warnings', '--log-level=WARN', '--junit-xml', log_path]
         else:
             arguments = ['-x', '-v', '-p no:warnings', '--log-level=WARN', '--junit-xml', log_path]
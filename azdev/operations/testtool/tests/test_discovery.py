@@ -0,0 +1,167 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from azdev.operations import testtool
+from azdev.operations.testtool import discovery
+
+
+TEST_FILE = '''
+import unittest
+from azure.cli.testsdk import ScenarioTest
+from .helpers import ImportedTest
+
+
+class VmScenarioTest(ScenarioTest):
+    test_timeout = 10
+
+    def setUp(self):
+        pass
+
+    def test_vm_create(self):
+        pass
+
+    async def test_vm_list(self):
+        pass
+
+
+class VmDerivedTest(VmScenarioTest):
+    pass
+
+
+class _PrivateTest(unittest.TestCase):
+    def test_private(self):
+        pass
+
+
+if True:
+    class ConditionalTest(unittest.TestCase):
+        def test_conditional(self):
+            pass
+
+
+def test_function():
+    pass
+'''
+
+
+class TestStaticDiscovery(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _write(self, relative_path, content):
+        path = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_get_file_tests(self):
+        path = self._write('test_vm.py', TEST_FILE)
+        self.assertEqual(discovery.get_file_tests(path), {
+            'VmScenarioTest': ['test_timeout', 'test_vm_create', 'test_vm_list'],
+            'ConditionalTest': ['test_conditional']
+        })
+
+    def test_invalid_file_has_no_tests(self):
+        path = self._write('test_broken.py', 'class BrokenTest(:\n')
+        self.assertEqual(discovery.get_file_tests(path), {})
+
+    def test_parallel_discovery_matches_serial_discovery(self):
+        paths = [self._write('test_vm{}.py'.format(i), TEST_FILE) for i in range(4)]
+        serial_tests, _ = discovery.discover_file_tests(paths)
+        with mock.patch.object(discovery, 'MIN_PARALLEL_FILES', 1):
+            self.assertEqual(discovery.discover_file_tests(paths, workers=2), (serial_tests, 4))
+        self.assertEqual(len(serial_tests), 4)
+
+    def test_only_changed_files_parsed_again(self):
+        paths = [self._write('test_vm{}.py'.format(i), TEST_FILE) for i in range(3)]
+        file_cache = {}
+        tests, changed_files = discovery.discover_file_tests(paths, file_cache=file_cache)
+        self.assertEqual(changed_files, 3)
+
+        with mock.patch.object(discovery, '_get_source_tests') as get_source_tests:
+            self.assertEqual(discovery.discover_file_tests(paths, file_cache=file_cache), (tests, 0))
+            # touching a file without changing its content only hashes it again
+            os.utime(paths[0], ns=(0, 0))
+            self.assertEqual(discovery.discover_file_tests(paths, file_cache=file_cache), (tests, 1))
+            self.assertEqual(get_source_tests.call_count, 0)
+
+        self._write('test_vm1.py', 'import unittest\n\nclass NewTest(unittest.TestCase):\n    test_new = None\n')
+        os.remove(paths[2])
+        tests, changed_files = discovery.discover_file_tests(paths[:2], file_cache=file_cache)
+        self.assertEqual(changed_files, 2)
+        self.assertEqual(tests[paths[1]], {'NewTest': ['test_new']})
+        self.assertEqual(sorted(file_cache), paths[:2])
+
+    def test_discover_tests_index(self):
+        mod_path = os.path.join(self.root, 'vm')
+        test_path = self._write(os.path.join('vm', 'tests', 'latest', 'test_vm.py'), TEST_FILE)
+        self._write(os.path.join('vm', 'tests', 'latest', 'recording_vm.py'), TEST_FILE)
+        path_table = {'core': {}, 'mod': {'vm': mod_path}, 'ext': {}}
+        with mock.patch.object(testtool, 'get_path_table', return_value=path_table), \
+                mock.patch.object(testtool, 'get_name_index', return_value={}), \
+                mock.patch.object(testtool, 'heading'):
+            test_index, changed_files = testtool._discover_tests('latest')  # pylint: disable=protected-access
+
+        test_dir = os.path.dirname(test_path)
+        self.assertEqual(test_index, {
+            'test_timeout': '{}::VmScenarioTest::test_timeout'.format(test_path),
+            'test_vm_create': '{}::VmScenarioTest::test_vm_create'.format(test_path),
+            'test_vm_list': '{}::VmScenarioTest::test_vm_list'.format(test_path),
+            'VmScenarioTest': '{}::VmScenarioTest'.format(test_path),
+            'test_conditional': '{}::ConditionalTest::test_conditional'.format(test_path),
+            'ConditionalTest': '{}::ConditionalTest'.format(test_path),
+            'test_vm': test_path,
+            'vm': test_dir,
+            'azure-cli-vm': test_dir
+        })
+        self.assertEqual(changed_files, 1)
+
+    def test_test_index_refreshed_incrementally(self):
+        mod_path = os.path.join(self.root, 'vm')
+        test_dir = os.path.join('vm', 'tests', 'latest')
+        self._write(os.path.join(test_dir, 'test_vm.py'), TEST_FILE)
+        path_table = {'core': {}, 'mod': {'vm': mod_path}, 'ext': {}}
+        with mock.patch.object(testtool, 'get_path_table', return_value=path_table), \
+                mock.patch.object(testtool, 'get_name_index', return_value={}), \
+                mock.patch.object(testtool, 'get_azdev_config_dir', return_value=os.path.join(self.root, 'config')), \
+                mock.patch.object(testtool, 'heading') as heading, \
+                mock.patch.object(testtool, 'display'):
+            self.assertIn('test_vm_create', testtool._get_test_index('latest', False))  # pylint: disable=protected-access
+            self.assertEqual(heading.call_count, 1)
+
+            # a new test file is picked up without rediscovering the others
+            new_path = self._write(os.path.join(test_dir, 'test_disk.py'),
+                                   'import unittest\n\nclass DiskTest(unittest.TestCase):\n'
+                                   '    test_disk_create = None\n')
+            with mock.patch.object(discovery, '_get_source_tests', wraps=discovery._get_source_tests) as parse:  # pylint: disable=protected-access
+                test_index = testtool._get_test_index('latest', False)  # pylint: disable=protected-access
+            self.assertEqual([call[0][1] for call in parse.call_args_list], [new_path])
+            self.assertEqual(test_index['DiskTest'], '{}::DiskTest'.format(new_path))
+            self.assertIn('test_vm_create', test_index)
+            self.assertEqual(heading.call_count, 1)
+
+            # the saved index is reused as is when no test file changed
+            with mock.patch.object(testtool, '_build_test_index') as build_test_index:
+                self.assertEqual(testtool._get_test_index('latest', False).items(),  # pylint: disable=protected-access
+                                 test_index.items())
+            self.assertEqual(build_test_index.call_count, 0)
+
+            # --discover parses every file again
+            with mock.patch.object(discovery, '_get_source_tests', wraps=discovery._get_source_tests) as parse:  # pylint: disable=protected-access
+                self.assertEqual(testtool._get_test_index('latest', True).items(),  # pylint: disable=protected-access
+                                 test_index.items())
+            self.assertEqual(parse.call_count, 2)
@@ -0,0 +1,231 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from azdev.operations import testtool
+from azdev.operations.testtool import impact
+from azdev.operations.testtool.index import TestIndex
+from azdev.utilities.git_util import get_changed_lines
+
+
+class _FakeCoverageData:
+
+    def __init__(self, contexts):
+        self._contexts = contexts
+
+    def measured_files(self):
+        return list(self._contexts)
+
+    def contexts_by_lineno(self, path):
+        return self._contexts[path]
+
+
+class TestChangedLines(unittest.TestCase):
+
+    def setUp(self):
+        try:
+            import git
+        except ImportError:
+            self.skipTest('GitPython is not installed')
+        self.root = tempfile.mkdtemp()
+        self.repo = git.Repo.init(self.root)
+        with self.repo.config_writer() as config:
+            config.set_value('user', 'name', 'azdev')
+            config.set_value('user', 'email', 'azdev@example.com')
+
+    def tearDown(self):
+        self.repo.close()
+        shutil.rmtree(self.root)
+
+    def _commit(self, files):
+        for name, content in files.items():
+            path = os.path.join(self.root, name)
+            if content is None:
+                self.repo.index.remove([name], working_tree=True)
+                continue
+            with open(path, 'w') as f:
+                f.write(content)
+            self.repo.index.add([name])
+        return self.repo.index.commit('update').hexsha
+
+    def test_get_changed_lines(self):
+        lines = ''.join('line {}\n'.format(i) for i in range(1, 11))
+        target = self._commit({'custom.py': lines, 'old.py': 'old\n', 'inserted.py': lines})
+
+        changed = lines.replace('line 3\n', 'line three\n').replace('line 8\n', 'line eight\nline 8.5\n')
+        inserted = lines.replace('line 5\n', 'line 5\nline 5.5\n')
+        source = self._commit({'custom.py': changed, 'old.py': None, 'new.py': 'new\n', 'inserted.py': inserted})
+
+        self.assertEqual(get_changed_lines(self.root, target, source), {
+            'custom.py': {3, 8},
+            'inserted.py': {5, 6},
+            'old.py': None,
+            'new.py': None
+        })
+
+
+class TestSelectImpactedTests(unittest.TestCase):
+
+    def setUp(self):
+        self.root = os.path.realpath(tempfile.mkdtemp())
+        self.test_file = os.path.join(self.root, 'vm', 'tests', 'latest', 'test_vm.py')
+        self.source_file = os.path.join(self.root, 'vm', 'custom.py')
+        test_index = {
+            'test_vm_create': '{}::VmTest::test_vm_create'.format(self.test_file),
+            'test_vm_list': '{}::VmTest::test_vm_list'.format(self.test_file),
+            'VmTest': '{}::VmTest'.format(self.test_file),
+            'test_vm': self.test_file,
+        }
+        self.index_path = os.path.join(self.root, 'latest.db')
+        TestIndex.save(self.index_path, test_index, {}, 'version')
+        self.test_index = TestIndex(self.index_path)
+
+    def tearDown(self):
+        self.test_index.close()
+        shutil.rmtree(self.root)
+
+    def _get_test_id(self, node):
+        return impact.get_test_id(self.test_file, node)
+
+    def test_select_tests_by_covered_lines(self):
+        data = _FakeCoverageData({
+            self.source_file: {
+                1: [''],
+                10: [self._get_test_id('VmTest::test_vm_create'), self._get_test_id('VmTest::test_vm_list')],
+                20: [self._get_test_id('VmTest::test_vm_create[param]')],
+                30: [self._get_test_id('VmTest::test_vm_deleted')]
+            }
+        })
+        source_path = os.path.join('vm', 'custom.py')
+
+        self.assertEqual(impact.select_impacted_tests(data, {source_path: {20, 30}}, self.root, self.test_index),
+                         ({'{}::VmTest::test_vm_create'.format(self.test_file)}, []))
+        self.assertEqual(impact.select_impacted_tests(data, {source_path: {11}}, self.root, self.test_index),
+                         (set(), []))
+
+        # lines run outside of tests, such as on import, have an unknown impact
+        impacted, unknown_files = impact.select_impacted_tests(data, {source_path: None}, self.root, self.test_index)
+        self.assertEqual(impacted, {'{}::VmTest::{}'.format(self.test_file, name)
+                                    for name in ('test_vm_create', 'test_vm_list')})
+        self.assertEqual(unknown_files, [source_path])
+
+    def test_select_changed_tests_and_unknown_files(self):
+        changed_lines = {
+            os.path.join('vm', 'tests', 'latest', 'test_vm.py'): {5},
+            os.path.join('vm', 'tests', 'latest', 'recordings', 'test_vm_list.yaml'): None,
+            os.path.join('vm', '_params.py'): {1},
+            'README.md': None
+        }
+        impacted, unknown_files = impact.select_impacted_tests(
+            _FakeCoverageData({}), changed_lines, self.root, self.test_index)
+        self.assertEqual(impacted, {self.test_file, '{}::VmTest::test_vm_list'.format(self.test_file)})
+        self.assertEqual(unknown_files, [os.path.join('vm', '_params.py')])
+
+
+class TestFilterByImpact(unittest.TestCase):
+
+    def setUp(self):
+        self.root = os.path.realpath(tempfile.mkdtemp())
+        self.test_dir = os.path.join(self.root, 'vm', 'tests', 'latest')
+        self.test_file = os.path.join(self.test_dir, 'test_vm.py')
+        self.test_index = mock.Mock()
+        self.test_index.find.side_effect = lambda name: (name, self.test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _filter(self, test_paths, impacted, unknown_files=()):
+        with mock.patch.object(testtool, 'load_impact_data'), \
+                mock.patch.object(testtool, 'get_impact_data_path'), \
+                mock.patch.object(testtool, 'display'), \
+                mock.patch('azdev.utilities.git_util.get_changed_lines'), \
+                mock.patch('azdev.utilities.git_util.summarize_changed_mods',
+                           return_value=['vm'] if unknown_files else []), \
+                mock.patch.object(testtool, 'select_impacted_tests',
+                                  return_value=(set(impacted), list(unknown_files))):
+            return testtool._filter_by_impact(  # pylint: disable=protected-access
+                test_paths, self.test_index, 'latest', None, 'upstream/dev', self.root)
+
+    def test_impacted_tests_under_selected_paths(self):
+        impacted = ['{}::VmTest::test_vm_create'.format(self.test_file),
+                    os.path.join(self.root, 'network', 'tests', 'latest', 'test_network.py')]
+        self.assertEqual(self._filter([self.test_dir], impacted), impacted[:1])
+        self.assertEqual(self._filter(['{}::VmTest'.format(self.test_file)], impacted), impacted[:1])
+        self.assertEqual(self._filter(['{}::DiskTest'.format(self.test_file)], impacted), [])
+
+    def test_selected_tests_under_impacted_paths(self):
+        # changes of unknown impact select the test folder of their module
+        selected = ['{}::VmTest'.format(self.test_file)]
+        self.assertEqual(self._filter(selected, [], unknown_files=[os.path.join('vm', 'custom.py')]), selected)
+        self.assertEqual(self._filter([self.test_file], [self.test_dir]), [self.test_file])
+
+        # a changed test file impacts a selected class in it, which is only run once
+        impacted = [self.test_file, '{}::VmTest::test_vm_create'.format(self.test_file)]
+        self.assertEqual(self._filter(selected, impacted), selected)
+
+
+class TestRecordImpact(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.data_path = os.path.join(self.root, 'latest.coverage')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _run_tests(self, exit_code):
+        test_index = mock.Mock()
+        test_index.find.side_effect = lambda name: (name, os.path.join(self.root, name))
+
+        def _runner(**_):
+            # each pytest process writes the coverage it recorded next to the recording
+            with open(self.data_path + '.record.1', 'w') as f:
+                f.write('coverage')
+            return exit_code
+
+        for name in ('require_virtual_env', 'require_coverage', 'heading', 'display', 'ProfileContext'):
+            self._patch(name)
+        self._patch('get_path_table', return_value={'core': {}, 'mod': {'vm': self.root}, 'ext': {}})
+        self._patch('_get_test_index', return_value=test_index)
+        self._patch('_filter_by_git_diff', return_value=['vm'])
+        self._patch('get_azdev_config_dir', return_value=self.root)
+        self._patch('get_impact_data_path', return_value=self.data_path)
+        self._patch('start_recording', return_value=[])
+        get_test_runner = self._patch('get_test_runner', return_value=_runner)
+        save_recording = self._patch('save_recording')
+
+        with self.assertRaises(SystemExit):
+            testtool.run_tests(['vm'], profile='latest', record_impact=True)
+        return save_recording, get_test_runner.call_args[1]
+
+    def _patch(self, name, **kwargs):
+        patcher = mock.patch.object(testtool, name, **kwargs)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_recording_saved_after_full_run(self):
+        save_recording, runner_args = self._run_tests(exit_code=0)
+        self.assertTrue(runner_args['no_exit_first'])
+        self.assertFalse(runner_args['forked'])
+        save_recording.assert_called_once_with(self.data_path)
+
+    def test_recording_kept_when_tests_fail(self):
+        with open(self.data_path, 'w') as f:
+            f.write('previous')
+        with mock.patch.object(testtool, 'logger'):
+            save_recording, _ = self._run_tests(exit_code=1)
+        # the coverage of the partial run is discarded
+        self.assertFalse(save_recording.called)
+        self.assertEqual(os.listdir(self.root), ['latest.coverage'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from azdev.completer import get_test_completion
+from azdev.operations.testtool.index import TestIndex
+from azdev.operations.testtool.profile_context import get_configured_profile
+
+
+TEST_FILE = '/src/vm/tests/latest/test_vm.py'
+TEST_INDEX = {
+    'vm': '/src/vm/tests/latest',
+    'azure-cli-vm': '/src/vm/tests/latest',
+    'test_vm': TEST_FILE,
+    'VmScenarioTest': TEST_FILE + '::VmScenarioTest',
+    'test_vm_create': TEST_FILE + '::VmScenarioTest::test_vm_create',
+    'test_vm_list': TEST_FILE + '::VmScenarioTest::test_vm_list',
+    'vm.test_show': TEST_FILE + '::VmScenarioTest::test_show',
+    'network.test_show': '/src/network/tests/latest/test_network.py::NetworkTest::test_show'
+}
+FILE_CACHE = {
+    TEST_FILE: {'size': 10, 'mtime': 20, 'sha': 'abc', 'tests': {'VmScenarioTest': ['test_vm_create']}}
+}
+
+
+class TestTestIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, 'latest.db')
+        TestIndex.save(self.path, TEST_INDEX, FILE_CACHE, 'v1')
+        self.index = TestIndex(self.path)
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.root)
+
+    def test_lookup(self):
+        self.assertEqual(len(self.index), len(TEST_INDEX))
+        self.assertEqual(dict(self.index.items()), TEST_INDEX)
+        self.assertEqual(self.index['VmScenarioTest'], TEST_FILE + '::VmScenarioTest')
+        self.assertIn('vm', self.index)
+        self.assertNotIn('test_show', self.index)
+        self.assertIsNone(self.index.get('test_show'))
+        with self.assertRaises(KeyError):
+            _ = self.index['test_show']
+
+    def test_find_by_suffix(self):
+        self.assertEqual(self.index.find('azure.cli.vm.test_vm_create'),
+                         ('test_vm_create', TEST_FILE + '::VmScenarioTest::test_vm_create'))
+        self.assertEqual(self.index.find('network.test_show')[0], 'network.test_show')
+        with self.assertRaises(KeyError):
+            self.index.find('storage.test_show')
+
+    def test_complete_prefix(self):
+        self.assertEqual(self.index.complete('test_vm'), ['test_vm', 'test_vm_create', 'test_vm_list'])
+        self.assertEqual(self.index.complete('test_vm_', limit=1), ['test_vm_create'])
+        self.assertEqual(self.index.complete('vm'), ['vm', 'vm.test_show'])
+        self.assertEqual(self.index.complete('storage'), [])
+        self.assertEqual(len(self.index.complete()), len(TEST_INDEX))
+
+    def test_file_cache(self):
+        self.assertEqual(self.index.get_file_cache('v1'), FILE_CACHE)
+        self.assertEqual(self.index.get_file_cache('v2'), {})
+
+    def test_saving_replaces_index(self):
+        self.assertEqual(self.index['vm'], '/src/vm/tests/latest')
+        self.index.close()
+        TestIndex.save(self.path, {'vm': '/new/vm/tests/latest'}, {}, 'v1')
+        self.assertEqual(self.index.items(), [('vm', '/new/vm/tests/latest')])
+        self.assertFalse(os.path.exists(self.path + '.tmp'))
+
+
+class TestTestCompletion(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.azure_config_dir = os.path.join(self.root, 'azure')
+        os.makedirs(os.path.join(self.root, 'test_index'))
+        os.makedirs(self.azure_config_dir)
+        TestIndex.save(os.path.join(self.root, 'test_index', 'latest.db'), TEST_INDEX, {}, 'v1')
+        TestIndex.save(os.path.join(self.root, 'test_index', '2019-03-01-hybrid.db'), {'vm_hybrid': '/src'}, {}, 'v1')
+        patchers = [mock.patch('azdev.operations.testtool.get_azdev_config_dir', return_value=self.root),
+                    mock.patch.dict(os.environ, {'AZURE_CONFIG_DIR': self.azure_config_dir})]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _complete(self, prefix, profile=None):
+        # pylint: disable=no-value-for-parameter
+        return get_test_completion(prefix=prefix, parsed_args=SimpleNamespace(_cmd=None, profile=profile))
+
+    def _set_profile(self, profile):
+        with open(os.path.join(self.azure_config_dir, 'config'), 'w') as f:
+            f.write('[cloud]\nname = AzureStackHub\n')
+        with open(os.path.join(self.azure_config_dir, 'clouds.config'), 'w') as f:
+            f.write('[AzureStackHub]\nprofile = {}\n'.format(profile))
+
+    def test_complete_from_index(self):
+        self.assertEqual(self._complete('test_vm_'), ['test_vm_create', 'test_vm_list'])
+        self.assertEqual(self._complete('vm'), ['vm', 'vm.test_show'])
+        self.assertEqual(self._complete('C'), ['CLI'])
+        self.assertEqual(self._complete('vm', profile='2019-03-01-hybrid'), ['vm_hybrid'])
+
+    def test_complete_for_configured_profile(self):
+        self.assertIsNone(get_configured_profile())
+        self._set_profile('2019-03-01-hybrid')
+        self.assertEqual(get_configured_profile(), '2019-03-01-hybrid')
+        self.assertEqual(self._complete('vm'), ['vm_hybrid'])
+
+    def test_complete_without_index_of_profile(self):
+        self._set_profile('2020-09-01-hybrid')
+        os.utime(os.path.join(self.root, 'test_index', 'latest.db'), (0, 0))
+        # the most recently updated index is used instead
+        self.assertEqual(self._complete('vm'), ['vm_hybrid'])
+        shutil.rmtree(os.path.join(self.root, 'test_index'))
+        self.assertEqual(self._complete('E'), ['EXT'])
@@ -10,7 +10,7 @@ import argparse
 from knack.arguments import ArgumentsContext, CLIArgumentType
 
 from azdev.completer import get_test_completion
-from azdev.operations.linter import linter_severity_choices
+from azdev.operations.linter import linter_severity_choices, REPORT_FORMATS
 
 
 class Flag:
@@ -40,7 +40,7 @@ def load_arguments(self, _):
         c.argument('deps', options_list=['--deps-from', '-d'], choices=['requirements.txt', 'setup.py'], default='requirements.txt', help="Choose the file to resolve dependencies.")
 
     with ArgumentsContext(self, 'test') as c:
-        c.argument('discover', options_list='--discover', action='store_true', help='Build an index of test names so that you don\'t need to specify fully qualified test paths.')
+        c.argument('discover', options_list='--discover', action='store_true', help='Rebuild the index of test names, which lets you omit fully qualified test paths, parsing every test file again. Otherwise the index is refreshed for the test files that changed since the last run.')
         c.argument('xml_path', options_list='--xml-path', help='Path and filename at which to store the results in XML format. If omitted, the file will be saved as `test_results.xml` in your `.azdev` directory.')
         c.argument('in_series', options_list='--series', action='store_true', help='Disable test parallelization.')
         c.argument('run_live', options_list='--live', action='store_true', help='Run all tests live.')
@@ -61,6 +61,12 @@ def load_arguments(self, _):
                    arg_group='Continuous Integration',
                    help='Apply incremental test strategy to Azure CLI on Azure DevOps')
 
+        # test impact analysis
+        c.argument('record_impact', action='store_true', arg_group='Test Impact',
+                   help='Record the lines covered by each test, to select the tests impacted by later changes with --impact. Run all tests with it. Implies --no-exitfirst, and the recording is only saved when all tests pass. Requires coverage.')
+        c.argument('impact', action='store_true', arg_group='Test Impact',
+                   help='Only run the selected tests which covered the lines changed by a git diff when recorded with --record-impact, along with changed tests. Changes of unknown impact run all the tests of their module. Requires --tgt and --repo.')
+
     with ArgumentsContext(self, 'coverage') as c:
         c.argument('prefix', type=str, help='Filter analysis by command prefix.')
         c.argument('report', action='store_true', help='Display results as a report.')
@@ -73,6 +79,7 @@ def load_arguments(self, _):
         c.positional('modules', modules_type)
         c.argument('pylint', action='store_true', help='Run pylint.')
         c.argument('pep8', action='store_true', help='Run flake8 to check PEP8.')
+        c.argument('linter_checkers', action='store_true', help='Also run the custom pylint checkers of `azdev linter` in the same pylint pass.')
 
     with ArgumentsContext(self, 'cli check-versions') as c:
         c.argument('update', action='store_true', help='If provided, the command will update the versions in azure-cli\'s setup.py file.')
@@ -100,6 +107,11 @@ def load_arguments(self, _):
                         'For example, specifying "medium" runs linter rules that have "high" or "medium" severity. '
                         'However, specifying "low" runs the linter on every rule, regardless of severity. '
                         'Defaults to "high".')
+        c.argument('workers', type=int, help='Number of processes to check linter rules with. Each rule is split into chunks of commands, parameters or help entries checked concurrently.')
+        c.argument('incremental', action='store_true', help='Only check the commands, command groups and help entries that changed since the last incremental run, and replay the cached violations of the others.')
+        c.argument('report_format', choices=REPORT_FORMATS, help='Also save the results of the linter rules, with the time spent checking each rule, in this format.')
+        c.argument('report_path', help='Path and filename at which to save the results. If omitted, the file will be saved as `linter_results.json` or `linter_results.sarif` in your `.azdev` directory.')
+        c.argument('skip_pylint_checkers', action='store_true', help='Skip the custom pylint checkers, for instance when they already ran with `azdev style --linter-checkers`.')
     # endregion
 
     # region statistics
@@ -121,9 +133,26 @@ def load_arguments(self, _):
     with ArgumentsContext(self, 'perf') as c:
         c.argument('runs', type=int, help='Number of runs to average performance over.')
 
+    with ArgumentsContext(self, 'perf load-times') as c:
+        c.argument('import_time', action='store_true', help='Run the CLI with `python -X importtime` and report the slowest imports of each module.')
+        c.argument('workers', type=int, help='Number of runs to execute concurrently, each pinned to its own CPU core where supported.')
+        c.argument('baseline', action='store_true', help='Fail only modules that are significantly slower than the saved baseline instead of checking fixed thresholds. Modules without a baseline are checked against the thresholds.')
+        c.argument('save_baseline', action='store_true', help='Save the measured load times as the baseline for later runs with --baseline.')
+
     with ArgumentsContext(self, 'perf benchmark') as c:
         c.positional('commands', nargs="*", help="Command prefix to run benchmark. Omit to check all commands with --help.")
         c.argument('top', type=int, help='Show N slowest commands. 0 for all.')
+        c.argument('mode', choices=['cold', 'warm', 'both'], help='"cold" runs every command in a new Python process. "warm" forks every run from a parent that has already imported azure.cli.core, which excludes interpreter startup and core imports. "both" reports the two side by side.')
+        c.argument('results_file', help='Path of a JSON lines file to which the result of each command is written as soon as it is measured.')
+        c.argument('resume', action='store_true', help='Skip the commands already measured in --results-file. The file is rewritten with the results read from it, dropping any line truncated by an interruption, followed by the results of the remaining commands.')
+        c.argument('memory', action='store_true', help='Also report the median peak RSS in MB and the number of imported modules of each command.')
+        c.argument('ci_width', type=float, arg_group='Adaptive Sampling', help='Keep measuring a command, --runs more times at a time, until the 95%% confidence interval of its median is narrower than this fraction of the median (e.g. 0.05), or until --max-runs.')
+        c.argument('max_runs', type=int, arg_group='Adaptive Sampling', help='Maximum number of runs of a command when --ci-width is used.')
+
+    with ArgumentsContext(self, 'perf compare') as c:
+        c.positional('results', nargs='*', metavar='PATH', help='Paths of the baseline results and of the results to compare with it, saved with `azdev perf benchmark -o json` or `--results-file`.')
+        c.argument('commands', nargs='+', help='Space-separated list of commands to benchmark when comparing Git revisions with --tgt and --repo. Omit to check all commands with --help.')
+        c.argument('top', type=int, help='Number of the largest significant regressions and improvements to list. 0 for all.')
 
     with ArgumentsContext(self, 'extension') as c:
         c.argument('dist_dir', help='Name of a directory in which to save the resulting WHL files.')
@@ -10,14 +10,17 @@ def performance_benchmark_data_transformer(result):
 
     output = []
 
+    columns = ["Min", "Avg", "Max", "Media", "Std", "P90", "P95", "P99", "MAD", "Outliers",
+               "Robust Avg", "Robust Std", "Histogram",
+               "Peak RSS", "Modules"]
+
     for r in result:
         item = OrderedDict()
         item["Command"] = r["Command"]
-        item["Min"] = r["Min"]
-        item["Avg"] = r["Avg"]
-        item["Max"] = r["Max"]
-        item["Media"] = r["Media"]
-        item["Std"] = r["Std"]
+        for prefix in ["", "Warm "]:
+            for column in columns:
+                if prefix + column in r:
+                    item[prefix + column] = r[prefix + column]
         output.append(item)
 
     return output
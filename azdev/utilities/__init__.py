@@ -4,6 +4,13 @@
 # license information.
 # -----------------------------------------------------------------------------
 
+from .cache import (
+    atomic_path,
+    atomic_write,
+    get_file_fingerprint,
+    get_source_version,
+    is_file_untouched
+)
 from .config import (
     get_azure_config,
     get_azure_config_dir,
@@ -15,6 +22,7 @@ from .command import (
     cmd,
     py_cmd,
     pip_cmd,
+    get_python_bin,
     CommandError
 )
 from .const import (
@@ -56,6 +64,11 @@ from .tools import (
 
 
 __all__ = [
+    'atomic_path',
+    'atomic_write',
+    'get_file_fingerprint',
+    'get_source_version',
+    'is_file_untouched',
     'COMMAND_MODULE_PREFIX',
     'EXTENSION_PREFIX',
     'display',
@@ -68,6 +81,7 @@ __all__ = [
     'cmd',
     'py_cmd',
     'pip_cmd',
+    'get_python_bin',
     'CommandError',
     'test_cmd',
     'get_env_path',
@@ -0,0 +1,73 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+""" Helpers for the results azdev caches between runs, keyed on fingerprints of the files they were computed from. """
+
+import hashlib
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+from .path import make_dirs
+
+
+def get_file_fingerprint(path):
+    """ Read a file and fingerprint it.
+
+    :returns: (bytes, dict) the content of the file and its `size`, modification time `mtime` in nanoseconds
+        and content hash `sha`.
+    """
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        content = f.read()
+    return content, {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'sha': hashlib.sha256(content).hexdigest()}
+
+
+def is_file_untouched(fingerprint, stat):
+    """ Whether a file kept the size and modification time of its fingerprint, without reading it.
+
+    A touched file may still have the same content, which is told by comparing the `sha` of a new fingerprint.
+    """
+    return bool(fingerprint and stat) and fingerprint['size'] == stat.st_size and \
+        fingerprint['mtime'] == stat.st_mtime_ns
+
+
+def get_source_version(path):
+    """ Fingerprint a source file along with the version of Python running it, to invalidate the results it
+    computed when either changes. """
+    with open(os.path.abspath(path), 'rb') as f:
+        content = f.read()
+    return hashlib.sha256(content + sys.version.encode()).hexdigest()
+
+
+@contextmanager
+def atomic_path(path):
+    """ Provide a temporary path to write a file at, which replaces the file at `path` once written.
+
+    Concurrent readers never see a partially written file, and the file is left as is if writing fails. Of
+    concurrent writers, the last one to finish wins.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    make_dirs(directory)
+    # a unique temporary file keeps concurrent writers of the same file apart
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=name + '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        yield temp_path
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    os.replace(temp_path, path)
+
+
+@contextmanager
+def atomic_write(path, mode='w'):
+    """ Open a file to write, which replaces the file at `path` once closed. See `atomic_path`. """
+    with atomic_path(path) as temp_path:  # pylint: disable=contextmanager-generator-missing-cleanup
+        with open(temp_path, mode) as f:
+            yield f
@@ -71,6 +71,14 @@ def cmd(command, message=False, show_stderr=True, raise_error=False, **kwargs):
         return CommandResultItem(err.output, exit_code=err.returncode, error=err)
 
 
+def get_python_bin():
+    """ Returns the Python executable of the active virtual environment, or the current one if none is active. """
+    from azdev.utilities import get_env_path
+    env_path = get_env_path()
+    return sys.executable if not env_path else os.path.join(
+        env_path, 'Scripts' if sys.platform == 'win32' else 'bin', 'python')
+
+
 def py_cmd(command, message=False, show_stderr=True, raise_error=False, is_module=True, **kwargs):
     """ Run a script or command with Python.
 
@@ -82,10 +90,7 @@ def py_cmd(command, message=False, show_stderr=True, raise_error=False, is_modul
     :param kwargs: Any kwargs supported by subprocess.Popen
     :returns: CommandResultItem object.
     """
-    from azdev.utilities import get_env_path
-    env_path = get_env_path()
-    python_bin = sys.executable if not env_path else os.path.join(
-        env_path, 'Scripts' if sys.platform == 'win32' else 'bin', 'python')
+    python_bin = get_python_bin()
     if is_module:
         command = '{} -m {}'.format(python_bin, command)
     else:
@@ -5,12 +5,15 @@
 # -----------------------------------------------------------------------------
 
 import os
+import re
 
 from knack.log import get_logger
 from knack.util import CLIError
 
 logger = get_logger(__name__)
 
+_HUNK_HEADER_RE = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+\d+(?:,\d+)? @@', re.MULTILINE)
+
 
 def filter_by_git_diff(selected_modules, git_source, git_target, git_repo):
     if not any([git_source, git_target, git_repo]):
@@ -60,6 +63,35 @@ def summarize_changed_mods(files_changed):
 def diff_branches(repo, target, source):
     """ Returns a list of files that have changed in a given repo
         between two branches. """
+    diff_index = _diff_commits(repo, target, source)
+
+    return [diff.b_path for diff in diff_index]
+
+
+def get_changed_lines(repo, target, source):
+    """ Returns the lines that have changed in each file of a given repo
+        between two branches.
+
+    :returns: dict of the changed line numbers of each file, as numbered in the target branch. Files that were added
+        or deleted, or whose changes are not textual, map to None. Lines inserted between two lines count as
+        changing both.
+    """
+    changed_lines = {}
+    for diff in _diff_commits(repo, target, source, create_patch=True, unified=0):
+        path = diff.a_path or diff.b_path
+        patch = diff.diff.decode('utf-8', 'replace') if isinstance(diff.diff, bytes) else diff.diff
+        hunks = _HUNK_HEADER_RE.findall(patch or '')
+        if diff.new_file or diff.deleted_file or not hunks:
+            changed_lines[path] = None
+            continue
+        lines = changed_lines.setdefault(path, set())
+        for start, count in hunks:
+            start, count = int(start), 1 if count == '' else int(count)
+            lines.update(range(start, start + count) if count else (start, start + 1))
+    return changed_lines
+
+
+def _diff_commits(repo, target, source, **kwargs):
     try:
         import git  # pylint: disable=unused-import,unused-variable
         import git.exc as git_exc
@@ -89,6 +121,4 @@ def diff_branches(repo, target, source):
     logger.info('cd %s', repo)
     logger.info('git --no-pager diff %s..%s --name-only -- .\n', target_commit, source_commit)
 
-    diff_index = target_commit.diff(source_commit)
-
-    return [diff.b_path for diff in diff_index]
+    return target_commit.diff(source_commit, **kwargs)
@@ -0,0 +1,65 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from azdev.utilities import atomic_write, get_file_fingerprint, is_file_untouched
+
+
+class TestCacheFiles(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, 'cache', 'results.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_atomic_write(self):
+        with atomic_write(self.path) as f:
+            f.write('first')
+            # the file is only replaced once written
+            self.assertFalse(os.path.exists(self.path))
+
+        with self.assertRaises(ValueError):
+            with atomic_write(self.path) as f:
+                f.write('partial')
+                raise ValueError('interrupted')
+
+        with open(self.path) as f:
+            self.assertEqual(f.read(), 'first')
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ['results.json'])
+
+    def test_concurrent_atomic_writes(self):
+        with atomic_write(self.path) as first, atomic_write(self.path) as second:
+            self.assertNotEqual(first.name, second.name)
+            first.write('first')
+            second.write('second')
+
+        # the writer closed last replaces the file
+        with open(self.path) as f:
+            self.assertEqual(f.read(), 'first')
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ['results.json'])
+
+    def test_file_fingerprint(self):
+        with atomic_write(self.path) as f:
+            f.write('content')
+        content, fingerprint = get_file_fingerprint(self.path)
+        self.assertEqual(content, b'content')
+        self.assertTrue(is_file_untouched(fingerprint, os.stat(self.path)))
+        self.assertFalse(is_file_untouched(None, os.stat(self.path)))
+
+        # touching the file changes its fingerprint but not its content hash
+        os.utime(self.path, ns=(0, 0))
+        self.assertFalse(is_file_untouched(fingerprint, os.stat(self.path)))
+        self.assertEqual(get_file_fingerprint(self.path)[1]['sha'], fingerprint['sha'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -58,6 +58,7 @@ setup(
         'azdev.operations.linter',
         'azdev.operations.linter.rules',
         'azdev.operations.linter.pylint_checkers',
+        'azdev.operations.performance',
         'azdev.operations.testtool',
         'azdev.operations.extensions',
         'azdev.operations.statistics',